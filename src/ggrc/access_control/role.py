@@ -129,10 +129,12 @@ class AccessControlRole(Indexed, attributevalidator.AttributeValidator,
 def invalidate_acr_caches(mapper, content, target):
   # pylint: disable=unused-argument
   """Clear `global_role_names` if ACR created or update or deleted."""
+  from ggrc.cache import bootstrap_cache
   if hasattr(flask.g, "global_role_names"):
     del flask.g.global_role_names
   if hasattr(flask.g, "global_ac_roles"):
     del flask.g.global_ac_roles
+  bootstrap_cache.invalidate()
 
 
 def acr_modified(obj, session):
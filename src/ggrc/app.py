@@ -27,6 +27,7 @@ from ggrc import notifications
 from ggrc import settings
 from ggrc.gdrive import init_gdrive_routes
 from ggrc.utils import benchmark
+from ggrc.utils import profiling
 from ggrc.utils.issue_tracker_mock import init_issue_tracker_mock
 
 if settings.ISSUE_TRACKER_MOCK and not settings.PRODUCTION:
@@ -298,3 +299,4 @@ _enable_debug_toolbar()
 _enable_jasmine()
 _display_sql_queries()
 _display_request_time()
+profiling.init_profiling(app)
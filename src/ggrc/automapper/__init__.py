@@ -3,6 +3,7 @@
 
 """Automapper generator."""
 
+import collections
 from datetime import datetime
 import logging
 
@@ -11,6 +12,7 @@ import sqlalchemy as sa
 from ggrc import db
 from ggrc.automapper import rules
 from ggrc import login
+from ggrc import utils
 from ggrc.models.audit import Audit
 from ggrc.models.automapping import Automapping
 from ggrc.models.relationship import Relationship, RelationshipsCache, Stub
@@ -30,77 +32,123 @@ class AutomapperGenerator(object):
   Consumes automapping rules and newly created Relationships, creates
   autogenerated Relationships registering them in Automappings table.
 
-  Note: we can rely on the order of src/dst pairs of queued and
-  inserted mappings since we only queue ordered pairs (see `order`).
-  """
+  Rules are evaluated as set operations on whole levels of the mapping graph:
+  neighborhoods of all edges created on the previous level are fetched with
+  a single query per chunk, permissions are checked once per object type and
+  all candidate edges of a level are processed together. Only newly created
+  edges are expanded, since automappings of existing edges have already been
+  generated.
 
-  COUNT_LIMIT = 10000
+  Note: we can rely on the order of src/dst pairs of generated mappings since
+  we only generate ordered pairs (see `order`).
+  """
 
   def __init__(self):
-    self.processed = set()
-    self.queue = set()
     self.auto_mappings = set()
     self.automapping_ids = set()
     self.related_cache = RelationshipsCache()
 
   def related(self, obj):
     """Return obj's relationship stubs"""
-    if obj in self.related_cache.cache:
-      return self.related_cache.cache[obj]
-
-    # Pre-fetch neighborhood for enqueued objects since we're gonna need these
-    # results in a few steps. This drastically reduces number of queries.
-    stubs = {s for rel in self.queue for s in rel}
-    stubs.add(obj)
-    self.related_cache.populate_cache(stubs)
-
+    if obj not in self.related_cache.cache:
+      self._populate_cache({obj})
     return self.related_cache.cache[obj]
 
+  def _populate_cache(self, stubs):
+    """Fetch neighborhoods of all stubs that are not cached yet."""
+    missing = [stub for stub in stubs if stub not in self.related_cache.cache]
+    for chunk in utils.list_chunks(missing):
+      self.related_cache.populate_cache(set(chunk))
+      for stub in chunk:
+        # Mark objects without relationships as cached.
+        self.related_cache.cache.setdefault(stub, set())
+
   @staticmethod
   def order(src, dst):
     return (src, dst) if src < dst else (dst, src)
 
   def generate_automappings(self, relationship):
     """Generate Automappings for a given relationship"""
-    # pylint: disable=protected-access
     self.auto_mappings = set()
     with benchmark("Automapping generate_automappings"):
-      # initial relationship is special since it is already created and
-      # processing it would abort the loop so we manually enqueue the
-      # neighborhood
-      src = Stub.from_source(relationship)
-      dst = Stub.from_destination(relationship)
-      self._step(src, dst)
-      self._step(dst, src)
-      while self.queue:
-        if len(self.auto_mappings) > self.COUNT_LIMIT:
-          break
-        src, dst = entry = self.queue.pop()
-
-        if {src.type, dst.type} != {"Audit", "Issue"}:
-          # Auditor doesn't have edit (+map) permission on the Audit,
-          # but the Auditor should be allowed to Raise an Issue.
-          # Since Issue-Assessment-Audit is the only rule that
-          # triggers Issue to Audit mapping, we should skip the
-          # permission check for it
-          if not (permissions.is_allowed_update(src.type, src.id, None) and
-                  permissions.is_allowed_update(dst.type, dst.id, None)):
-            continue
-
-        created = self._ensure_relationship(src, dst)
-        self.processed.add(entry)
-        if not created:
-          # If the edge already exists it means that auto mappings for it have
-          # already been processed and it is safe to cut here.
+      # initial relationship is special since it is already created, so its
+      # neighborhood is expanded without checking it
+      src, dst = self.order(Stub.from_source(relationship),
+                            Stub.from_destination(relationship))
+      level = {(src, dst)}
+      self._populate_cache({src, dst})
+      self._cache_mappings(level)
+      while level:
+        candidates = self._get_candidates(level)
+        candidates = self._filter_existing(candidates)
+        candidates = self._filter_allowed(candidates)
+        self._check_single_audit_restriction(candidates)
+        self._add_mappings(candidates)
+        level = candidates
+      self._flush(relationship)
+
+  def _get_candidates(self, level):
+    """Get pairs implied by the rules for edges of a level."""
+    self._populate_cache({stub for edge in level for stub in edge})
+    candidates = set()
+    for edge in level:
+      for src, dst in (edge, edge[::-1]):
+        mappings = rules.rules[src.type, dst.type]
+        if not mappings:
           continue
-        self._step(src, dst)
-        self._step(dst, src)
+        candidates.update(self.order(related, src)
+                          for related in self.related(dst)
+                          if related.type in mappings and related != src)
+    return candidates
+
+  def _filter_existing(self, candidates):
+    """Get candidates that are not mapped yet.
+
+    One object of every candidate comes from the previous level, so its
+    cached neighborhood is complete.
+    """
+    cache = self.related_cache.cache
+    return {
+        (src, dst) for src, dst in candidates
+        if not (src in cache and dst in cache[src] or
+                dst in cache and src in cache[dst])
+    }
 
-      if len(self.auto_mappings) <= self.COUNT_LIMIT:
-        self._flush(relationship)
-      else:
-        logger.error("Automapping limit exceeded: limit=%s, count=%s",
-                     self.COUNT_LIMIT, len(self.auto_mappings))
+  @staticmethod
+  def _filter_allowed(candidates):
+    """Get candidates the current user is allowed to map."""
+    ids_by_type = collections.defaultdict(set)
+    for edge in candidates:
+      for stub in edge:
+        ids_by_type[stub.type].add(stub.id)
+    allowed = {
+        Stub(type_, id_)
+        for type_, ids in ids_by_type.iteritems()
+        for id_ in permissions.filter_allowed_update(type_, ids)
+    }
+    # Auditor doesn't have edit (+map) permission on the Audit, but the
+    # Auditor should be allowed to Raise an Issue. Since
+    # Issue-Assessment-Audit is the only rule that triggers Issue to Audit
+    # mapping, we should skip the permission check for it
+    return {
+        (src, dst) for src, dst in candidates
+        if {src.type, dst.type} == {"Audit", "Issue"} or
+        src in allowed and dst in allowed
+    }
+
+  def _cache_mappings(self, mappings):
+    """Add mappings to cached neighborhoods."""
+    cache = self.related_cache.cache
+    for src, dst in mappings:
+      if src in cache:
+        cache[src].add(dst)
+      if dst in cache:
+        cache[dst].add(src)
+
+  def _add_mappings(self, mappings):
+    """Register new mappings."""
+    self.auto_mappings.update(mappings)
+    self._cache_mappings(mappings)
 
   def _flush(self, parent_relationship):
     """Manually INSERT generated automappings."""
@@ -126,24 +174,22 @@ class AutomapperGenerator(object):
       # it means that the mapping was already created by another request
       # and we can safely ignore it.
       inserter = Relationship.__table__.insert().prefix_with("IGNORE")
-      original = self.order(Stub.from_source(parent_relationship),
-                            Stub.from_destination(parent_relationship))
-      db.session.execute(inserter.values([{
-          "id": None,
-          "modified_by_id": current_user_id,
-          "created_at": now,
-          "updated_at": now,
-          "source_id": src.id,
-          "source_type": src.type,
-          "destination_id": dst.id,
-          "destination_type": dst.type,
-          "context_id": None,
-          "status": None,
-          "parent_id": parent_relationship.id,
-          "automapping_id": automapping_id,
-          "is_external": False}
-          for src, dst in self.auto_mappings
-          if (src, dst) != original]))  # (src, dst) is sorted
+      for chunk in utils.list_chunks(list(self.auto_mappings)):
+        db.session.execute(inserter.values([{
+            "id": None,
+            "modified_by_id": current_user_id,
+            "created_at": now,
+            "updated_at": now,
+            "source_id": src.id,
+            "source_type": src.type,
+            "destination_id": dst.id,
+            "destination_type": dst.type,
+            "context_id": None,
+            "status": None,
+            "parent_id": parent_relationship.id,
+            "automapping_id": automapping_id,
+            "is_external": False}
+            for src, dst in chunk]))
 
       self._set_audit_id_for_issues(automapping_id)
 
@@ -194,52 +240,24 @@ class AutomapperGenerator(object):
         )
     )
 
-  def _step(self, src, dst):
-    """Step through the automapping rules tree."""
-    mappings = rules.rules[src.type, dst.type]
-    if mappings:
-      dst_related = (o for o in self.related(dst)
-                     if o.type in mappings and o != src)
-      for related in dst_related:
-        entry = self.order(related, src)
-        if entry not in self.processed:
-          self.queue.add(entry)
-
-  def _ensure_relationship(self, src, dst):
-    """Create the relationship if not exists already.
-
-    Returns:
-      True if a relationship was created;
-      False otherwise.
-    """
-    # even though self.cache is defaultdict, self.cache[key] adds key
-    # to self.cache if it is not present, and we should avoid it
-    if dst in self.related(src):
-      return False
-    if src in self.related(dst):
-      return False
-
-    self._check_single_audit_restriction(src, dst)
-
-    self.auto_mappings.add((src, dst))
-
-    if src in self.related_cache.cache:
-      self.related_cache.cache[src].add(dst)
-    if dst in self.related_cache.cache:
-      self.related_cache.cache[dst].add(src)
-
-    return True
-
-  def _check_single_audit_restriction(self, src, dst):
-    """Fail if dst (Issue) is already mapped to an Audit."""
-    # src, dst are ordered since they come from self.queue
-    if (src.type, dst.type) == ("Audit", "Issue"):
-      if "Audit" in (related.type for related in self.related(dst)):
+  def _check_single_audit_restriction(self, mappings):
+    """Fail if an Issue would be mapped to multiple Audits."""
+    # src, dst are ordered, so Audit is always the source
+    issues = [dst for src, dst in mappings
+              if (src.type, dst.type) == ("Audit", "Issue")]
+    if not issues:
+      return
+    self._populate_cache(set(issues))
+    seen = set()
+    for issue in issues:
+      if (issue in seen or
+              any(related.type == "Audit" for related in self.related(issue))):
         raise exceptions.ValidationError(
             "This request will result in automapping that will map "
             "Issue#{issue.id} to multiple Audits."
-            .format(issue=dst)
+            .format(issue=issue)
         )
+      seen.add(issue)
 
 
 def register_automapping_listeners():
@@ -523,6 +523,10 @@ def publish_representation(resource):
 class Builder(AttributeInfo):
   """JSON Dictionary builder for ggrc.models.* objects and their mixins."""
 
+  def __init__(self, tgt_class):
+    super(Builder, self).__init__(tgt_class)
+    self.tgt_class = tgt_class
+
   def generate_link_object_for(
           self, obj, inclusions, include, inclusion_filter):
     """Generate a link object for this object. If there are property paths
@@ -745,6 +749,81 @@ class Builder(AttributeInfo):
     for attr_name in attrs:
       UpdateAttrHandler.do_update_attr(obj, json_obj, attr_name)
 
+  def _get_field_projection(self, field):
+    """Get column and stub type needed to publish a single field.
+
+    Returns:
+      tuple of column (or None for computed fields) and stub type (or None
+      for plain values), or None if the field needs a model instance.
+    """
+    if field in ("type", "selfLink", "viewLink"):
+      return None, None
+    publish_names = {getattr(attr, "attr_name", attr)
+                     for attr in self._publish_attrs}
+    if field not in publish_names:
+      return None, None
+    for cls in (self.tgt_class,) + self.tgt_class.__bases__:
+      if field in getattr(cls, "_custom_publish", {}):
+        return None
+    class_attr = getattr(self.tgt_class, field, None)
+    if not isinstance(class_attr, InstrumentedAttribute):
+      return None
+    prop = class_attr.property
+    if not isinstance(prop, RelationshipProperty):
+      if len(prop.columns) != 1:
+        return None
+      return class_attr, None
+    if (prop.uselist or prop.backref or field in self._include_links or
+            prop.mapper.polymorphic_on is not None or
+            len(prop.local_columns) != 1):
+      return None
+    column_name = list(prop.local_columns)[0].key
+    return getattr(self.tgt_class, column_name), prop.mapper.class_.__name__
+
+  def get_projection(self, fields):
+    """Get columns needed to publish fields without loading model instances.
+
+    Returns:
+      list of (field, column, stub type) tuples, or None if any of the fields
+      can not be published from table columns.
+    """
+    if self.tgt_class.__mapper__.polymorphic_on is not None:
+      return None
+    projection = []
+    for field in fields:
+      field_projection = self._get_field_projection(field)
+      if field_projection is None:
+        return None
+      projection.append((field,) + field_projection)
+    return projection
+
+  def publish_row(self, projection, obj_id, values):
+    """Translate selected column values into a JSON dictionary.
+
+    Args:
+      projection: list of fields as returned by get_projection.
+      obj_id: id of the published object.
+      values: list of values of projection columns.
+    """
+    model_name = self.tgt_class.__name__
+    json_obj = {}
+    columns_values = iter(values)
+    for field, column, stub_type in projection:
+      if column is not None:
+        value = next(columns_values)
+        if stub_type is not None and value is not None:
+          value = LazyStubRepresentation(stub_type, value)
+      elif field == "type":
+        value = model_name
+      elif field == "selfLink":
+        value = url_for(model_name, id=obj_id)
+      elif field == "viewLink":
+        value = view_url_for(model_name, id=obj_id)
+      else:
+        value = None
+      json_obj[field] = value
+    return json_obj
+
   def publish_contribution(self, obj, inclusions, inclusion_filter,
                            attribute_whitelist):
     """Translate the state represented by ``obj`` into a JSON dictionary"""
@@ -0,0 +1,157 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Versioned cache of page bootstrap payloads.
+
+HTML pages embed JSON payloads that do not depend on the current user, such
+as global custom attribute definitions, access control roles and attribute
+definitions of all models. They change only with the app version or with
+changes of custom attribute definitions and access control roles, so they are
+built once per payload version and stored pre-serialized.
+
+A payload version consists of the app version and generations of the models
+the payloads are built from. With memcache enabled, generations are shared
+query generations (see ggrc.cache.utils.get_query_generation_key) that are
+dropped after commit of any change of those models, and serialized payloads
+are stored in memcache compressed. In both cases the last built payloads are
+also kept in process memory, so a page render with unchanged definitions only
+reads the generations.
+
+Without memcache, the generation is a process local counter, so a change
+made in one instance is not seen by the other ones. Payloads kept in process
+memory expire after BOOTSTRAP_CACHE_TIMEOUT in that case, which bounds the
+time other instances serve outdated definitions.
+
+CAD and ACR change hooks call invalidate() to start a new generation.
+"""
+
+import functools
+import logging
+import time
+import uuid
+import zlib
+
+import flask
+
+from ggrc import settings
+from ggrc.cache import utils as cache_utils
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "bootstrap:payload:"
+
+# Models that bootstrap payloads are built from.
+DEPENDENCIES = ("CustomAttributeDefinition", "AccessControlRole")
+
+# Memcache does not store values larger than 1MB.
+MAX_VALUE_SIZE = 1000000
+
+_local_generation = [0]
+_local_payloads = {}
+
+
+def is_enabled():
+  return getattr(settings, "BOOTSTRAP_CACHE_TIMEOUT", 0) > 0
+
+
+def _get_client():
+  if not getattr(settings, "MEMCACHE_MECHANISM", False):
+    return None
+  return cache_utils.get_cache_manager().cache_object.memcache_client
+
+
+def _get_generations(client):
+  """Get current generations of payload dependencies."""
+  if client is None:
+    return [str(_local_generation[0])]
+  keys = [cache_utils.get_query_generation_key(name) for name in DEPENDENCIES]
+  generations = client.get_multi(keys)
+  missing = {key: uuid.uuid4().hex[:8] for key in keys
+             if key not in generations}
+  if missing:
+    client.add_multi(missing)
+    generations.update(missing)
+  return [generations[key] for key in keys]
+
+
+def get_version(client):
+  """Get payload version, read once per request."""
+  version = getattr(flask.g, "bootstrap_payload_version", None)
+  if version is None:
+    version = ":".join([settings.VERSION] + _get_generations(client))
+    flask.g.bootstrap_payload_version = version
+  return version
+
+
+def invalidate():
+  """Start a new generation of bootstrap payloads."""
+  _local_generation[0] += 1
+  if hasattr(flask.g, "bootstrap_payload_version"):
+    del flask.g.bootstrap_payload_version
+  client = _get_client()
+  if client is not None:
+    client.delete_multi([cache_utils.get_query_generation_key(name)
+                         for name in DEPENDENCIES])
+
+
+def _get_key(function, args, kwargs):
+  key_args = list(args)
+  for pair in sorted(kwargs.iteritems()):
+    key_args.extend(pair)
+  return "{}:{}".format(function.__name__,
+                        ",".join(str(arg) for arg in key_args))
+
+
+def _load(client, key, version):
+  """Get payload built for the version or None."""
+  local = _local_payloads.get(key)
+  if local is not None and local[0] == version:
+    stored_at = local[2]
+    if (client is not None or
+            time.time() - stored_at < settings.BOOTSTRAP_CACHE_TIMEOUT):
+      return local[1]
+  if client is None:
+    return None
+  value = client.get(KEY_PREFIX + version + ":" + key)
+  if value is None:
+    return None
+  payload = zlib.decompress(value).decode("utf-8")
+  _local_payloads[key] = (version, payload, time.time())
+  return payload
+
+
+def _store(client, key, version, payload):
+  """Store built payload for the version."""
+  _local_payloads[key] = (version, payload, time.time())
+  if client is None:
+    return
+  value = zlib.compress(payload.encode("utf-8"))
+  if len(value) > MAX_VALUE_SIZE:
+    logger.warning("Bootstrap payload %s is too large for memcache", key)
+    return
+  client.set(KEY_PREFIX + version + ":" + key, value,
+             settings.BOOTSTRAP_CACHE_TIMEOUT)
+
+
+def cached_payload(function):
+  """Cache JSON string returned by a payload builder per payload version."""
+  @functools.wraps(function)
+  def wrapper(*args, **kwargs):
+    """Get cached payload or build it."""
+    if not is_enabled():
+      return function(*args, **kwargs)
+    key = _get_key(function, args, kwargs)
+    try:
+      client = _get_client()
+      version = get_version(client)
+      payload = _load(client, key, version)
+    except Exception:  # pylint: disable=broad-except
+      logger.exception("Failed to get bootstrap payload %s", key)
+      return function(*args, **kwargs)
+    if payload is None:
+      payload = function(*args, **kwargs)
+      if isinstance(payload, str):
+        payload = payload.decode("utf-8")
+      _store(client, key, version, payload)
+    return payload
+  return wrapper
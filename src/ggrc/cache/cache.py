@@ -1,8 +1,10 @@
 # Copyright (C) 2018 Google Inc.
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
+"""Cache entries and base class of cache backends."""
 
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
+from copy import deepcopy
 
 CacheEntry = namedtuple('CacheEntry', 'model_plural class_name cache_type')
 MappingEntry = namedtuple('MappingEntry', 'class_name attr polymorph')
@@ -139,6 +141,14 @@ def all_mapping_entries():
 
 
 class Cache(object):  # pylint: disable=no-self-use
+  """Base class of cache backends.
+
+  Collection operations are done with a single bulk call of the backend per
+  collection: backends implement get_multi, add_multi, update_multi and
+  remove_multi with the semantics of memcache.Client get_multi (for CAS),
+  add_multi, cas_multi and delete_multi. All or None policy is applied to
+  every collection operation.
+  """
   name = None
   supported_resources = {}
 
@@ -148,17 +158,111 @@ class Cache(object):  # pylint: disable=no-self-use
   def get_name(self):
     return None
 
-  def get(self, *_):
-    return None
-
-  def add(self, *_):
-    return None
-
-  def update(self, *_):
-    return None
-
-  def remove(self, *_):
-    return None
+  def get(self, category, resource, filter):
+    """Get items of a collection for specified filter.
+
+    Args:
+      category: collection or stub
+      resource: regulation, controls, etc.
+      filter: dictionary containing ids and optional attrs
+
+    Returns:
+      None on any errors or if any of the items is not in cache,
+      otherwise mapping of ids to cached attrs
+    """
+    if not self.is_caching_supported(category, resource):
+      return None
+    ids, attrs = self.parse_filter(filter)
+    if ids is None:
+      return None
+    keys = self.get_item_keys(category, resource, ids)
+    values = self.get_multi(keys.keys())
+    if values is None or len(values) < len(keys):
+      # TODO(dan): cannot distinguish network failures vs
+      # id not found in cache, both scenarios return empty result
+      return None
+    data = OrderedDict()
+    for key, id_ in keys.iteritems():
+      data[id_] = self.filter_attrs(values[key], attrs)
+    return data
+
+  def add(self, category, resource, data, expiration_time=0):
+    """Add items of a collection to cache.
+
+    Items that are already in cache are replaced with compare and set, so
+    the whole collection is written with a single get_multi call and at most
+    one add_multi and one update_multi call.
+
+    Args:
+      category: collection or stub
+      resource: regulation, controls, etc.
+      data: dictionary containing ids and attrs
+
+    Returns:
+      None on any errors, otherwise data
+    """
+    if not self.is_caching_supported(category, resource):
+      return None
+    keys = self.get_item_keys(category, resource, data.keys())
+    cached = self.get_multi(keys.keys())
+    if cached is None:
+      return None
+    new_items = {}
+    cached_items = {}
+    for key, id_ in keys.iteritems():
+      if key in cached:
+        cached_items[key] = data.get(id_)
+      else:
+        new_items[key] = data.get(id_)
+    # This could occur on import scenarios
+    if cached_items and not self._is_done(
+            self.update_multi(cached_items, expiration_time)):
+      return None
+    if new_items and not self._is_done(
+            self.add_multi(new_items, expiration_time)):
+      return None
+    return data
+
+  def update(self, category, resource, data, expiration_time=0):
+    """Update cached items of a collection with compare and set.
+
+    Args:
+      category: collection or stub
+      resource: regulation, controls, etc.
+      data: dictionary containing ids and attrs
+
+    Returns:
+      None on any errors or if any of the items is not in cache,
+      otherwise data
+    """
+    if not self.is_caching_supported(category, resource):
+      return None
+    keys = self.get_item_keys(category, resource, data.keys())
+    cached = self.get_multi(keys.keys())
+    if cached is None or len(cached) < len(keys):
+      return None
+    items = {key: data.get(id_) for key, id_ in keys.iteritems()}
+    if not self._is_done(self.update_multi(items, expiration_time)):
+      return None
+    return data
+
+  def remove(self, category, resource, data, lockadd_seconds=0):
+    """Delete items of a collection from cache.
+
+    Args:
+      category: collection or stub
+      resource: regulation, controls, etc.
+      data: dictionary or list of ids
+
+    Returns:
+      None on any errors, otherwise data
+    """
+    if not self.is_caching_supported(category, resource):
+      return None
+    keys = self.get_item_keys(category, resource, data)
+    if not self.remove_multi(keys.keys(), lockadd_seconds):
+      return None
+    return data
 
   def get_multi(self, *_):
     return None
@@ -175,11 +279,30 @@ class Cache(object):  # pylint: disable=no-self-use
   def clean(self):
     return False
 
+  @staticmethod
+  def _is_done(failed_keys):
+    """Check result of add_multi or update_multi, a list of failed keys."""
+    return failed_keys is not None and not failed_keys
+
   @staticmethod
   def get_key(category, resource_name):
     cache_key = category + ":" + resource_name
     return cache_key
 
+  @classmethod
+  def get_item_keys(cls, category, resource_name, ids):
+    """Get ordered mapping of cache keys of collection items to their ids."""
+    cache_key = cls.get_key(category, resource_name)
+    return OrderedDict((cache_key + ":" + str(id_), id_) for id_ in ids)
+
+  @staticmethod
+  def filter_attrs(values, attrs):
+    """Get copy of cached attrs limited to the requested ones."""
+    if attrs is None:
+      return values
+    return OrderedDict((attr, deepcopy(values.get(attr)))
+                       for attr in attrs if attr in values)
+
   @staticmethod
   def parse_filter(filter_obj):
     return filter_obj.get('ids'), filter_obj.get('attrs')
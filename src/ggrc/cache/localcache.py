@@ -16,8 +16,8 @@ class LocalCache(Cache):
       local to a particular GGRC instance
 
       Attributes:
-        cache_entries: Ordered dictionary containing resource id as key and
-        value as JSON object (dictionary)
+        cache_entries: Ordered dictionary containing cache key of a resource
+        item as key and value as JSON object (dictionary)
   """
 
   cache_entries = OrderedDict()
@@ -30,143 +30,68 @@ class LocalCache(Cache):
         self.supported_resources[cache_entry.model_plural] = \
             cache_entry.class_name
 
-    for key in self.supported_resources.keys():
-      self.cache_entries['collection:' + key] = {}
-
   def get_name(self):
     return self.name
 
-  def get(self, category, resource, filter):
-    """ Get data from local cache for the specified filter
+  def get_multi(self, data):
+    """ Get multiple entries from local cache
 
     Args:
-      category: collection or stub
-      resource: regulation, controls, etc.
-      filter: dictionary containing ids and optional attrs
+      data: list of keys
 
     Returns:
-      All or None policy is applied by default
-      None on any errors
-      Mapping of DTO formatted string, e.g. JSON string representation
+      dictionary of keys and values of the entries found in cache
     """
-    if not self.is_caching_supported(category, resource):
-      return None
-
-    cache_key = self.get_key(category, resource)
-    if cache_key is None:
-      return None
-
-    entries = self.cache_entries.get(cache_key)
-    if entries is None:
-      return None
-
-    ids, attrs = self.parse_filter(filter)
-    if ids is None and attrs is None:
-      return None
-    else:
-      if ids is None:
-        return self.get_data(entries.keys(), entries, attrs)
-      else:
-        return self.get_data(ids, entries, attrs)
+    return {key: self.cache_entries[key]
+            for key in data if key in self.cache_entries}
 
-  def add(self, category, resource, data, expiration_time=0):
-    """ Add data to local cache for the specified data
+  def add_multi(self, data, expiration_time=0):
+    """ Add multiple entries that are not in local cache yet
 
     Args:
-      category: collection or stub
-      resource: regulation, controls, etc.
-      data: dictionary containing ids and attrs
+      data: dictionary containing keys and values
 
     Returns:
-      None on any errors
-      Mapping of DTO formatted string, e.g. JSON string representation
+      list of keys that were not added because they are already in cache
     """
-    if not self.is_caching_supported(category, resource):
-      return None
-    cache_key = self.get_key(category, resource)
-    if cache_key is None:
-      return None
-    if self.cache_entries is None:
-      return None
-    entries = self.cache_entries.get(cache_key)
-    if entries is None:
-      return None
-
     # TODO(dan): Should we perform deep copy of data
-    for key in data.keys():
-      entries[key] = data.get(key)
-
-    return entries
+    failed = []
+    for key, value in data.iteritems():
+      if key in self.cache_entries:
+        failed.append(key)
+      else:
+        self.cache_entries[key] = value
+    return failed
 
-  def update(self, category, resource, data, expiration_time=0):
-    """ Update data in local cache for the specified data
-    TODO(dan): updates is not available for local cache
-    """
-    return None
+  def update_multi(self, data, expiration_time=0):
+    """ Update multiple entries that are in local cache
 
-  def remove(self, category, resource, data, lockadd_seconds=0):
-    """ Remove data from local cache for the specified data
     Args:
-      category: collection or stub
-      resource: regulation, controls, etc.
-      data: List of keys
+      data: dictionary containing keys and values
 
     Returns:
-      None on any errors
-      mapping of DTO formatted string, e.g. JSON string representation
+      list of keys that were not updated because they are not in cache
     """
-    if not self.is_caching_supported(category, resource):
-      return None
-    cache_key = self.get_key(category, resource)
-    if cache_key is None:
-      return None
-    if self.cache_entries is None:
-      return None
-    entries = self.cache_entries.get(cache_key)
-
-    for key in data.keys():
-      del entries[key]
-
-    return entries
-
-  def get_data(self, keys, cacheitems, attrs):
-    """ Get data from cache for the given set of keys and attributes in cache
-        TODO(dan): all or none default policy is implemeted here, it should be
-        in cachemanager
-    Args:
-      keys: set of keys to search from local cache
-      cacheitems: cache entries
-      attrs:  set of attributes to search from local cache
-
-    Returns:
-      None on any errors
-      mapping of DTO formatted string, e.g. JSON string representation
-    """
-    data = OrderedDict()
-
-    for key in keys:
-      if key not in cacheitems:
-        #  ALL or None Policy: if a key is not in cache, stop processing and
-        #  continue as before going to Data-ORM layer
-        return None
-      attrvalues = cacheitems.get(key)
-      targetattrs = None
-      if attrs is None and attrvalues is not None:
-        targetattrs = attrvalues.keys()
-      elif attrvalues is None:
-        # Do nothing as there are no attrs to get
-        continue
+    failed = []
+    for key, value in data.iteritems():
+      if key in self.cache_entries:
+        self.cache_entries[key] = value
       else:
-        targetattrs = attrs
+        failed.append(key)
+    return failed
 
-      attr_dict = {}
-      for attr in targetattrs:
-        if attr in attrvalues:
-          attr_dict[attr] = attrvalues.get(attr)
+  def remove_multi(self, data, lockadd_seconds=0):
+    """ Remove multiple entries from local cache
 
-      data[key] = attr_dict
+    Args:
+      data: list of keys
 
-    return data
+    Returns:
+      True, keys that are not in cache are skipped
+    """
+    for key in data:
+      self.cache_entries.pop(key, None)
+    return True
 
   def clean(self):
     """ Cleanup
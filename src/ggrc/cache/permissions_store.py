@@ -0,0 +1,227 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Compact binary storage of cached user permissions.
+
+Cached permissions are split in two parts:
+
+  - role permissions: contexts and conditions from user roles, default and
+    admin permissions. This part is small and is stored pickled and
+    compressed;
+  - resource permissions: object ids loaded from the access control list.
+    This part can contain tens of thousands of ids, so every action and
+    resource type pair is stored as a compressed sorted array of 32 bit
+    integers.
+
+Blob layout (header, section and count numbers are in network byte order,
+resource ids are little-endian):
+
+  "!4sI"  magic and format version, length of the role part
+  role part
+  repeated resource sections:
+    "!BH"   action index in ACTIONS, length of resource type name
+    resource type name
+    "!II"   number of ids, length of compressed ids
+    zlib compressed differences between consecutive ids (the first id for
+    the first one) as little-endian 32 bit integers
+
+Sorted ids of objects created over time are close to each other, so their
+differences are small numbers that compress well.
+
+Resource arrays are decompressed and decoded lazily on the first access, so
+a request that checks permissions for a couple of types does not decode the
+whole blob.
+The arrays support in place additions and removals, which allows patching
+cached permissions when individual access control list rows change.
+"""
+
+import array
+import bisect
+import collections
+import cPickle
+import itertools
+import struct
+import sys
+import zlib
+
+
+MAGIC = "GPS2"
+
+# Memcache does not store values larger than 1MB.
+MAX_VALUE_SIZE = 1000000
+
+ACTIONS = ("read", "update", "delete")
+
+_HEADER = struct.Struct("!4sI")
+_SECTION = struct.Struct("!BH")
+_COUNT = struct.Struct("!II")
+
+_TYPECODE = "i"
+
+
+class ResourceIds(collections.Set):
+  """Sorted set of integer resource ids backed by an array.
+
+  The set can be created from compressed bytes and the number of ids, in
+  which case the bytes are converted to an array only when the ids are
+  accessed for the first time.
+  """
+
+  def __init__(self, ids=(), raw=None, count=0):
+    self._raw = raw
+    self._count = count
+    self._ids = None
+    if raw is None:
+      self._ids = array.array(_TYPECODE, sorted(set(ids)))
+
+  @property
+  def ids(self):
+    """Array with sorted resource ids."""
+    if self._ids is None:
+      ids = array.array(_TYPECODE)
+      ids.fromstring(zlib.decompress(self._raw))
+      if sys.byteorder != "little":
+        ids.byteswap()
+      total = 0
+      for index, delta in enumerate(ids):
+        total += delta
+        ids[index] = total
+      self._ids = ids
+      self._raw = None
+    return self._ids
+
+  def _index(self, id_):
+    return bisect.bisect_left(self.ids, id_)
+
+  def __contains__(self, id_):
+    if not isinstance(id_, (int, long)):
+      return False
+    index = self._index(id_)
+    return index < len(self.ids) and self.ids[index] == id_
+
+  def __iter__(self):
+    return iter(self.ids)
+
+  def __len__(self):
+    if self._ids is None:
+      return self._count
+    return len(self._ids)
+
+  def add(self, id_):
+    if id_ not in self:
+      self.ids.insert(self._index(id_), id_)
+
+  def discard(self, id_):
+    if id_ in self:
+      self.ids.pop(self._index(id_))
+
+  def to_bytes(self):
+    """Get little-endian binary representation of ids."""
+    if sys.byteorder != "little":
+      ids = array.array(_TYPECODE, self.ids)
+      ids.byteswap()
+      return ids.tostring()
+    return self.ids.tostring()
+
+  def to_compressed(self):
+    """Get compressed little-endian differences between ids."""
+    if self._ids is None:
+      return self._raw
+    ids = self._ids
+    deltas = array.array(_TYPECODE, ids[:1])
+    deltas.extend(current - previous
+                  for previous, current in itertools.izip(ids, ids[1:]))
+    if sys.byteorder != "little":
+      deltas.byteswap()
+    return zlib.compress(deltas.tostring())
+
+  def __repr__(self):
+    return "ResourceIds({!r})".format(list(self))
+
+
+def _split_permissions(permissions):
+  """Split permissions dict into role part and resource sets."""
+  roles = {}
+  resources = []
+  for action, types in permissions.iteritems():
+    roles[action] = {}
+    for resource_type, data in types.iteritems():
+      data = dict(data)
+      ids = data.pop("resources", None)
+      if ids and action in ACTIONS:
+        resources.append((action, resource_type, ids))
+      elif ids:
+        data["resources"] = ids
+      roles[action][resource_type] = data
+  return roles, resources
+
+
+def dumps(permissions):
+  """Serialize permissions dict into the binary format."""
+  roles, resources = _split_permissions(permissions)
+  role_part = zlib.compress(cPickle.dumps(roles, cPickle.HIGHEST_PROTOCOL))
+  chunks = [_HEADER.pack(MAGIC, len(role_part)), role_part]
+  for action, resource_type, ids in resources:
+    if not isinstance(ids, ResourceIds):
+      ids = ResourceIds(ids)
+    type_name = str(resource_type)
+    chunks.append(_SECTION.pack(ACTIONS.index(action), len(type_name)))
+    chunks.append(type_name)
+    raw = ids.to_compressed()
+    chunks.append(_COUNT.pack(len(ids), len(raw)))
+    chunks.append(raw)
+  return "".join(chunks)
+
+
+def loads(data):
+  """Deserialize permissions dict from the binary format.
+
+  Returns:
+    permissions dict where resources are ResourceIds instances, or None if
+    data is not in the expected format.
+  """
+  if not data or len(data) < _HEADER.size:
+    return None
+  magic, role_size = _HEADER.unpack_from(data)
+  if magic != MAGIC:
+    return None
+  offset = _HEADER.size
+  permissions = cPickle.loads(zlib.decompress(data[offset:offset + role_size]))
+  offset += role_size
+  while offset < len(data):
+    action_index, name_size = _SECTION.unpack_from(data, offset)
+    offset += _SECTION.size
+    resource_type = data[offset:offset + name_size]
+    offset += name_size
+    count, raw_size = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    raw = data[offset:offset + raw_size]
+    offset += raw_size
+    permissions.setdefault(ACTIONS[action_index], {})\
+        .setdefault(resource_type, {})["resources"] = ResourceIds(
+            raw=raw, count=count)
+  return permissions
+
+
+def patch_resource(permissions, object_type, object_id, allowed_actions):
+  """Set resource permissions for a single object in permissions dict.
+
+  Args:
+    permissions: permissions dict loaded with `loads`.
+    object_type: type name of the object.
+    object_id: id of the object.
+    allowed_actions: set of actions the user is allowed to do with the object
+        after the change.
+  """
+  for action in ACTIONS:
+    if action in allowed_actions:
+      permissions.setdefault(action, {})\
+          .setdefault(object_type, {})\
+          .setdefault("resources", ResourceIds())\
+          .add(object_id)
+    else:
+      resources = permissions.get(action, {})\
+          .get(object_type, {})\
+          .get("resources")
+      if resources is not None:
+        resources.discard(object_id)
@@ -3,17 +3,37 @@
 
 """Common operations on cache managers."""
 
+import itertools
 import logging
+from collections import defaultdict
 
 import flask
+import sqlalchemy as sa
 
 from ggrc import cache
+from ggrc import db
 import ggrc.models
 from ggrc import settings
+from ggrc import utils
+from ggrc.cache import permissions_store
 
 
 logger = logging.getLogger(__name__)
 
+PERMISSION_CACHE_TIMEOUT = 3600  # 60 minutes
+PERMISSION_PATCH_RETRIES = 3
+
+# Attributes holding types of objects that are affected by the change of a
+# polymorphic object such as Relationship or AccessControlList.
+QUERY_RELATED_TYPE_ATTRS = (
+    "source_type",
+    "destination_type",
+    "object_type",
+    "attributable_type",
+    "parent_type",
+    "child_type",
+)
+
 
 def get_cache_manager():
   """Returns an instance of CacheManager."""
@@ -52,10 +72,81 @@ def get_cache_class(obj):
   return obj.__class__.__name__
 
 
+def get_query_generation_key(model_name):
+  """Returns a key of query results generation for the model."""
+  return 'query:generation:{}'.format(model_name)
+
+
+def get_query_model_names(o):
+  """Returns names of models whose query results depend on the object."""
+  model_names = {get_cache_class(o)}
+  for attr in QUERY_RELATED_TYPE_ATTRS:
+    value = getattr(o, attr, None)
+    if isinstance(value, basestring):
+      model_names.add(value)
+  return model_names
+
+
+def get_query_keys_for_expiration(o):
+  """Returns query generation keys of models affected by object change."""
+  return [get_query_generation_key(name)
+          for name in get_query_model_names(o)]
+
+
+def add_query_changes(model_names):
+  """Record models whose query results change in the current transaction.
+
+  Query generations of the models are dropped after commit. Objects changed
+  in flushes are recorded by collect_query_changes, writers that change
+  tables with plain SQL statements have to record their models themselves.
+  """
+  if not getattr(settings, 'MEMCACHE_MECHANISM', False):
+    return
+  if not flask.has_app_context() or not model_names:
+    return
+  flask.g.query_changed_models = (
+      getattr(flask.g, "query_changed_models", set()) | set(model_names))
+
+
+def collect_query_changes(session, flush_context):
+  """Record models of objects changed in a flush."""
+  # pylint: disable=unused-argument
+  model_names = set()
+  for obj in itertools.chain(session.new, session.dirty, session.deleted):
+    model_names.update(get_query_model_names(obj))
+  add_query_changes(model_names)
+
+
+def expire_query_results(session):
+  """Drop query generations of models changed in the committed transaction.
+
+  Results cached for the dropped generations are never read again.
+  """
+  # pylint: disable=unused-argument
+  if not flask.has_app_context():
+    return
+  model_names = getattr(flask.g, "query_changed_models", None)
+  if not model_names:
+    return
+  del flask.g.query_changed_models
+  keys = [get_query_generation_key(name) for name in sorted(model_names)]
+  try:
+    get_cache_manager().cache_object.memcache_client.delete_multi(keys)
+  except Exception:  # pylint: disable=broad-except
+    logger.exception("CACHE: Failed to drop query generations")
+
+
+def drop_query_changes(session):
+  """Forget models recorded in a transaction that was rolled back."""
+  # pylint: disable=unused-argument
+  if flask.has_app_context() and hasattr(flask.g, "query_changed_models"):
+    del flask.g.query_changed_models
+
+
 def get_related_keys_for_expiration(context, o):
   """Returns a list for expiration."""
   cls = get_cache_class(o)
-  keys = []
+  keys = get_query_keys_for_expiration(o)
   mappings = context.cache_manager.supported_mappings.get(cls, [])
 
   for (cls, attr, polymorph) in mappings:
@@ -96,6 +187,9 @@ def memcache_mark_for_deletion(context, objects_to_mark):
       context.cache_manager.marked_for_delete.append(key)
       context.cache_manager.marked_for_delete.extend(
           get_related_keys_for_expiration(context, o))
+    else:
+      context.cache_manager.marked_for_delete.extend(
+          get_query_keys_for_expiration(o))
 
 
 def update_memcache_before_commit(context, modified_objects, expiry_time):
@@ -170,26 +264,18 @@ def update_memcache_after_commit(context):
       related_objs.append((obj_list[0], None))
   memcache_mark_for_deletion(context, related_objs)
 
-  # TODO(dan): check for duplicates in marked_for_delete
-  if cache_manager.marked_for_delete:
-    delete_result = cache_manager.bulk_delete(
-        cache_manager.marked_for_delete, 0)
+  # Cached items and their status entries are removed with a single
+  # delete_multi call.
+  marked_keys = set(cache_manager.marked_for_delete)
+  keys = marked_keys | {'DeleteOp:' + str(key) for key in marked_keys}
+  if keys:
+    delete_result = cache_manager.bulk_delete(list(keys), 0)
     # TODO(dan): handling failure including network errors,
     #            currently we log errors
     if delete_result is not True:
       logger.error("CACHE: Failed to remove collection from cache")
 
-  status_entries = []
-  for key in cache_manager.marked_for_delete:
-    status_entries.append('DeleteOp:' + str(key))
-  if status_entries:
-    delete_result = cache_manager.bulk_delete(status_entries, 0)
-    # TODO(dan): handling failure including network errors,
-    #            currently we log errors
-    if delete_result is not True:
-      logger.error("CACHE: Failed to remove status entries from cache")
-
-  clear_permission_cache()
+  update_permission_cache()
   cache_manager.clear_cache()
 
 
@@ -208,6 +294,104 @@ def build_cache_status(data, key, expiry_timeout, status):
   data[key] = {'expiry': expiry_timeout, 'status': status}
 
 
+def add_permission_changes(acl_ids=(), acl_keys=(), outdated=False):
+  """Record permission changes of the current request.
+
+  Cached permissions of affected users are patched after commit with
+  update_permission_cache. Changes that can not be patched mark cached
+  permissions of all users as outdated.
+
+  Args:
+    acl_ids: ids of new ACL rows. Keys of their propagated rows are
+        collected after commit, when propagation is done.
+    acl_keys: (person_id, object_type, object_id) tuples of deleted ACL rows
+        and rows propagated from them.
+    outdated: True if the request changed permissions in a way that can not
+        be patched.
+  """
+  if not getattr(settings, 'MEMCACHE_MECHANISM', False):
+    return
+  if not flask.has_app_context():
+    return
+  if acl_ids:
+    flask.g.permission_acl_ids = (
+        getattr(flask.g, "permission_acl_ids", set()) | set(acl_ids))
+  if acl_keys:
+    flask.g.permission_acl_keys = (
+        getattr(flask.g, "permission_acl_keys", set()) | set(acl_keys))
+  if outdated:
+    flask.g.permissions_outdated = True
+
+
+def get_acl_keys(acl_ids, connection=None):
+  """Get keys of ACL rows and of all rows propagated from them.
+
+  Args:
+    acl_ids: ids of ACL rows.
+    connection: connection to run queries with, defaults to db session.
+
+  Returns:
+    set of (person_id, object_type, object_id) tuples.
+  """
+  executor = connection if connection is not None else db.session
+  acl_table = ggrc.models.all_models.AccessControlList.__table__
+  keys = set()
+  column = acl_table.c.id
+  ids = sorted(acl_ids)
+  while ids:
+    next_ids = []
+    for ids_chunk in utils.list_chunks(ids):
+      query = sa.select([
+          acl_table.c.id,
+          acl_table.c.person_id,
+          acl_table.c.object_type,
+          acl_table.c.object_id,
+      ]).where(
+          column.in_(ids_chunk)
+      )
+      for id_, person_id, object_type, object_id in executor.execute(query):
+        next_ids.append(id_)
+        keys.add((person_id, object_type, object_id))
+    column = acl_table.c.parent_id
+    ids = next_ids
+  return keys
+
+
+def before_acl_delete(_, connection, target):
+  """Record keys of a deleted ACL row and of its propagated rows.
+
+  Propagated rows are removed by the database cascade, so their keys are
+  collected before the row is deleted.
+  """
+  if not getattr(settings, 'MEMCACHE_MECHANISM', False):
+    return
+  if target.id is not None:
+    add_permission_changes(acl_keys=get_acl_keys([target.id], connection))
+
+
+def update_permission_cache():
+  """Apply permission changes recorded in the current request to cache.
+
+  Cached permissions of users with changed ACL rows are patched. Cached
+  permissions of all users are dropped only if the request contains changes
+  that can not be patched.
+  """
+  acl_ids = getattr(flask.g, "permission_acl_ids", set())
+  acl_keys = getattr(flask.g, "permission_acl_keys", set())
+  outdated = getattr(flask.g, "permissions_outdated", False)
+  for name in ("permission_acl_ids", "permission_acl_keys",
+               "permissions_outdated"):
+    if hasattr(flask.g, name):
+      delattr(flask.g, name)
+  if outdated:
+    clear_permission_cache()
+    return
+  if acl_ids:
+    acl_keys = acl_keys | get_acl_keys(acl_ids)
+  if acl_keys:
+    update_users_permission_cache(acl_keys)
+
+
 def clear_permission_cache():
   """Drop cached permissions for all users."""
   if not getattr(settings, 'MEMCACHE_MECHANISM', False):
@@ -231,3 +415,103 @@ def clear_users_permission_cache(user_ids):
     if key in cached_keys_set:
       cached_keys_set.remove(key)
   client.set('permissions:list', cached_keys_set)
+
+
+def _get_acl_actions(acl_keys):
+  """Get allowed actions for person and object pairs from ACL.
+
+  Args:
+    acl_keys: set of (person_id, object_type, object_id) tuples.
+
+  Returns:
+    dict with allowed action names for every given key.
+  """
+  acl = ggrc.models.all_models.AccessControlList
+  acr = ggrc.models.all_models.AccessControlRole
+  query = db.session.query(
+      acl.person_id,
+      acl.object_type,
+      acl.object_id,
+      sa.func.max(acr.read),
+      sa.func.max(acr.update),
+      sa.func.max(acr.delete),
+  ).filter(
+      acl.ac_role_id == acr.id,
+      sa.tuple_(acl.person_id, acl.object_type, acl.object_id).in_(
+          list(acl_keys)
+      ),
+  ).group_by(
+      acl.person_id,
+      acl.object_type,
+      acl.object_id,
+  )
+  actions = {key: set() for key in acl_keys}
+  for person_id, object_type, object_id, read, update, delete in query:
+    allowed = zip(permissions_store.ACTIONS, (read, update, delete))
+    actions[(person_id, object_type, object_id)] = {
+        action for action, is_allowed in allowed if is_allowed
+    }
+  return actions
+
+
+def _patch_user_permissions(client, key, acl_actions):
+  """Patch cached permissions blob with compare-and-set.
+
+  Returns:
+    True if cached permissions were patched or are missing, False if they
+    could not be patched.
+  """
+  for _ in range(PERMISSION_PATCH_RETRIES):
+    data = client.gets(key)
+    if data is None:
+      return True
+    permissions = permissions_store.loads(data)
+    if permissions is None:
+      return False
+    for (_, object_type, object_id), actions in acl_actions.iteritems():
+      permissions_store.patch_resource(permissions, object_type, object_id,
+                                       actions)
+    data = permissions_store.dumps(permissions)
+    if len(data) > permissions_store.MAX_VALUE_SIZE:
+      return False
+    if client.cas(key, data, PERMISSION_CACHE_TIMEOUT):
+      return True
+  return False
+
+
+def update_users_permission_cache(acl_keys):
+  """Patch cached permissions after changes of individual ACL rows.
+
+  Instead of dropping the whole cached permissions of affected users, only
+  entries for the changed objects are recalculated and updated in place.
+  Users whose cached permissions can not be patched get them dropped.
+
+  Args:
+    acl_keys: iterable of (person_id, object_type, object_id) tuples of
+        created, updated or deleted ACL rows.
+  """
+  if not getattr(settings, 'MEMCACHE_MECHANISM', False):
+    return
+  acl_keys = {
+      key for key in acl_keys
+      if key[1] != ggrc.models.all_models.Relationship.__name__
+  }
+  if not acl_keys:
+    return
+  client = get_cache_manager().cache_object.memcache_client
+  cached_keys_set = client.get('permissions:list') or set()
+  user_keys = {
+      key for key in acl_keys
+      if 'permissions:{}'.format(key[0]) in cached_keys_set
+  }
+  if not user_keys:
+    return
+  actions_by_user = defaultdict(dict)
+  for acl_key, actions in _get_acl_actions(user_keys).iteritems():
+    actions_by_user[acl_key[0]][acl_key] = actions
+  failed_user_ids = [
+      user_id for user_id, acl_actions in actions_by_user.iteritems()
+      if not _patch_user_permissions(
+          client, 'permissions:{}'.format(user_id), acl_actions)
+  ]
+  clear_users_permission_cache(failed_user_ids)
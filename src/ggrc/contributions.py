@@ -3,8 +3,10 @@
 
 """Lists of ggrc contributions."""
 
+from ggrc.fulltext import reindex_queue
 from ggrc.integrations import synchronization_jobs
 from ggrc.models import import_export
+from ggrc.models import revision_storage
 from ggrc.notifications import common
 from ggrc.notifications import notification_handlers
 from ggrc.notifications import data_handlers
@@ -14,6 +16,7 @@ from ggrc.utils import proposal
 NIGHTLY_CRON_JOBS = [
     common.send_daily_digest_notifications,
     import_export.clear_overtimed_tasks,
+    revision_storage.start_compaction,
 ]
 
 HOURLY_CRON_JOBS = [
@@ -25,6 +28,10 @@ HALF_HOUR_CRON_JOBS = [
     proposal.send_notification,
 ]
 
+MINUTE_CRON_JOBS = [
+    reindex_queue.drain,
+]
+
 NOTIFICATION_LISTENERS = [
     notification_handlers.register_handlers
 ]
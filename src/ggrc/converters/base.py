@@ -15,6 +15,7 @@ from ggrc.cache.memcache import MemCache
 from ggrc.converters import get_exportables
 from ggrc.converters import import_helper
 from ggrc.converters import base_block
+from ggrc.converters import parallel
 from ggrc.converters.snapshot_block import SnapshotBlockConverter
 from ggrc.converters.import_helper import extract_relevant_data
 from ggrc.converters.import_helper import split_blocks
@@ -80,6 +81,15 @@ class ImportConverter(BaseConverter):
       yield block_converter
 
   def import_csv_data(self):
+    if self.dry_run and parallel.is_enabled():
+      groups = parallel.group_blocks(self.csv_data)
+      if len(groups) > 1:
+        self.response_data.extend(parallel.analyze_blocks(
+            self.csv_data, groups, login.get_current_user().id
+        ))
+        self.drop_cache()
+        return
+
     revision_ids = []
 
     for converter in self.initialize_block_converters():
@@ -162,13 +172,33 @@ class ExportConverter(BaseConverter):
     with benchmark("Build csv data."):
       return self.build_csv_from_row_data()
 
-  def build_csv_from_row_data(self):
-    """Export each block separated by empty lines."""
+  def stream_csv_data(self, output):
+    """Export csv data into a file-like object.
+
+    Rows are written to the output as soon as they are generated, so the
+    whole csv file is never held in memory.
+    """
+    with benchmark("Initialize block converters."):
+      self.initialize_block_converters()
+    with benchmark("Stream csv data."):
+      self.write_csv_from_row_data(CsvStringBuilder(self._table_width,
+                                                    output_buffer=output))
+
+  @property
+  def _table_width(self):
+    """Width of the exported table with the 'Object type' column."""
     table_width = max([converter.block_width
                        for converter in self.block_converters])
-    table_width += 1  # One line for 'Object line' column
+    return table_width + 1  # One line for 'Object line' column
 
-    csv_string_builder = CsvStringBuilder(table_width)
+  def build_csv_from_row_data(self):
+    """Export each block separated by empty lines."""
+    csv_string_builder = CsvStringBuilder(self._table_width)
+    self.write_csv_from_row_data(csv_string_builder)
+    return csv_string_builder.get_csv_string()
+
+  def write_csv_from_row_data(self, csv_string_builder):
+    """Write each block separated by empty lines into csv builder."""
     for block_converter in self.block_converters:
       csv_header = block_converter.generate_csv_header()
       csv_header[0].insert(0, "Object type")
@@ -183,5 +213,3 @@ class ExportConverter(BaseConverter):
 
       csv_string_builder.append_line([])
       csv_string_builder.append_line([])
-
-    return csv_string_builder.get_csv_string()
@@ -246,11 +246,19 @@ def calculate_computed_attributes(revision_ids, user_id):
 class CsvStringBuilder(object):
   """CSV string builder."""
 
-  def __init__(self, table_width):
-    """Basic initialization."""
+  def __init__(self, table_width, output_buffer=None):
+    """Basic initialization.
+
+    Args:
+      table_width: number of columns in every csv line.
+      output_buffer: file-like object that receives csv lines. In-memory
+          buffer is used if it is not specified.
+    """
     self.table_width = table_width
 
-    self.output_buffer = StringIO()
+    if output_buffer is None:
+      output_buffer = StringIO()
+    self.output_buffer = output_buffer
     self.csv_writer = csv.writer(self.output_buffer)
 
   @staticmethod
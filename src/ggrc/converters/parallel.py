@@ -0,0 +1,173 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Parallel analysis (dry run) of import blocks.
+
+Blocks of an imported file can depend on each other: a block can map or
+reference objects created by a previous block, and blocks of objects with
+shared unique rules check code and title uniqueness together. Blocks are
+split into groups of such dependent blocks and every group is analyzed in a
+separate worker process with its own database connection and its own block
+caches. Blocks inside a group are processed in file order, and the results
+are returned in the original block order.
+
+The commit phase of imports is always done serially.
+"""
+
+import multiprocessing
+import re
+from logging import getLogger
+
+from flask import g
+
+from ggrc import db
+from ggrc import settings
+from ggrc.converters import get_exportables
+from ggrc.converters import get_shared_unique_rules
+from ggrc.converters.import_helper import extract_relevant_data
+from ggrc.converters.import_helper import split_blocks
+
+
+logger = getLogger(__name__)
+
+IDENTIFIER_COLUMNS = {"code", "email"}
+
+TOKEN_SEPARATOR = re.compile(r"[\s,;]+", re.UNICODE)
+
+
+def is_enabled():
+  """Check if blocks can be analyzed in worker processes.
+
+  App Engine standard environment does not allow to spawn processes.
+  """
+  return (getattr(settings, "IMPORT_ANALYSIS_WORKERS", 0) > 1 and
+          not getattr(settings, "APP_ENGINE", False))
+
+
+def _tokens(cell):
+  """Get lowercase tokens from a csv cell."""
+  return {token for token in TOKEN_SEPARATOR.split(cell.lower()) if token}
+
+
+def _block_data(data):
+  """Get object class, identifiers and references of an import block.
+
+  Returns:
+    tuple of object class, set of values from identifier columns and set of
+    tokens from all other columns.
+  """
+  class_name = data[1][0].strip().lower()
+  object_class = get_exportables().get(class_name)
+  raw_headers, rows = extract_relevant_data(data)
+  id_indexes = {
+      index for index, header in enumerate(raw_headers)
+      if header.strip("*").lower() in IDENTIFIER_COLUMNS
+  }
+  identifiers = set()
+  references = set()
+  for row in rows:
+    for index, cell in enumerate(row):
+      if index in id_indexes:
+        identifiers.add(cell.strip().lower())
+      else:
+        references |= _tokens(cell)
+  identifiers.discard(u"")
+  return object_class, identifiers, references
+
+
+def group_blocks(csv_data):
+  """Split import blocks into groups of dependent blocks.
+
+  Blocks are dependent if they contain objects of the same type or of types
+  with shared unique rules, or if one block references an identifier of an
+  object from the other block.
+
+  Returns:
+    list of lists of block indexes, indexes in each group are sorted.
+  """
+  blocks = [_block_data(data) for _, data, _ in split_blocks(csv_data)]
+  parents = range(len(blocks))
+
+  def find(index):
+    while parents[index] != index:
+      parents[index] = parents[parents[index]]
+      index = parents[index]
+    return index
+
+  def union(first, second):
+    parents[find(first)] = find(second)
+
+  sharing_rules = get_shared_unique_rules()
+  for first, (first_class, first_ids, first_refs) in enumerate(blocks):
+    first_shared = sharing_rules.get(first_class, first_class)
+    for second in range(first + 1, len(blocks)):
+      second_class, second_ids, second_refs = blocks[second]
+      if (first_shared == sharing_rules.get(second_class, second_class) or
+              first_ids & second_refs or second_ids & first_refs):
+        union(first, second)
+
+  groups = {}
+  for index in range(len(blocks)):
+    groups.setdefault(find(index), []).append(index)
+  return sorted(groups.values())
+
+
+def _analyze_group(args):
+  """Worker process entry point: analyze a group of blocks.
+
+  Returns:
+    list of tuples with block index and block info.
+  """
+  csv_data, block_indexes, user_id = args
+  from ggrc.app import app
+  from ggrc.converters.base import ImportConverter
+  from ggrc.models import all_models
+  with app.app_context():
+    try:
+      setattr(g, "_current_user", all_models.Person.query.get(user_id))
+      converter = ImportConverter(dry_run=True, csv_data=csv_data)
+      results = []
+      block_converters = converter.initialize_block_converters()
+      for index, block_converter in enumerate(block_converters):
+        if index not in block_indexes:
+          continue
+        if not block_converter.ignore:
+          block_converter.import_csv_data()
+        results.append((index, block_converter.get_info()))
+      return results
+    finally:
+      db.session.rollback()
+      db.session.remove()
+
+
+def analyze_blocks(csv_data, groups, user_id):
+  """Analyze groups of import blocks in worker processes.
+
+  The current session is rolled back and all pooled connections are closed
+  before the workers are forked, so that no database connection is shared
+  between processes.
+
+  Args:
+    csv_data: parsed csv file.
+    groups: list of lists of block indexes as returned by group_blocks.
+    user_id: id of the user who runs the import.
+
+  Returns:
+    list of block infos in the original block order.
+  """
+  workers = min(settings.IMPORT_ANALYSIS_WORKERS, len(groups))
+  logger.info("Analyzing %s import block groups with %s workers",
+              len(groups), workers)
+  db.session.rollback()
+  db.engine.dispose()
+  pool = multiprocessing.Pool(processes=workers)
+  try:
+    group_results = pool.map(
+        _analyze_group,
+        [(csv_data, set(group), user_id) for group in groups],
+    )
+  finally:
+    pool.close()
+    pool.join()
+  results = sorted(info for infos in group_results for info in infos)
+  return [info for _, info in results]
@@ -14,6 +14,18 @@ Relationships are tuples with:
 Glossary:
 aggregate object = object from which the computed value is read
 computed object = object which will get the new computed value
+
+
+Values are computed incrementally. Stored (source_id, value) pairs of
+computed objects are kept as attribute state for a run of
+compute_attributes, and a changed aggregate value is merged into the state
+of related computed objects without reading their other aggregates. This is
+possible as long as the current source of the value stays valid, so objects
+whose source value decreased or was removed, objects without a stored value
+and objects changed themselves are recomputed from all their aggregates.
+Only values that differ from the stored ones are written. A full reindex of
+all latest revisions does not trust the stored values and recomputes and
+writes the values of all affected objects.
 """
 
 import datetime
@@ -21,10 +33,13 @@ import collections
 import logging
 
 import sqlalchemy as sa
+from sqlalchemy import orm
 
 from ggrc import db
 from ggrc import login
 from ggrc import utils
+from ggrc.cache import utils as cache_utils
+from ggrc.fulltext import trigrams
 from ggrc.utils import revisions as revision_utils, helpers
 from ggrc.utils import benchmark
 from ggrc.models import all_models as models
@@ -85,9 +100,23 @@ INDEX_REPLACE_STATEMENT = """
 """
 CA_CHUNK_SIZE = 500
 
+FIELD_TYPES = ("value_datetime", "value_integer", "value_string")
+
 logger = logging.getLogger(__name__)
 
 
+ComputedAttribute = collections.namedtuple("ComputedAttribute", [
+    "attribute_template_id",
+    "attribute_definition_id",
+    "name",
+    "computed_type",
+    "aggregate_type",
+    "aggregate_field",
+    "function_name",
+    "field_type",
+])
+
+
 def get_computed_attributes():
   """Get all data platform attribute templates with computed flag."""
   return db.session.query(
@@ -101,20 +130,34 @@ def get_computed_attributes():
   ).all()
 
 
-def get_aggregate_type(attribute):
-  afn = attribute.attribute_definition.attribute_type.aggregate_function
-  return afn.split()[0]
-
+def load_computed_attributes():
+  """Get computed attributes as plain tuples.
 
-def get_aggregate_field(attribute):
-  afn = attribute.attribute_definition.attribute_type.aggregate_function
-  return afn.split()[1]
+  Unlike attribute templates, these are not expired on commit, so they are
+  loaded once and reused for all revision chunks.
+  """
+  attributes = []
+  for template in get_computed_attributes():
+    definition = template.attribute_definition
+    attribute_type = definition.attribute_type
+    aggregate_type, aggregate_field, function_name = (
+        attribute_type.aggregate_function.split()[:3])
+    attributes.append(ComputedAttribute(
+        attribute_template_id=template.attribute_template_id,
+        attribute_definition_id=definition.attribute_definition_id,
+        name=definition.name,
+        computed_type=template.object_template.name,
+        aggregate_type=aggregate_type,
+        aggregate_field=aggregate_field,
+        function_name=function_name,
+        field_type=attribute_type.field_type,
+    ))
+  return attributes
 
 
 def get_aggregate_function(attribute):
   """Get actual computed function from aggregate function field."""
-  afn = attribute.attribute_definition.attribute_type.aggregate_function
-  function_name = afn.split()[2]
+  function_name = attribute.function_name
   if function_name == "max":
     def max_(aggregate_values, rel_map):
       """Get maximum value and id from which the value was taken."""
@@ -149,6 +192,65 @@ def get_aggregate_function(attribute):
   raise AttributeError("Attribute aggregate_function contains invalid data.")
 
 
+def _get_field_name(attr):
+  """Get name of the attributes table column holding the attribute value."""
+  if attr.field_type in FIELD_TYPES:
+    return attr.field_type
+  return "value_datetime"
+
+
+class AttributeState(object):
+  """Stored values of computed attributes.
+
+  Values are (source_id, value) pairs, or None for objects without a stored
+  value. They are loaded from the attributes table once and then kept in sync
+  with the written values, so that later revision chunks of the same run do
+  not read them again.
+  """
+
+  def __init__(self):
+    self._values = {}
+
+  def load(self, attr, objects):
+    """Load stored values of objects that are not in the state yet."""
+    template_id = attr.attribute_template_id
+    missing = [obj for obj in objects
+               if (template_id, obj) not in self._values]
+    for chunk in utils.list_chunks(missing):
+      query = db.session.query(
+          models.Attributes.object_type,
+          models.Attributes.object_id,
+          models.Attributes.source_id,
+          models.Attributes.value_datetime,
+          models.Attributes.value_integer,
+          models.Attributes.value_string,
+      ).filter(
+          models.Attributes.attribute_template_id == template_id,
+          sa.tuple_(
+              models.Attributes.object_type,
+              models.Attributes.object_id,
+          ).in_(chunk),
+      )
+      field_name = _get_field_name(attr)
+      stored = {
+          (row.object_type, row.object_id): (
+              row.source_id,
+              getattr(row, field_name),
+          )
+          for row in query
+      }
+      for obj in chunk:
+        self._values[(template_id, obj)] = stored.get(obj)
+
+  def get(self, attr, obj):
+    return self._values.get((attr.attribute_template_id, obj))
+
+  def update(self, attr, values):
+    """Set written (source_id, value) pairs of objects."""
+    for obj, value in values.iteritems():
+      self._values[(attr.attribute_template_id, obj)] = value
+
+
 def _get_group_key(revision, aggregate_type, computed_object):
   """Get key for aggregate objects group.
 
@@ -181,10 +283,8 @@ def group_revisions(attributes, revisions):
   """Group revisions under attributes with correct group keys."""
   groups = collections.defaultdict(lambda: collections.defaultdict(set))
   for attr in attributes:
-    aggregate_type = get_aggregate_type(attr)
-    computed_object = attr.object_template.name
     for revision in revisions:
-      key = _get_group_key(revision, aggregate_type, computed_object)
+      key = _get_group_key(revision, attr.aggregate_type, attr.computed_type)
       if key:
         groups[attr][key].add((revision.resource_type, revision.resource_id))
   return groups
@@ -202,8 +302,8 @@ def _objects_from_snapshots(snapshots):
   ).distinct())
 
 
-def _get_objects_from_aggregates(aggregate_objects, computed_object_type):
-  """Get tuples of all original objects linked to aggregate_objects.
+def _get_aggregate_relationships(aggregate_objects, computed_object_type):
+  """Get relationships of aggregate_objects to their computed objects.
 
   args:
     aggregate_objects: tuples of object type and object id
@@ -215,6 +315,8 @@ def _get_objects_from_aggregates(aggregate_objects, computed_object_type):
 
   # Related original objects
   src = db.session.query(
+      models.Relationship.destination_type,
+      models.Relationship.destination_id,
       models.Relationship.source_type,
       models.Relationship.source_id,
   ).filter(
@@ -225,6 +327,8 @@ def _get_objects_from_aggregates(aggregate_objects, computed_object_type):
       models.Relationship.source_type == computed_object_type,
   )
   dst = db.session.query(
+      models.Relationship.source_type,
+      models.Relationship.source_id,
       models.Relationship.destination_type,
       models.Relationship.destination_id,
   ).filter(
@@ -237,10 +341,12 @@ def _get_objects_from_aggregates(aggregate_objects, computed_object_type):
 
   # Related snapshots
   snap_dst = db.session.query(
+      models.Relationship.source_type,
+      models.Relationship.source_id,
       models.Snapshot.child_type,
       models.Snapshot.child_id,
   ).join(
-      models.Relationship,
+      models.Snapshot,
       sa.and_(
           models.Relationship.destination_id == models.Snapshot.id,
           models.Relationship.destination_type == models.Snapshot.__name__,
@@ -253,10 +359,12 @@ def _get_objects_from_aggregates(aggregate_objects, computed_object_type):
       ).in_(aggregate_objects),
   )
   snap_src = db.session.query(
+      models.Relationship.destination_type,
+      models.Relationship.destination_id,
       models.Snapshot.child_type,
       models.Snapshot.child_id,
   ).join(
-      models.Relationship,
+      models.Snapshot,
       sa.and_(
           models.Relationship.source_id == models.Snapshot.id,
           models.Relationship.source_type == models.Snapshot.__name__,
@@ -296,22 +404,40 @@ def _get_objects_from_deleted(aggregate_deleted, aggregate_field):
 
 
 def get_affected_objects(attribute_groups):
-  """Get a list off all affected objects grouped by attributes."""
+  """Get objects affected by revisions grouped by attributes.
+
+  Returns:
+    tuple of two dicts by attributes. The first one contains objects whose
+    values must be computed from all their aggregates. The second one
+    contains changed aggregate values of other computed objects, as a dict
+    from computed object to a dict of aggregate id to its new value.
+  """
   affected_objects = {}
+  aggregate_deltas = {}
   for attr, groups in attribute_groups.iteritems():
     objects = set()
     objects.update(groups["computed_objects"])
     objects.update(_objects_from_snapshots(groups["destination_snapshots"]))
-    objects.update(_get_objects_from_aggregates(
-        groups["aggregate_objects"],
-        attr.object_template.name
-    ))
     objects.update(_get_objects_from_deleted(
         groups["aggregate_deleted"],
-        get_aggregate_field(attr)
+        attr.aggregate_field
     ))
+    relationships = _get_aggregate_relationships(
+        groups["aggregate_objects"],
+        attr.computed_type,
+    )
+    aggregate_values = _get_aggregate_values(
+        attr,
+        {(rel[0], rel[1]) for rel in relationships},
+    )
+    deltas = collections.defaultdict(dict)
+    for _, aggregate_id, computed_type, computed_id in relationships:
+      obj = (computed_type, computed_id)
+      if obj not in objects:
+        deltas[obj][aggregate_id] = aggregate_values.get(aggregate_id)
     affected_objects[attr] = objects
-  return affected_objects
+    aggregate_deltas[attr] = deltas
+  return affected_objects, aggregate_deltas
 
 
 def _get_aggregate_values(attr, aggregate_objects):
@@ -324,15 +450,13 @@ def _get_aggregate_values(attr, aggregate_objects):
 
   ids = [obj[1] for obj in aggregate_objects]
 
-  field_name = get_aggregate_field(attr)
-  aggregate_type = get_aggregate_type(attr)
   # This line must raise an exception if the object does not exists and it
   # should not be handled quietly. If there is an exception here it indicates
   # data corruption in the attribute_types table
-  aggregate_model = getattr(models, aggregate_type)
+  aggregate_model = getattr(models, attr.aggregate_type)
   query = db.session.query(
       aggregate_model.id,
-      getattr(aggregate_model, field_name),
+      getattr(aggregate_model, attr.aggregate_field),
   ).filter(
       aggregate_model.id.in_(ids)
   )
@@ -355,9 +479,13 @@ def _get_relationships_map(relationships):
   return rel_map
 
 
-def compute_values(affected_objects, all_relationships, snapshot_map):
-  """Compute new values for affected objects."""
-  # pylint: disable=too-many-locals
+def compute_values(affected_objects, all_relationships):
+  """Compute new values for affected objects from all their aggregates.
+
+  Returns:
+    dict by attributes of computed objects with their new (source_id, value)
+    pairs. Objects without any aggregate value are skipped.
+  """
   computed_values = collections.defaultdict(dict)
 
   for attr, objects in affected_objects.iteritems():
@@ -365,29 +493,71 @@ def compute_values(affected_objects, all_relationships, snapshot_map):
     aggregate_values = _get_aggregate_values(attr, aggregate_objects)
     rel_map = _get_relationships_map(all_relationships[attr])
 
-    aggregate_type = get_aggregate_type(attr)
     aggregate_function = get_aggregate_function(attr)
     for obj in objects:
       source_id, value = aggregate_function(aggregate_values, rel_map[obj])
-      if source_id is None:
-        continue
+      if source_id is not None:
+        computed_values[attr][obj] = (source_id, value)
 
-      computed_value_dict = {
-          "source_type": aggregate_type,
-          "source_id": source_id,
-          "value_datetime": None,
-          "value_integer": None,
-          "value_string": "",
-      }
-      field_type = attr.attribute_definition.attribute_type.field_type
-      if field_type in ("value_datetime", "value_integer", "value_string"):
-        computed_value_dict[field_type] = value
-      else:
-        computed_value_dict["value_datetime"] = value
-      computed_values[attr][obj] = computed_value_dict
-      for snapshot_id in snapshot_map.get(obj, set()):
-        computed_values[attr][(u"Snapshot", snapshot_id)] = computed_value_dict
+  return computed_values
+
+
+def _apply_delta(function_name, current, changed):
+  """Merge changed aggregate values into the current value of an object.
+
+  Args:
+    function_name: name of the aggregate function, "max" or "last".
+    current: current (source_id, value) pair of the computed object.
+    changed: dict of changed aggregate ids to their new values.
+
+  Returns:
+    new (source_id, value) pair, or None if it can not be computed without
+    reading all aggregates of the object.
+  """
+  source_id, value = current
+  if source_id in changed:
+    new_value = changed[source_id]
+    if new_value is None:
+      return None
+    if function_name == "max" and new_value < value:
+      return None
+    value = new_value
+  candidates = [(source_id, value)]
+  candidates.extend((aggregate_id, aggregate_value)
+                    for aggregate_id, aggregate_value in changed.iteritems()
+                    if aggregate_value is not None)
+  if function_name == "max":
+    new_source_id, new_value = max(candidates, key=lambda i: (i[1], i[0]))
+  else:
+    new_source_id, new_value = max(candidates)
+  return new_source_id, new_value
 
+
+def apply_deltas(aggregate_deltas, affected_objects, state):
+  """Compute new values of objects from their changed aggregate values.
+
+  Objects whose values can not be computed this way are added to
+  affected_objects to be computed from all their aggregates.
+
+  Returns:
+    dict by attributes of computed objects with their new (source_id, value)
+    pairs.
+  """
+  computed_values = collections.defaultdict(dict)
+  for attr, deltas in aggregate_deltas.iteritems():
+    if attr.function_name not in ("max", "last"):
+      affected_objects[attr].update(deltas)
+      continue
+    state.load(attr, deltas)
+    for obj, changed in deltas.iteritems():
+      current = state.get(attr, obj)
+      new = None
+      if current is not None:
+        new = _apply_delta(attr.function_name, current, changed)
+      if new is None:
+        affected_objects[attr].add(obj)
+      else:
+        computed_values[attr][obj] = new
   return computed_values
 
 
@@ -463,8 +633,7 @@ def get_relationships(affected_objects):
   """Get all mappings for computed objects and aggregates."""
   relationships = {}
   for attr, objects in affected_objects.iteritems():
-    aggregate_type = get_aggregate_type(attr)
-    relationships[attr] = _get_relationships(aggregate_type, objects)
+    relationships[attr] = _get_relationships(attr.aggregate_type, objects)
   return relationships
 
 
@@ -511,31 +680,54 @@ def get_snapshot_data(affected_objects):
   return snapshot_map, snapshot_tag_map
 
 
+def get_changed_values(computed_values, snapshot_map, state):
+  """Get new values of computed objects and their snapshots.
+
+  Values that are equal to the stored ones are skipped. All values are
+  returned if there is no state to compare them with.
+  """
+  changed_values = collections.defaultdict(dict)
+  for attr, values in computed_values.iteritems():
+    targets = {}
+    for obj, value in values.iteritems():
+      targets[obj] = value
+      for snapshot_id in snapshot_map.get(obj, ()):
+        targets[(u"Snapshot", snapshot_id)] = value
+    if state is None:
+      changed_values[attr] = targets
+      continue
+    state.load(attr, targets)
+    for obj, value in targets.iteritems():
+      if state.get(attr, obj) != value:
+        changed_values[attr][obj] = value
+  return changed_values
+
+
 def get_attributes_data(computed_values):
   """Store computed values in the database."""
   data = []
   user_id = login.get_current_user_id()
   for attr, objects in computed_values.iteritems():
-    aggregate_type = get_aggregate_type(attr)
-    aggregate_field = get_aggregate_field(attr)
-    definition_id = attr.attribute_definition.attribute_definition_id
-    for obj, computed_value in objects.iteritems():
-      data.append({
+    field_name = _get_field_name(attr)
+    for obj, (source_id, value) in objects.iteritems():
+      row = {
           "object_type": obj[0],
           "object_id": obj[1],
-          "source_type": aggregate_type,
-          "source_id": computed_value["source_id"],
-          "source_attr": aggregate_field,
-          "value_datetime": computed_value["value_datetime"],
-          "value_string": computed_value["value_string"] or "",
-          "value_integer": computed_value["value_integer"],
+          "source_type": attr.aggregate_type,
+          "source_id": source_id,
+          "source_attr": attr.aggregate_field,
+          "value_datetime": None,
+          "value_string": "",
+          "value_integer": None,
           "attribute_template_id": attr.attribute_template_id,
-          "attribute_definition_id": definition_id,
+          "attribute_definition_id": attr.attribute_definition_id,
           "created_at": datetime.datetime.utcnow(),
           "updated_at": datetime.datetime.utcnow(),
           "created_by_id": user_id,
           "updated_by_id": user_id,
-      })
+      }
+      row[field_name] = value
+      data.append(row)
   return data
 
 
@@ -543,9 +735,8 @@ def get_index_data(computed_values, snapshot_tag_map):
   """Store new computed values in full text index table."""
   data = []
   for attr, objects in computed_values.iteritems():
-    for obj, computed_value in objects.iteritems():
-      value = (computed_value["value_datetime"] or
-               computed_value["value_string"] or "")
+    indexed = _get_field_name(attr) != "value_integer"
+    for obj, (_, value) in objects.iteritems():
       tags = u""
       if obj[0] == "Snapshot":
         tags = snapshot_tag_map.get(obj[1], u"")
@@ -553,8 +744,8 @@ def get_index_data(computed_values, snapshot_tag_map):
           "key": obj[1],
           "type": obj[0],
           "tags": tags,
-          "property": attr.attribute_definition.name,
-          "content": value,
+          "property": attr.name,
+          "content": (value if indexed else None) or "",
           "subproperty": u"",
       })
   return data
@@ -566,16 +757,21 @@ def store_data(attributes_data, index_data):
     db.session.execute(ATTRIBUTE_REPLACE_STATEMENT, attributes_data)
   if index_data:
     db.session.execute(INDEX_REPLACE_STATEMENT, index_data)
+    trigrams.insert_for_records(index_data)
+  cache_utils.add_query_changes(
+      {row["object_type"] for row in attributes_data} |
+      {row["type"] for row in index_data}
+  )
   db.session.commit()
 
 
-def get_all_latest_revisions_ids():
+def get_all_latest_revisions_ids(attributes=None):
   """Get latest revisions for aggregate objects."""
   with benchmark("Get all latest revision ids"):
-    attributes = get_computed_attributes()
+    if attributes is None:
+      attributes = load_computed_attributes()
     revision_ids = []
-    for attribute in attributes:
-      aggregate_type = get_aggregate_type(attribute)
+    for aggregate_type in {attr.aggregate_type for attr in attributes}:
       revisions = revision_utils.get_revisions_by_type(aggregate_type)
       revision_ids.extend(revisions.values())
     return revision_ids
@@ -605,8 +801,8 @@ def get_revisions(revision_ids):
 
   Returns:
     list of named tuples with all needed revision data to compute the new
-    attribute values. Note that snapshot revisions also contain content field
-    that they need to specify the snapshot object type.
+    attribute values. Snapshot revisions are returned as revision objects
+    with loaded content that they need to specify the snapshot object type.
   """
 
   non_snapshot_revisions = db.session.query(
@@ -619,16 +815,19 @@ def get_revisions(revision_ids):
       models.Revision.resource_type != "Snapshot",
       models.Revision.id.in_(revision_ids)
   ).all()
-  snapshot_revisions = db.session.query(
-      models.Revision.action,
-      models.Revision.resource_type,
-      models.Revision.resource_id,
-      # The following protected access is used to prevent calculation of all
-      # fields in revision content, because they are not needed.
-      models.Revision._content,  # pylint: disable=protected-access
-  ).filter(
+  # Content of snapshot revisions is loaded with full revision objects,
+  # because it might be stored as a delta against a newer revision.
+  snapshot_revisions = models.Revision.query.filter(
       models.Revision.resource_type == "Snapshot",
       models.Revision.id.in_(revision_ids)
+  ).options(
+      orm.load_only(
+          "action",
+          "resource_type",
+          "resource_id",
+          "_stored_content",
+          "_delta_base_id",
+      ),
   ).all()
   return non_snapshot_revisions + snapshot_revisions
 
@@ -643,45 +842,80 @@ def compute_attributes(revision_ids):
 
   with benchmark("Compute attributes"):
 
-    if revision_ids == "all_latest":
+    with benchmark("Get all computed attributes"):
+      attributes = load_computed_attributes()
+
+    full = revision_ids == "all_latest"
+    if full:
       with benchmark("Get all latest revisions ids"):
-        revision_ids = get_all_latest_revisions_ids()
+        revision_ids = get_all_latest_revisions_ids(attributes)
 
     if not revision_ids:
       return
 
+    state = None if full else AttributeState()
     ids_count = len(revision_ids)
     handled_ids = 0
     for ids_chunk in utils.list_chunks(revision_ids, chunk_size=CA_CHUNK_SIZE):
       handled_ids += len(ids_chunk)
       logger.info("Revision: %s/%s", handled_ids, ids_count)
-      recompute_attrs_for_revisions(ids_chunk)
+      recompute_attrs_for_revisions(ids_chunk, attributes, state, full)
 
 
-def recompute_attrs_for_revisions(ids_chunk):
-  """Reindex chunk of CAs."""
+def recompute_attrs_for_revisions(ids_chunk, attributes=None, state=None,
+                                  full=False):
+  """Reindex chunk of CAs.
+
+  Args:
+    ids_chunk: ids of revisions to compute new values for.
+    attributes: computed attributes, loaded if not given.
+    state: AttributeState shared by chunks of the same run.
+    full: recompute all affected objects from all their aggregates and
+      write their values without comparing them to the stored ones. Used
+      for full reindex, where stored values can not be trusted.
+  """
+  # pylint: disable=too-many-locals
   with benchmark("Get revisions."):
     revisions = get_revisions(ids_chunk)
 
-  with benchmark("Get all computed attributes"):
-    attributes = get_computed_attributes()
+  if attributes is None:
+    with benchmark("Get all computed attributes"):
+      attributes = load_computed_attributes()
+  if state is None and not full:
+    state = AttributeState()
 
   with benchmark("Group revisions by computed attributes"):
     attribute_groups = group_revisions(attributes, revisions)
   with benchmark("get all objects affected by computed attributes"):
-    affected_objects = get_affected_objects(attribute_groups)
+    affected_objects, aggregate_deltas = get_affected_objects(
+        attribute_groups)
+  if full:
+    computed_values = collections.defaultdict(dict)
+    for attr, deltas in aggregate_deltas.iteritems():
+      affected_objects[attr].update(deltas)
+  else:
+    with benchmark("Compute values from changed aggregate values"):
+      computed_values = apply_deltas(aggregate_deltas, affected_objects,
+                                     state)
   with benchmark("Get all relationships for these computed objects"):
     relationships = get_relationships(affected_objects)
-  with benchmark("Get snapshot data"):
-    snapshot_map, snapshot_tag_map = get_snapshot_data(affected_objects)
 
   with benchmark("Compute values"):
-    computed_values = compute_values(affected_objects, relationships,
-                                     snapshot_map)
+    full_values = compute_values(affected_objects, relationships)
+    for attr, values in full_values.iteritems():
+      computed_values[attr].update(values)
+
+  with benchmark("Get snapshot data"):
+    snapshot_map, snapshot_tag_map = get_snapshot_data(computed_values)
+  with benchmark("Get changed computed values"):
+    changed_values = get_changed_values(computed_values, snapshot_map, state)
 
   with benchmark("Get computed attributes data"):
-    attributes_data = get_attributes_data(computed_values)
+    attributes_data = get_attributes_data(changed_values)
   with benchmark("Get computed attribute full-text index data"):
-    index_data = get_index_data(computed_values, snapshot_tag_map)
+    index_data = get_index_data(changed_values, snapshot_tag_map)
   with benchmark("Store attribute data and full-text index data"):
     store_data(attributes_data, index_data)
+  if state is not None:
+    for attr, values in changed_values.iteritems():
+      state.update(attr, values)
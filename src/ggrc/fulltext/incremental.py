@@ -0,0 +1,173 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Incremental and resumable fulltext reindex.
+
+Every run of the incremental reindex stores its progress in the parameters of
+its own BackgroundTask row:
+
+  since    - high-water marks of the previous successful run, rows changed
+             after them are reindexed;
+  until    - high-water marks captured at the start of the current run, they
+             become the "since" marks of the next run;
+  done     - names of the models that are fully reindexed;
+  last_id  - id of the last reindexed row for a partially handled model.
+
+High-water marks consist of the last revision id and the last `updated_at`
+value per model. `updated_at` has only second precision, so rows stamped in
+the second of the mark are reindexed again by the next run, as they may have
+been written after the mark was captured.
+
+The checkpoint is committed together with every chunk of records, so a retry
+of the task or a new run started after a failure continues from the last
+committed chunk instead of starting from scratch.
+"""
+
+import logging
+
+import sqlalchemy as sa
+
+from ggrc import db
+from ggrc import utils
+from ggrc.models import all_models
+from ggrc.utils import benchmark
+
+
+logger = logging.getLogger(__name__)
+
+TASK_NAME = "incremental_reindex"
+CHUNK_SIZE = 100
+
+
+def _get_previous_task(task):
+  """Get the last incremental reindex task started before the given one."""
+  return all_models.BackgroundTask.query.filter(
+      all_models.BackgroundTask.name.like(TASK_NAME + "%"),
+      all_models.BackgroundTask.id < task.id,
+  ).order_by(
+      all_models.BackgroundTask.id.desc(),
+  ).first()
+
+
+def _get_high_water_marks(models):
+  """Get current high-water marks for the given models."""
+  revision_id = db.session.query(
+      sa.func.max(all_models.Revision.id)
+  ).scalar()
+  updated_at = {}
+  for model in models:
+    if not hasattr(model, "updated_at"):
+      continue
+    updated_at[model.__name__] = db.session.query(
+        sa.func.max(model.updated_at)
+    ).scalar()
+  return {"revision_id": revision_id, "updated_at": updated_at}
+
+
+def init_state(task, models):
+  """Build reindex state for the task.
+
+  A retried task resumes from its own last checkpoint. If the previous
+  incremental reindex did not finish successfully, its state is taken over so
+  that the current run resumes from its last checkpoint. Otherwise the
+  current run reindexes rows changed since the high-water marks of the
+  previous run.
+  """
+  if task.parameters and "until" in task.parameters:
+    logger.info("Resuming incremental reindex task %s", task.id)
+    return dict(task.parameters)
+  previous = _get_previous_task(task)
+  previous_state = previous.parameters if previous else None
+  if previous_state and "until" in previous_state:
+    if previous.status != "Success":
+      logger.info("Resuming incremental reindex from task %s", previous.id)
+      return dict(previous_state)
+    since = previous_state["until"]
+  else:
+    since = None
+  return {
+      "since": since,
+      "until": _get_high_water_marks(models),
+      "done": [],
+      "last_id": {},
+  }
+
+
+def save_state(task, state):
+  """Store reindex state in the task row.
+
+  The state is stored in a pickled column, so a new dict must be assigned in
+  order for the change to be flushed. Caller is responsible for commit.
+  """
+  task.parameters = dict(state)
+  db.session.add(task)
+
+
+def get_changed_ids_query(model, state):
+  """Get query for ids of model rows that must be reindexed."""
+  query = db.session.query(model.id)
+  since = state["since"]
+  if since:
+    revision = all_models.Revision
+    changed_conditions = [
+        model.id.in_(
+            db.session.query(revision.resource_id).filter(
+                revision.resource_type == model.__name__,
+                revision.id > (since["revision_id"] or 0),
+                revision.id <= (state["until"]["revision_id"] or 0),
+            )
+        ),
+    ]
+    since_updated_at = since["updated_at"].get(model.__name__)
+    if since_updated_at is not None:
+      changed_conditions.append(model.updated_at >= since_updated_at)
+    elif hasattr(model, "updated_at"):
+      # model had no rows during the previous run
+      changed_conditions.append(sa.true())
+    query = query.filter(sa.or_(*changed_conditions))
+  last_id = state["last_id"].get(model.__name__)
+  if last_id is not None:
+    query = query.filter(model.id > last_id)
+  return query.order_by(model.id)
+
+
+def reindex_model(task, model, state):
+  """Reindex changed rows of a single model with per chunk checkpoints."""
+  ids = [id_ for id_, in get_changed_ids_query(model, state)]
+  ids_count = len(ids)
+  handled_ids = 0
+  for ids_chunk in utils.list_chunks(ids, chunk_size=CHUNK_SIZE):
+    handled_ids += len(ids_chunk)
+    logger.info("%s: %s / %s", model.__name__, handled_ids, ids_count)
+    model.bulk_record_update_for(ids_chunk)
+    state["last_id"] = dict(state["last_id"])
+    state["last_id"][model.__name__] = ids_chunk[-1]
+    save_state(task, state)
+    db.session.commit()
+  state["done"] = state["done"] + [model.__name__]
+  state["last_id"] = {
+      name: id_ for name, id_ in state["last_id"].iteritems()
+      if name != model.__name__
+  }
+  save_state(task, state)
+  db.session.commit()
+
+
+def reindex(task, indexed_models):
+  """Reindex rows of indexed models that changed since the previous run.
+
+  Args:
+    task: BackgroundTask instance of the current run. Its parameters are used
+        as a storage for high-water marks and checkpoints.
+    indexed_models: dict of model name to model class for models that
+        should be reindexed.
+  """
+  state = init_state(task, indexed_models.values())
+  save_state(task, state)
+  db.session.commit()
+  for model_name in sorted(indexed_models.keys()):
+    if model_name in state["done"]:
+      continue
+    logger.info("Updating index for: %s", model_name)
+    with benchmark("Create records for %s" % model_name):
+      reindex_model(task, indexed_models[model_name], state)
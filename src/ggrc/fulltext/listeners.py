@@ -14,6 +14,7 @@ from ggrc import fulltext
 from ggrc import utils
 from ggrc.models import all_models, get_model
 from ggrc.fulltext import mixin
+from ggrc.fulltext import reindex_queue
 from ggrc.utils import benchmark, helpers
 
 ACTIONS = ['after_insert', 'after_delete', 'after_update']
@@ -51,9 +52,17 @@ class ReindexSet(threading.local):
 
   @helpers.without_sqlalchemy_cache
   def push_ft_records(self):
-    """Function that clear and push new full text records in DB."""
+    """Function that clear and push new full text records in DB.
+
+    In async indexing mode the collected objects are queued for reindexing
+    in the current transaction instead.
+    """
     with benchmark("push ft records into DB"):
       self.warmup()
+      if reindex_queue.is_enabled():
+        reindex_queue.enqueue(self.model_ids_to_reindex)
+        self.model_ids_to_reindex.clear()
+        return
       for obj in db.session:
         if not isinstance(obj, mixin.Indexed):
           continue
@@ -9,6 +9,7 @@ from sqlalchemy import orm
 from ggrc import db
 
 from ggrc import fulltext
+from ggrc.fulltext import trigrams
 
 
 class ReindexRule(namedtuple("ReindexRule", ["model", "rule", "fields"])):
@@ -37,16 +38,23 @@ class Indexed(object):
     return (self.__class__.__name__, self.id)
 
   @classmethod
-  def get_insert_query_for(cls, ids):
-    """Return insert class record query. It will return None, if it's empty."""
+  def get_records_for(cls, ids):
+    """Return list of index record dicts of class instances."""
     if not ids:
-      return None
+      return []
     instances = cls.indexed_query().filter(cls.id.in_(ids))
     indexer = fulltext.get_indexer()
     rows = itertools.chain(*[indexer.records_generator(i) for i in instances])
-    values = list(rows)
+    return list(rows)
+
+  @classmethod
+  def get_insert_query_for(cls, ids, values=None):
+    """Return insert class record query. It will return None, if it's empty."""
+    if values is None:
+      values = cls.get_records_for(ids)
     if not values:
       return None
+    indexer = fulltext.get_indexer()
     return indexer.record_type.__table__.insert().values(values)
 
   @classmethod
@@ -64,11 +72,14 @@ class Indexed(object):
   @classmethod
   def bulk_record_update_for(cls, ids):
     """Bulky update index records for current class"""
+    values = cls.get_records_for(ids)
     delete_query = cls.get_delete_query_for(ids)
-    insert_query = cls.get_insert_query_for(ids)
+    insert_query = cls.get_insert_query_for(ids, values)
     for query in [delete_query, insert_query]:
       if query is not None:
         db.session.execute(query)
+    if ids:
+      trigrams.replace_for_records(cls.__name__, ids, values)
 
   @classmethod
   def indexed_query(cls):
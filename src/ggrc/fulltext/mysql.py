@@ -9,6 +9,7 @@ from sqlalchemy.sql.expression import select
 from sqlalchemy import event
 
 from ggrc import db
+from ggrc.fulltext import trigrams
 from ggrc.fulltext.sql import SqlIndexer
 from ggrc.models import all_models
 from ggrc.query import my_objects
@@ -43,13 +44,24 @@ class MysqlIndexer(SqlIndexer):
 
   @staticmethod
   def _get_filter_query(terms):
-    """Get the whitelist of fields to filter in full text table."""
+    """Get the whitelist of fields to filter in full text table.
+
+    If trigram posting lists can be used for the terms, only records of
+    candidate objects are checked with LIKE.
+    """
     whitelist = MysqlRecordProperty.property.in_(
         ['title', 'name', 'email', 'notes', 'description', 'slug'])
 
     if not terms:
       return whitelist
-    return sa.and_(whitelist, MysqlRecordProperty.content.contains(terms))
+    filters = [whitelist, MysqlRecordProperty.content.contains(terms)]
+    candidates = trigrams.get_candidates_query(terms)
+    if candidates is not None:
+      filters.append(sa.tuple_(
+          MysqlRecordProperty.type,
+          MysqlRecordProperty.key,
+      ).in_(candidates))
+    return sa.and_(*filters)
 
   @staticmethod
   def get_permissions_query(model_names, permission_type='read'):
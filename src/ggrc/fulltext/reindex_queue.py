@@ -0,0 +1,146 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Asynchronous full text indexing queue.
+
+If FULLTEXT_ASYNC_INDEXING setting is enabled, objects collected for
+reindexing during a request are not reindexed before commit. Their (type,
+key) pairs are inserted into fulltext_reindex_queue table in the same
+transaction instead, and the queue is drained by a cron job in batches of
+FULLTEXT_QUEUE_BATCH_SIZE rows. Rows of the same object in a batch are
+coalesced into a single reindex.
+
+Drained rows are deleted by the ids that were read, so rows queued while a
+batch is reindexed stay in the queue for the next batch.
+
+Search responses carry the age of the oldest queued row in seconds in
+INDEX_LAG_HEADER, so that clients can tell that results may be stale.
+"""
+
+import collections
+import datetime
+import logging
+import time
+
+from ggrc import db
+from ggrc import settings
+from ggrc import utils
+from ggrc.models import get_model
+from ggrc.utils import benchmark
+
+logger = logging.getLogger(__name__)
+
+INDEX_LAG_HEADER = "X-GGRC-Index-Lag"
+
+# Time after which drain stops taking new batches, so that it finishes
+# before the next run of the cron job.
+DRAIN_TIME_LIMIT = 50
+
+REINDEX_CHUNK_SIZE = 200
+
+
+# pylint: disable=too-few-public-methods
+class ReindexQueueItem(db.Model):
+  """Db model of objects waiting to be reindexed."""
+  __tablename__ = 'fulltext_reindex_queue'
+
+  id = db.Column(db.Integer, primary_key=True)
+  type = db.Column(db.String(64), nullable=False)
+  key = db.Column(db.Integer, nullable=False)
+  created_at = db.Column(db.DateTime, nullable=False)
+
+
+def is_enabled():
+  return getattr(settings, "FULLTEXT_ASYNC_INDEXING", False)
+
+
+def enqueue(model_ids):
+  """Queue objects for reindexing in the current transaction.
+
+  Args:
+    model_ids: dict of model name to ids of objects to reindex.
+  """
+  now = datetime.datetime.utcnow()
+  rows = [{"type": type_, "key": key, "created_at": now}
+          for type_, keys in sorted(model_ids.iteritems())
+          for key in sorted(keys)]
+  inserter = ReindexQueueItem.__table__.insert()
+  for chunk in utils.list_chunks(rows):
+    db.session.execute(inserter.values(chunk))
+
+
+def _reindex(model_ids):
+  """Update records of queued objects."""
+  for model_name, ids in sorted(model_ids.iteritems()):
+    model = get_model(model_name)
+    if model is None or not hasattr(model, "bulk_record_update_for"):
+      logger.warning("Skipped reindex of unknown model %s", model_name)
+      continue
+    for ids_chunk in utils.list_chunks(sorted(ids), REINDEX_CHUNK_SIZE):
+      model.bulk_record_update_for(ids_chunk)
+
+
+def drain_batch(batch_size=None):
+  """Reindex objects of the oldest queued rows and remove the rows.
+
+  Returns:
+    number of drained rows.
+  """
+  batch_size = batch_size or getattr(settings, "FULLTEXT_QUEUE_BATCH_SIZE",
+                                     1000)
+  rows = db.session.query(
+      ReindexQueueItem.id,
+      ReindexQueueItem.type,
+      ReindexQueueItem.key,
+  ).order_by(
+      ReindexQueueItem.id,
+  ).limit(batch_size).all()
+  if not rows:
+    return 0
+  model_ids = collections.defaultdict(set)
+  for _, type_, key in rows:
+    model_ids[type_].add(key)
+  _reindex(model_ids)
+  for ids_chunk in utils.list_chunks([id_ for id_, _, _ in rows]):
+    db.session.execute(ReindexQueueItem.__table__.delete().where(
+        ReindexQueueItem.id.in_(ids_chunk)
+    ))
+  db.session.commit()
+  return len(rows)
+
+
+def drain():
+  """Drain the reindex queue in batches until it is empty."""
+  with benchmark("Drain fulltext reindex queue"):
+    start = time.time()
+    drained = 0
+    while time.time() - start < DRAIN_TIME_LIMIT:
+      count = drain_batch()
+      if not count:
+        break
+      drained += count
+    if drained:
+      logger.info("Drained %s fulltext reindex queue rows", drained)
+    return drained
+
+
+def get_index_lag():
+  """Get age of the oldest queued row in seconds, 0 if the queue is empty.
+
+  Rows are queued with the current time, so the row with the lowest id is
+  the oldest one and is found by primary key instead of scanning created_at.
+  """
+  oldest = db.session.query(ReindexQueueItem.created_at).order_by(
+      ReindexQueueItem.id
+  ).limit(1).scalar()
+  if oldest is None:
+    return 0
+  lag = datetime.datetime.utcnow() - oldest
+  return max(int(lag.total_seconds()), 0)
+
+
+def add_lag_header(response):
+  """Add index lag header to a search response in async indexing mode."""
+  if is_enabled():
+    response.headers[INDEX_LAG_HEADER] = str(get_index_lag())
+  return response
@@ -6,6 +6,7 @@
 from collections import defaultdict
 
 from ggrc import db
+from ggrc.fulltext import trigrams
 
 
 class SqlIndexer(object):
@@ -53,8 +54,10 @@ class SqlIndexer(object):
 
   def create_record(self, instance, commit=True):
     """Create records in db."""
-    for db_record in self.records_generator(instance):
+    db_records = list(self.records_generator(instance))
+    for db_record in db_records:
       db.session.add(self.record_type(**db_record))
+    trigrams.insert_for_records(db_records)
     if commit:
       db.session.commit()
 
@@ -68,6 +71,7 @@ class SqlIndexer(object):
     ).delete(
         synchronize_session="fetch"
     )
+    trigrams.delete_for(type, [key])
     if commit:
       db.session.commit()
 
@@ -83,12 +87,14 @@ class SqlIndexer(object):
     ).delete(
         synchronize_session="fetch"
     )
+    trigrams.delete_for(type, keys)
     if commit:
       db.session.commit()
 
   def delete_all_records(self, commit=True):
     """Clear index table."""
     db.session.query(self.record_type).delete()
+    trigrams.delete_for()
     if commit:
       db.session.commit()
 
@@ -96,5 +102,6 @@ class SqlIndexer(object):
     """Delete values from index table for selected type."""
     db.session.query(self.record_type).filter(
         self.record_type.type == type).delete()
+    trigrams.delete_for(type)
     if commit:
       db.session.commit()
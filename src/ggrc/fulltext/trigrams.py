@@ -0,0 +1,182 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Trigram posting lists of full text records.
+
+Search filters on fulltext_record_properties use LIKE '%term%' conditions,
+which can not use an index and scan all records. The fulltext_record_trigrams
+table keeps the distinct trigrams of record content of every indexed object
+(sort keys excluded), so that it works as a posting list per trigram.
+
+An object can contain a search term only if its posting lists contain all
+trigrams of the term. Candidate objects are found by intersecting the posting
+lists of the term trigrams and the LIKE condition is then checked only for
+records of the candidates. Terms shorter than a trigram or containing LIKE
+wildcards can not be checked this way and are searched with LIKE only.
+
+Trigrams are lowercased and stripped of accents to match the case and accent
+insensitive collation of the records table. Posting lists are written
+together with the records they are built from. Extra trigrams of deleted
+records only add candidates, so only full deletes of object records remove
+trigrams.
+
+Candidates are used in searches only if FULLTEXT_TRIGRAM_SEARCH setting is
+enabled, which should be done after posting lists of existing records are
+built with rebuild().
+"""
+
+import logging
+import unicodedata
+
+import sqlalchemy as sa
+from sqlalchemy.ext.declarative import declared_attr
+
+from ggrc import db
+from ggrc import settings
+from ggrc import utils
+from ggrc.utils import benchmark
+
+logger = logging.getLogger(__name__)
+
+TRIGRAM_LENGTH = 3
+
+SORT_SUBPROPERTY = u"__sort__"
+
+
+# pylint: disable=too-few-public-methods
+class RecordTrigram(db.Model):
+  """Db model of trigram posting lists of fulltext index records."""
+  __tablename__ = 'fulltext_record_trigrams'
+
+  trigram = db.Column(db.String(TRIGRAM_LENGTH), primary_key=True)
+  type = db.Column(db.String(64), primary_key=True)
+  key = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+  @declared_attr
+  def __table_args__(cls):  # pylint: disable=no-self-argument
+    return (
+        db.Index('ix_{}_type_key'.format(cls.__tablename__), 'type', 'key'),
+    )
+
+
+def normalize(text):
+  """Get lowercased text without accents."""
+  text = unicodedata.normalize("NFKD", unicode(text).lower())
+  return u"".join(char for char in text if not unicodedata.combining(char))
+
+
+def get_trigrams(text):
+  """Get set of distinct trigrams of the text."""
+  text = normalize(text)
+  return {text[index:index + TRIGRAM_LENGTH]
+          for index in range(len(text) - TRIGRAM_LENGTH + 1)}
+
+
+def get_postings(records):
+  """Get (trigram, type, key) postings of record dicts."""
+  postings = set()
+  for record in records:
+    if record.get("subproperty") == SORT_SUBPROPERTY:
+      continue
+    for trigram in get_trigrams(record.get("content") or u""):
+      postings.add((trigram, record["type"], record["key"]))
+  return postings
+
+
+def insert_for_records(records):
+  """Add trigrams of record dicts to posting lists."""
+  postings = sorted(get_postings(records))
+  # Trigrams that differ only in trailing spaces are equal for MySQL.
+  inserter = RecordTrigram.__table__.insert().prefix_with("IGNORE")
+  for chunk in utils.list_chunks(postings):
+    db.session.execute(inserter.values([{
+        "trigram": trigram,
+        "type": type_,
+        "key": key,
+    } for trigram, type_, key in chunk]))
+
+
+def delete_for(type_=None, keys=None):
+  """Remove posting lists of objects, of a type or all of them."""
+  delete = RecordTrigram.__table__.delete()
+  if type_ is not None:
+    delete = delete.where(RecordTrigram.type == type_)
+  if keys is None:
+    db.session.execute(delete)
+    return
+  for chunk in utils.list_chunks(list(keys)):
+    db.session.execute(delete.where(RecordTrigram.key.in_(chunk)))
+
+
+def replace_for_records(type_, keys, records):
+  """Replace posting lists of objects with trigrams of their new records."""
+  delete_for(type_, keys)
+  insert_for_records(records)
+
+
+def _get_search_trigrams(text):
+  """Get trigrams that every object containing text must have."""
+  if not getattr(settings, "FULLTEXT_TRIGRAM_SEARCH", False):
+    return None
+  if not text or u"%" in text or u"_" in text:
+    return None
+  trigrams = get_trigrams(text)
+  return trigrams or None
+
+
+def get_candidates_query(text, type_=None):
+  """Get query of objects whose posting lists contain all trigrams of text.
+
+  Returns:
+    None if candidates can not be found with posting lists, query of (type,
+    key) pairs otherwise, or query of keys if type_ is given.
+  """
+  trigrams = _get_search_trigrams(text)
+  if trigrams is None:
+    return None
+  if type_ is None:
+    columns = (RecordTrigram.type, RecordTrigram.key)
+  else:
+    columns = (RecordTrigram.key,)
+  query = db.session.query(*columns).filter(
+      RecordTrigram.trigram.in_(trigrams),
+  )
+  if type_ is not None:
+    query = query.filter(RecordTrigram.type == type_)
+  return query.group_by(
+      RecordTrigram.type,
+      RecordTrigram.key,
+  ).having(
+      sa.func.count() == len(trigrams)
+  )
+
+
+def _rebuild_type(record, type_):
+  """Rebuild posting lists of all objects of a single type."""
+  keys = [key for key, in db.session.query(record.key).filter(
+      record.type == type_,
+  ).distinct().order_by(record.key)]
+  for keys_chunk in utils.list_chunks(keys):
+    records = db.session.query(
+        record.key,
+        record.type,
+        record.subproperty,
+        record.content,
+    ).filter(
+        record.type == type_,
+        record.key.in_(keys_chunk),
+    )
+    insert_for_records(row._asdict() for row in records)
+    db.session.commit()
+  logger.info("Rebuilt trigrams of %s %s objects", len(keys), type_)
+
+
+def rebuild():
+  """Build posting lists of all existing full text records."""
+  from ggrc.fulltext.mysql import MysqlRecordProperty as Record
+  with benchmark("Rebuild fulltext trigrams"):
+    types = [type_ for type_, in db.session.query(Record.type).distinct()]
+    delete_for()
+    db.session.commit()
+    for type_ in sorted(types):
+      _rebuild_type(Record, type_)
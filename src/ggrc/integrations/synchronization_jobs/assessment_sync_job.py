@@ -5,7 +5,7 @@
 
 import logging
 
-from ggrc.integrations import issues, integrations_errors
+from ggrc.integrations import issues
 from ggrc.integrations.synchronization_jobs import sync_utils
 
 
@@ -31,15 +31,16 @@ def sync_assessment_statuses():
 
   Checks for Assessments which are in sync with Issue Tracker issues and
   updates their statuses in accordance to the corresponding Assessments
-  if differ.
+  if differ. Remote states are fetched and differing issues are updated
+  concurrently.
   """
   assessment_issues = sync_utils.collect_issue_tracker_info("Assessment")
   if not assessment_issues:
     return
   logger.debug('Syncing state of %d issues.', len(assessment_issues))
 
-  cli = issues.Client()
   processed_ids = set()
+  issue_params = {}
   for batch in sync_utils.iter_issue_batches(assessment_issues.keys()):
     for issue_id, issuetracker_state in batch.iteritems():
       issue_id = str(issue_id)
@@ -68,14 +69,14 @@ def sync_assessment_statuses():
           for field in FIELDS_TO_CHECK
       ):
         continue
-
-      try:
-        sync_utils.update_issue(cli, issue_id, assessment_state)
-      except integrations_errors.Error as error:
-        logger.error(
-            'Unable to update status of Issue Tracker issue ID=%s for '
-            'assessment ID=%d: %r',
-            issue_id, issue_info['object_id'], error)
+      issue_params[issue_id] = assessment_state
+
+  errors = sync_utils.update_issues(issues.Client(), issue_params)
+  for issue_id, error in sorted(errors.iteritems()):
+    logger.error(
+        'Unable to update status of Issue Tracker issue ID=%s for '
+        'assessment ID=%d: %r',
+        issue_id, assessment_issues[issue_id]['object_id'], error)
 
   logger.debug('Sync is done, %d issue(s) were processed.', len(processed_ids))
 
@@ -5,9 +5,14 @@
 
 # pylint: disable=invalid-name
 
+import collections
+import datetime
 import logging
 
 from ggrc import db
+from ggrc import utils
+from ggrc.cache import utils as cache_utils
+from ggrc.fulltext import reindex_queue
 from ggrc.models import all_models
 from ggrc.integrations.synchronization_jobs import sync_utils
 
@@ -41,12 +46,24 @@ def get_current_issue_tracker_person_acl(sync_object, role_name):
   return acls[0] if acls else None
 
 
-def sync_assignee_email(issuetracker_state, sync_object, assignees_role):
+def get_people_by_email(batch):
+  """Load people with assignee and verifier emails of a batch of issues."""
+  emails = {state.get(field)
+            for state in batch.itervalues()
+            for field in ("assignee", "verifier")}
+  emails.discard(None)
+  if not emails:
+    return {}
+  return {person.email: person
+          for person in all_models.Person.query.filter(
+              all_models.Person.email.in_(emails))}
+
+
+def sync_assignee_email(issuetracker_state, sync_object, assignees_role,
+                        people):
   """Sync issue assignee email."""
   issue_tracker_assignee = issuetracker_state.get("assignee")
-  new_assignee = all_models.Person.query.filter_by(
-      email=issue_tracker_assignee
-  ).first()
+  new_assignee = people.get(issue_tracker_assignee)
   if new_assignee:
     issue_primary_contacts = sync_object.get_persons_for_rolename(
         "Primary Contacts"
@@ -66,12 +83,11 @@ def sync_assignee_email(issuetracker_state, sync_object, assignees_role):
       }])
 
 
-def sync_verifier_email(issuetracker_state, sync_object, admin_role):
+def sync_verifier_email(issuetracker_state, sync_object, admin_role,
+                        people):
   """Sync Issue verifier email."""
   issue_tracker_verifier = issuetracker_state.get("verifier")
-  new_verifier = all_models.Person.query.filter_by(
-      email=issue_tracker_verifier
-  ).first()
+  new_verifier = people.get(issue_tracker_verifier)
   if new_verifier:
     issue_admins = sync_object.get_persons_for_rolename("Admin")
     admin_emails = [admin.email for admin in issue_admins]
@@ -86,19 +102,63 @@ def sync_verifier_email(issuetracker_state, sync_object, admin_role):
       }])
 
 
-def sync_statuses(issuetracker_state, sync_object):
-  """Sync issue object statuses."""
+def get_new_status(issuetracker_state, sync_object):
+  """Returns issue object status to set or None if it is in sync."""
   issue_tracker_status = issuetracker_state.get("status")
   if issue_tracker_status:
     issue_tracker_status = issue_tracker_status.lower()
-  if ISSUE_STATUS_MAPPING[issue_tracker_status] != sync_object.status:
-    sync_object.status = ISSUE_STATUS_MAPPING[issue_tracker_status]
+  new_status = ISSUE_STATUS_MAPPING.get(issue_tracker_status)
+  if not new_status:
+    logger.error("Unknown Issue Tracker status %s for issue ID=%d.",
+                 issue_tracker_status, sync_object.id)
+    return None
+  if new_status == sync_object.status:
+    return None
+  return new_status
+
+
+def update_statuses(objects_by_status):
+  """Update statuses of issue objects with batched statements.
+
+  Statements bypass the status validator, so end_date of objects moved to
+  the auto setup status (Deprecated) is set here in the same statement.
+
+  Args:
+    objects_by_status: A dict of new statuses and lists of objects to set
+        them to.
+  """
+  issue = all_models.Issue
+  now = datetime.datetime.utcnow()
+  ids = []
+  for status, objects in sorted(objects_by_status.iteritems()):
+    values = {"status": status, "updated_at": now}
+    if status == issue.AUTO_SETUP_STATUS:
+      values["end_date"] = datetime.date.today()
+    status_ids = sorted(obj.id for obj in objects)
+    for ids_chunk in utils.list_chunks(status_ids):
+      db.session.execute(
+          issue.__table__.update().where(
+              issue.__table__.c.id.in_(ids_chunk)
+          ).values(**values)
+      )
+    for obj in objects:
+      db.session.expire(obj, values.keys())
+    ids.extend(status_ids)
+  if not ids:
+    return
+  cache_utils.add_query_changes([issue.__name__])
+  if reindex_queue.is_enabled():
+    reindex_queue.enqueue({issue.__name__: ids})
+    return
+  for ids_chunk in utils.list_chunks(ids, reindex_queue.REINDEX_CHUNK_SIZE):
+    issue.bulk_record_update_for(ids_chunk)
 
 
 def sync_issue_attributes():
   """Synchronizes issue tracker ticket attrs with the Issue object attrs.
 
   Synchronize issue status and email list (Primary contacts and Admins).
+  Changed statuses are written with batched statements per status.
   """
   issuetracker_issues = sync_utils.collect_issue_tracker_info(
       "Issue",
@@ -117,8 +177,10 @@ def sync_issue_attributes():
   ).first()
 
   processed_ids = set()
+  objects_by_status = collections.defaultdict(list)
   for batch in sync_utils.iter_issue_batches(issuetracker_issues.keys(),
                                              include_emails=True):
+    people = get_people_by_email(batch)
     for issue_id, issuetracker_state in batch.iteritems():
       issue_id = str(issue_id)
       issue_info = issuetracker_issues.get(issue_id)
@@ -131,10 +193,16 @@ def sync_issue_attributes():
       sync_object = issue_info["object"]
 
       # Sync attributes.
-      sync_statuses(issuetracker_state, sync_object)
-      sync_assignee_email(issuetracker_state, sync_object, assignees_role)
-      sync_verifier_email(issuetracker_state, sync_object, admin_role)
-
+      new_status = get_new_status(issuetracker_state, sync_object)
+      if new_status:
+        objects_by_status[new_status].append(sync_object)
+      sync_assignee_email(issuetracker_state, sync_object, assignees_role,
+                          people)
+      sync_verifier_email(issuetracker_state, sync_object, admin_role,
+                          people)
+
+  db.session.flush()
+  update_statuses(objects_by_status)
   db.session.commit()
   logger.debug("Sync is done, %d issue(s) were processed.", len(processed_ids))
 
@@ -1,14 +1,25 @@
 # Copyright (C) 2018 Google Inc.
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
-"""Module provides various utils for Issue tracker integration service."""
+"""Module provides various utils for Issue tracker integration service.
+
+Batches of issues are fetched and tickets are updated in a pool of
+ISSUE_TRACKER_SYNC_WORKERS threads. All search and update requests of a
+process share a token bucket limiter allowing ISSUE_TRACKER_RATE_LIMIT
+requests per second, so that concurrent requests do not run into rate limits
+of Issue Tracker.
+"""
 
 import logging
+import threading
 import time
+from multiprocessing.pool import ThreadPool
 
 from sqlalchemy.sql import expression
 
 from ggrc import models
+from ggrc import settings
+from ggrc import utils
 from ggrc.integrations import integrations_errors
 from ggrc.integrations import issues
 
@@ -17,11 +28,94 @@ logger = logging.getLogger(__name__)
 
 _BATCH_SIZE = 100
 
+_rate_limiter = None
+
+
+class RateLimiter(object):
+  """Thread safe token bucket limiter of request rate."""
+
+  def __init__(self, rate, capacity=None):
+    self.rate = float(rate)
+    self.capacity = float(capacity or rate)
+    self._tokens = self.capacity
+    self._updated_at = time.time()
+    self._condition = threading.Condition()
+
+  def _refill(self):
+    now = time.time()
+    self._tokens = min(self.capacity,
+                       self._tokens + (now - self._updated_at) * self.rate)
+    self._updated_at = now
+
+  def acquire(self):
+    """Wait until a request is allowed and take a token for it."""
+    with self._condition:
+      while True:
+        self._refill()
+        if self._tokens >= 1:
+          self._tokens -= 1
+          return
+        self._condition.wait((1 - self._tokens) / self.rate)
+
+
+def get_rate_limiter():
+  """Returns limiter shared by all requests of the process or None."""
+  global _rate_limiter  # pylint: disable=global-statement
+  rate = getattr(settings, "ISSUE_TRACKER_RATE_LIMIT", 0)
+  if rate <= 0:
+    return None
+  if _rate_limiter is None or _rate_limiter.rate != rate:
+    _rate_limiter = RateLimiter(rate)
+  return _rate_limiter
+
+
+def _wait_for_rate_limit():
+  limiter = get_rate_limiter()
+  if limiter is not None:
+    limiter.acquire()
+
+
+def _imap(func, items):
+  """Map func over items in a pool of ISSUE_TRACKER_SYNC_WORKERS threads.
+
+  Results are yielded in the order of items.
+  """
+  workers = min(getattr(settings, "ISSUE_TRACKER_SYNC_WORKERS", 1),
+                len(items))
+  if workers < 2:
+    for item in items:
+      yield func(item)
+    return
+  pool = ThreadPool(workers)
+  try:
+    for result in pool.imap(func, items):
+      yield result
+  finally:
+    pool.terminate()
+    pool.join()
+
+
+def _load_tracked_objects(model_name, issue_objects):
+  """Loads tracked objects in bulk, so that they are taken from the session.
+
+  Returns:
+    A list of loaded objects, which must be referenced while they are used.
+  """
+  model = models.get_model(model_name)
+  ids = sorted({iti.object_id for iti in issue_objects})
+  loaded = []
+  for ids_chunk in utils.list_chunks(ids):
+    loaded.extend(model.query.filter(model.id.in_(ids_chunk)))
+  return loaded
+
 
 def collect_issue_tracker_info(model_name, include_object=False):
   """Returns issue tracker info associated with GGRC object."""
   issue_params = {}
   issue_objects = get_active_issue_info(model_name=model_name)
+  loaded_objects = []
+  if include_object:
+    loaded_objects = _load_tracked_objects(model_name, issue_objects)
   for iti in issue_objects:
     sync_object = iti.issue_tracked_obj
     if not sync_object:
@@ -50,6 +144,9 @@ def collect_issue_tracker_info(model_name, include_object=False):
     if include_object:
       issue_params[iti.issue_id]["object"] = sync_object
 
+  # Loaded objects are referenced until all issue_tracked_obj lookups are done
+  # so that the session does not drop them and load them one by one.
+  del loaded_objects
   return issue_params
 
 
@@ -63,45 +160,59 @@ def get_active_issue_info(model_name):
   ).order_by(issuetracker_cls.object_id).all()
 
 
+def _fetch_issue_batch(cli, ids, include_emails):
+  """Fetches states of issues from Issue Tracker by IDs."""
+  logger.debug('Issue ids to process: %s', ids)
+  _wait_for_rate_limit()
+  response = cli.search({
+      'issue_ids': ids,
+      'page_size': _BATCH_SIZE,
+  })
+
+  issue_infos = {}
+  response_issues = response.get('issues') or []
+  for info in response_issues:
+    state = info['issueState'] or {}
+    issue_info = {
+        'status': state.get('status'),
+        'type': state.get('type'),
+        'priority': state.get('priority'),
+        'severity': state.get('severity'),
+    }
+
+    if include_emails:
+      issue_info.update({
+          'assignee': state.get('assignee'),
+          'reporter': state.get('reporter'),
+          'verifier': state.get('verifier'),
+      })
+
+    issue_infos[info['issueId']] = issue_info
+  return issue_infos
+
+
 def iter_issue_batches(ids, include_emails=False):
-  """Generates a sequence of batches of issues from Issue Tracker by IDs."""
+  """Generates a sequence of batches of issues from Issue Tracker by IDs.
+
+  Batches are fetched concurrently and generated in the order of IDs.
+  """
   cli = issues.Client()
+  chunks = [ids[i:i + _BATCH_SIZE] for i in xrange(0, len(ids), _BATCH_SIZE)]
 
-  for i in xrange(0, len(ids), _BATCH_SIZE):
-    chunk = ids[i:i + _BATCH_SIZE]
-    logger.debug('Issue ids to process: %s', chunk)
+  def fetch(chunk):
+    """Fetch a single batch, errors are returned instead of raised."""
     try:
-      response = cli.search({
-          'issue_ids': chunk,
-          'page_size': _BATCH_SIZE,
-      })
+      return _fetch_issue_batch(cli, chunk, include_emails)
     except integrations_errors.HttpError as error:
+      return error
+
+  for result in _imap(fetch, chunks):
+    if isinstance(result, integrations_errors.HttpError):
       logger.error(
-          'Unable to fetch Issue Tracker issues by IDs: %r', error)
+          'Unable to fetch Issue Tracker issues by IDs: %r', result)
       return
-
-    issue_infos = {}
-    response_issues = response.get('issues') or []
-    for info in response_issues:
-      state = info['issueState'] or {}
-      issue_info = {
-          'status': state.get('status'),
-          'type': state.get('type'),
-          'priority': state.get('priority'),
-          'severity': state.get('severity'),
-      }
-
-      if include_emails:
-        issue_info.update({
-            'assignee': state.get('assignee'),
-            'reporter': state.get('reporter'),
-            'verifier': state.get('verifier'),
-        })
-
-      issue_infos[info['issueId']] = issue_info
-
-    if issue_infos:
-      yield issue_infos
+    if result:
+      yield result
 
 
 def update_issue(cli, issue_id, params, max_attempts=5, interval=1):
@@ -109,6 +220,7 @@ def update_issue(cli, issue_id, params, max_attempts=5, interval=1):
   attempts = max_attempts
   while True:
     attempts -= 1
+    _wait_for_rate_limit()
     try:
       cli.update_issue(issue_id, params)
     except integrations_errors.HttpError as error:
@@ -121,3 +233,27 @@ def update_issue(cli, issue_id, params, max_attempts=5, interval=1):
         time.sleep(interval)
         continue
     break
+
+
+def update_issues(cli, issue_params):
+  """Performs update requests of multiple issues concurrently.
+
+  Args:
+    cli: Issue Tracker client.
+    issue_params: A dict of issue IDs and parameters to update them with.
+
+  Returns:
+    A dict of issue IDs and errors of failed updates.
+  """
+  def update(item):
+    """Update a single issue, errors are returned instead of raised."""
+    issue_id, params = item
+    try:
+      update_issue(cli, issue_id, params)
+    except integrations_errors.Error as error:
+      return issue_id, error
+    return issue_id, None
+
+  return {issue_id: error
+          for issue_id, error in _imap(update, sorted(issue_params.items()))
+          if error is not None}
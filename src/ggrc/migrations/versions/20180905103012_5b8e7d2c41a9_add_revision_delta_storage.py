@@ -0,0 +1,40 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add delta_base_id column to revisions
+
+Create Date: 2018-09-05 10:30:12.418263
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5b8e7d2c41a9'
+down_revision = 'b46bdb31d869'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.add_column('revisions',
+                sa.Column('delta_base_id', sa.Integer(), nullable=True))
+  op.create_index('ix_revisions_delta_base_id', 'revisions',
+                  ['delta_base_id'], unique=False)
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  # Content of delta stored revisions can not be restored with SQL, so the
+  # column is only dropped if all revisions are stored in full.
+  connection = op.get_bind()
+  delta_count = connection.execute(
+      "SELECT COUNT(*) FROM revisions WHERE delta_base_id IS NOT NULL"
+  ).scalar()
+  if delta_count:
+    raise Exception("{} revisions are stored as deltas".format(delta_count))
+  op.drop_index('ix_revisions_delta_base_id', table_name='revisions')
+  op.drop_column('revisions', 'delta_base_id')
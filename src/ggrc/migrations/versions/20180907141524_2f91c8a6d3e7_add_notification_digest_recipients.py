@@ -0,0 +1,36 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add notification_digest_recipients table
+
+Create Date: 2018-09-07 14:15:24.716305
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '2f91c8a6d3e7'
+down_revision = '5b8e7d2c41a9'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'notification_digest_recipients',
+      sa.Column('id', sa.Integer(), nullable=False),
+      sa.Column('digest_date', sa.Date(), nullable=False),
+      sa.Column('email', sa.String(length=250), nullable=False),
+      sa.PrimaryKeyConstraint('id'),
+      sa.UniqueConstraint('digest_date', 'email',
+                          name='uq_notification_digest_recipients'),
+  )
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('notification_digest_recipients')
@@ -0,0 +1,36 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add fulltext_record_trigrams table
+
+Create Date: 2018-09-10 11:20:36.418527
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '7c3e9a5d1b48'
+down_revision = '2f91c8a6d3e7'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'fulltext_record_trigrams',
+      sa.Column('trigram', sa.String(length=3), nullable=False),
+      sa.Column('type', sa.String(length=64), nullable=False),
+      sa.Column('key', sa.Integer(), autoincrement=False, nullable=False),
+      sa.PrimaryKeyConstraint('trigram', 'type', 'key'),
+  )
+  op.create_index('ix_fulltext_record_trigrams_type_key',
+                  'fulltext_record_trigrams', ['type', 'key'], unique=False)
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('fulltext_record_trigrams')
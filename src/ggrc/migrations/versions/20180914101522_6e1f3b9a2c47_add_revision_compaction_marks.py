@@ -0,0 +1,36 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add revision_compaction_marks table
+
+Create Date: 2018-09-14 10:15:22.381904
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '6e1f3b9a2c47'
+down_revision = '4a6d2f8e9c15'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'revision_compaction_marks',
+      sa.Column('resource_type', sa.String(length=250), nullable=False),
+      sa.Column('resource_id', sa.Integer(), autoincrement=False,
+                nullable=False),
+      sa.Column('revision_id', sa.Integer(), nullable=False),
+      sa.Column('keyframe_interval', sa.Integer(), nullable=False),
+      sa.PrimaryKeyConstraint('resource_type', 'resource_id'),
+  )
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('revision_compaction_marks')
@@ -0,0 +1,37 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add import_export_chunks table
+
+Create Date: 2018-09-14 14:32:08.520173
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '9d2c5a7e4f61'
+down_revision = '6e1f3b9a2c47'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'import_export_chunks',
+      sa.Column('id', sa.Integer(), nullable=False),
+      sa.Column('import_export_id', sa.Integer(), nullable=False),
+      sa.Column('content', mysql.LONGTEXT(), nullable=False),
+      sa.ForeignKeyConstraint(['import_export_id'], ['import_exports.id'],
+                              ondelete='CASCADE'),
+      sa.PrimaryKeyConstraint('id'),
+  )
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('import_export_chunks')
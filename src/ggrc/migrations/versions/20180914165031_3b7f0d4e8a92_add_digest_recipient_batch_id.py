@@ -0,0 +1,35 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add notification_id column to notification_digest_recipients
+
+Create Date: 2018-09-14 16:50:31.207415
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3b7f0d4e8a92'
+down_revision = '9d2c5a7e4f61'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.add_column('notification_digest_recipients',
+                sa.Column('notification_id', sa.Integer(), nullable=False))
+  # Recipients of an unfinished run belong to a batch with all notifications
+  # existing at the time of the migration.
+  op.execute("""
+      UPDATE notification_digest_recipients
+      SET notification_id = (SELECT COALESCE(MAX(id), 0) FROM notifications)
+  """)
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_column('notification_digest_recipients', 'notification_id')
@@ -90,6 +90,17 @@ def init_session_monitor_cache():
   event.listen(Session, 'after_rollback', clear_cache)
 
 
+def init_query_cache_monitor():
+  """Drop query result generations of models changed by every commit."""
+  from sqlalchemy.orm.session import Session
+  from sqlalchemy import event
+  from ggrc.cache import utils as cache_utils
+
+  event.listen(Session, 'after_flush', cache_utils.collect_query_changes)
+  event.listen(Session, 'after_commit', cache_utils.expire_query_results)
+  event.listen(Session, 'after_rollback', cache_utils.drop_query_changes)
+
+
 def init_sanitization_hooks():
   # Register event listener on all String and Text attributes to sanitize them.
   for model in all_models.all_models:  # noqa
@@ -103,6 +114,7 @@ def init_app(app):
   init_all_models(app)
   init_lazy_mixins()
   init_session_monitor_cache()
+  init_query_cache_monitor()
   init_sanitization_hooks()
 
 from ggrc.models.inflector import get_model  # noqa
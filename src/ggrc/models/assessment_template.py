@@ -210,6 +210,25 @@ class AssessmentTemplate(assessment.AuditRelationship, relationship.Relatable,
     db.session.add(assessment_template_copy)
     return assessment_template_copy
 
+  def _clone_values(self, target):
+    """Get column values of Assessment Template copy for bulk cloning.
+
+    Args:
+      target: Destination Audit object.
+
+    Returns:
+      Dict of column names and values of assessment template copy.
+    """
+    return {
+        "title": self.title,
+        "audit_id": target.id,
+        "template_object_type": self.template_object_type,
+        "test_plan_procedure": self.test_plan_procedure,
+        "procedure_description": self.procedure_description,
+        "default_people": self.default_people,
+        "status": self.status,
+    }
+
   def clone(self, target):
     """Clone Assessment Template and related custom attributes."""
     assessment_template_copy = self._clone(target)
@@ -113,8 +113,10 @@ def _add_task_acl(task):
   db.session.add(task)
   db.session.commit()
   if admin_role:
-    from ggrc.cache.utils import clear_users_permission_cache
-    clear_users_permission_cache([get_current_user().id])
+    from ggrc.cache.utils import update_users_permission_cache
+    update_users_permission_cache([
+        (get_current_user().id, task.type, task.id),
+    ])
 
 
 def collect_task_headers():
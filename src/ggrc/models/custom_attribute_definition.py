@@ -3,7 +3,10 @@
 
 """Custom attribute definition module"""
 
+import collections
+
 import flask
+import sqlalchemy as sa
 from sqlalchemy import func
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import validates
@@ -18,6 +21,7 @@ from ggrc.models.custom_attribute_value import CustomAttributeValue
 from ggrc.access_control import role as acr
 from ggrc.models.exceptions import ValidationError
 from ggrc.models import reflection
+from ggrc.models import revision_content
 from ggrc.cache import memcache
 
 
@@ -381,6 +385,35 @@ def get_custom_attributes_for(model_name, instance_id=None):
   return cads
 
 
+def get_custom_attributes_for_many(model_name, instance_ids):
+  """Returns custom attributes jsons for many instances of sent model_name.
+
+  Returns:
+    dict of instance id to list of custom attribute jsons; local definitions
+    of all instances are loaded with a single query.
+  """
+  from ggrc import models
+  instance_ids = list(instance_ids)
+  model = models.get_model(model_name)
+  if not model or not issubclass(model, models.mixins.CustomAttributable):
+    return {instance_id: [] for instance_id in instance_ids}
+
+  definition_type = get_model_name_inflector_dict()[model_name]
+  if not definition_type:
+    return {instance_id: [] for instance_id in instance_ids}
+  global_cads = get_global_cads(definition_type)
+  local_cads = collections.defaultdict(list)
+  if instance_ids and get_cads_counts().get((definition_type, False)):
+    query = CustomAttributeDefinition.query.filter(
+        CustomAttributeDefinition.definition_type == definition_type,
+        CustomAttributeDefinition.definition_id.in_(instance_ids),
+    )
+    for cad in query:
+      local_cads[cad.definition_id].append(cad.log_json())
+  return {instance_id: global_cads + local_cads[instance_id]
+          for instance_id in instance_ids}
+
+
 class CustomAttributeMapable(object):
   # pylint: disable=too-few-public-methods
   # because this is a mixin
@@ -403,3 +436,11 @@ class CustomAttributeMapable(object):
         foreign_keys="CustomAttributeValue.attribute_object_id",
         backref='attribute_{0}'.format(cls.__name__),
         viewonly=True)
+
+
+sa.event.listen(CustomAttributeDefinition, "after_insert",
+                revision_content.clear_cads)
+sa.event.listen(CustomAttributeDefinition, "after_update",
+                revision_content.clear_cads)
+sa.event.listen(CustomAttributeDefinition, "after_delete",
+                revision_content.clear_cads)
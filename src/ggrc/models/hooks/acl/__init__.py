@@ -8,16 +8,21 @@ This package should have the single hook that should handle all acl propagation
 and deletion.
 """
 import collections
+import itertools
 
 import flask
 import sqlalchemy as sa
 from sqlalchemy.orm.session import Session
 
+from ggrc.cache import utils as cache_utils
 from ggrc.models import all_models
 from ggrc.models.hooks.acl import propagation
 from ggrc.utils import benchmark
 from ggrc_workflows.models.hooks import workflow
 
+# Models that grant permissions through user roles and contexts.
+ROLE_MODELS = ("UserRole", "Role", "Context", "AccessControlRole")
+
 
 def _add_or_update(name, value):
   """Add or update flask.g attribute."""
@@ -40,6 +45,7 @@ def add_relationships(relationship_ids):
   _add_or_update("new_acl_ids", set())
   _add_or_update("new_relationship_ids", relationship_ids)
   _add_or_update("deleted_objects", set())
+  cache_utils.add_permission_changes(outdated=bool(relationship_ids))
 
 
 def _get_propagation_entries(session):
@@ -70,6 +76,14 @@ def _get_propagation_entries(session):
           deleted)
 
 
+def _has_role_changes(session):
+  """Check if flushed objects change roles or contexts of users."""
+  return any(
+      obj.__class__.__name__ in ROLE_MODELS
+      for obj in itertools.chain(session.new, session.dirty)
+  )
+
+
 def after_flush(session, _):
   """Handle all ACL hooks after after flush."""
   with benchmark("handle ACL hooks after flush"):
@@ -92,6 +106,23 @@ def after_flush(session, _):
         workflow.get_deleted_wf_objects(session)
     )
 
+    # New ACL rows and their propagated rows are patched into cached
+    # permissions, other propagation sources outdate all cached permissions.
+    deleted_objects = {
+        key for key in deleted
+        if key[0] != all_models.AccessControlList.__name__
+    }
+    cache_utils.add_permission_changes(
+        acl_ids=acl_ids,
+        outdated=bool(relationship_ids or deleted_objects or wf_comments or
+                      wf_acls - acl_ids or _has_role_changes(session)),
+    )
+
+
+def after_acl_update(*_):
+  """Outdate cached permissions after an update of an ACL row."""
+  cache_utils.add_permission_changes(outdated=True)
+
 
 def after_commit():
   """ACL propagation after commit action."""
@@ -104,3 +135,7 @@ def after_commit():
 def init_hook():
   """Initialize Relationship-related hooks."""
   sa.event.listen(Session, "after_flush", after_flush)
+  sa.event.listen(all_models.AccessControlList, "before_delete",
+                  cache_utils.before_acl_delete)
+  sa.event.listen(all_models.AccessControlList, "after_update",
+                  after_acl_update)
@@ -0,0 +1,351 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Batched ACL propagation engine.
+
+Unlike the layered propagation in the propagation module, which issues
+insert-select statements for every propagation step, this engine computes the
+full propagation tree for a batch of parent ACL entries in memory, using a
+relationship adjacency index and the access control role tree. The computed
+tree is then compared with the stored propagated entries and only the
+difference is written: missing entries are inserted with multi-row inserts
+and stale entries are deleted (their subtrees are removed by the cascading
+foreign key on parent_id).
+
+The propagation rules are the same as in the propagation module:
+
+  object entry -> relationship entry: for every relationship of the object,
+      for every child role of the entry role defined on Relationship, if that
+      role has a child role for the type of the other relationship side;
+  relationship entry -> object entry: for both sides of the relationship,
+      for every child role of the entry role defined on the type of that side.
+"""
+
+import collections
+import datetime
+import logging
+
+import sqlalchemy as sa
+
+from ggrc import db
+from ggrc import login
+from ggrc import utils
+from ggrc.models import all_models
+
+logger = logging.getLogger(__name__)
+
+# Same safety cutoff as in the layered propagation.
+PROPAGATION_DEPTH_LIMIT = 50
+
+
+Node = collections.namedtuple(
+    "Node",
+    ["parent", "person_id", "ac_role_id", "object_type", "object_id"],
+)
+
+
+class RoleTree(object):
+  """Access control role propagation tree."""
+
+  def __init__(self):
+    acr = all_models.AccessControlRole
+    rows = db.session.query(
+        acr.id,
+        acr.parent_id,
+        acr.object_type,
+    ).filter(
+        acr.parent_id.isnot(None),
+    )
+    relationship = all_models.Relationship.__name__
+    self.relationship_roles = collections.defaultdict(list)
+    self.object_roles = collections.defaultdict(list)
+    children_types = collections.defaultdict(set)
+    for role_id, parent_id, object_type in rows:
+      if object_type == relationship:
+        self.relationship_roles[parent_id].append(role_id)
+      self.object_roles[(parent_id, object_type)].append(role_id)
+      children_types[parent_id].add(object_type)
+    self.children_types = dict(children_types)
+
+
+class RelationshipIndex(object):
+  """Adjacency index of relationships loaded on demand.
+
+  The index is created for a single propagation batch: neighbourhoods of
+  objects reached by the batch are loaded from the database once and kept
+  until the batch is done. It is not kept between batches, so its size is
+  bounded by the neighbourhoods of one batch and relationships changed by
+  earlier batches are loaded again.
+  """
+
+  def __init__(self):
+    self._neighbours = {}
+    self._relationships = {}
+
+  def _load(self, keys):
+    """Load relationships for objects that are not in the index yet."""
+    missing = collections.defaultdict(set)
+    for object_type, object_id in keys:
+      if (object_type, object_id) not in self._neighbours:
+        missing[object_type].add(object_id)
+        self._neighbours[(object_type, object_id)] = []
+    if not missing:
+      return
+    rel = all_models.Relationship
+    for object_type, ids in missing.iteritems():
+      for ids_chunk in utils.list_chunks(list(ids)):
+        query = db.session.query(
+            rel.id,
+            rel.source_type,
+            rel.source_id,
+            rel.destination_type,
+            rel.destination_id,
+        ).filter(
+            sa.or_(
+                sa.and_(rel.source_type == object_type,
+                        rel.source_id.in_(ids_chunk)),
+                sa.and_(rel.destination_type == object_type,
+                        rel.destination_id.in_(ids_chunk)),
+            )
+        )
+        for row in query:
+          self._add(*row)
+
+  def _add(self, rel_id, source_type, source_id, dest_type, dest_id):
+    """Add a single relationship to the index."""
+    if rel_id in self._relationships:
+      return
+    self._relationships[rel_id] = ((source_type, source_id),
+                                   (dest_type, dest_id))
+    for key, other in (((source_type, source_id), (dest_type, dest_id)),
+                       ((dest_type, dest_id), (source_type, source_id))):
+      if key in self._neighbours:
+        self._neighbours[key].append((rel_id, other))
+
+  def neighbours(self, keys):
+    """Get relationships for the given objects.
+
+    Returns:
+      dict with a list of (relationship id, (type, id) of the other side)
+      for every given (type, id) object key.
+    """
+    self._load(keys)
+    return {key: self._neighbours[key] for key in keys}
+
+  def sides(self, rel_id):
+    """Get (type, id) keys of relationship source and destination."""
+    return self._relationships.get(rel_id, ())
+
+
+def _load_roots(acl_ids):
+  """Get root nodes for the given parent ACL ids."""
+  acl = all_models.AccessControlList
+  roots = {}
+  for ids_chunk in utils.list_chunks(list(acl_ids)):
+    query = db.session.query(
+        acl.id,
+        acl.person_id,
+        acl.ac_role_id,
+        acl.object_type,
+        acl.object_id,
+    ).filter(
+        acl.id.in_(ids_chunk),
+    )
+    for acl_id, person_id, role_id, object_type, object_id in query:
+      roots[acl_id] = Node(None, person_id, role_id, object_type, object_id)
+  return roots
+
+
+def _add_child(children, parent, role_id, object_type, object_id):
+  """Add expected child node to its parent."""
+  node = Node(parent, parent.person_id, role_id, object_type, object_id)
+  children[parent][(role_id, object_type, object_id)] = node
+  return node
+
+
+def _get_relationship_children(frontier, role_tree, index):
+  """Get expected relationship entries propagated from object entries."""
+  relationship = all_models.Relationship.__name__
+  rel_children = collections.defaultdict(dict)
+  neighbours = index.neighbours({(n.object_type, n.object_id)
+                                 for n in frontier})
+  for node in frontier:
+    for role_id in role_tree.relationship_roles.get(node.ac_role_id, ()):
+      other_types = role_tree.children_types.get(role_id, ())
+      for rel_id, (other_type, _) in neighbours[(node.object_type,
+                                                 node.object_id)]:
+        if other_type in other_types:
+          _add_child(rel_children, node, role_id, relationship, rel_id)
+  return rel_children
+
+
+def _get_object_children(rel_children, role_tree, index):
+  """Get expected object entries propagated from relationship entries."""
+  obj_children = collections.defaultdict(dict)
+  for children in rel_children.itervalues():
+    for node in children.itervalues():
+      for object_type, object_id in index.sides(node.object_id):
+        role_ids = role_tree.object_roles.get((node.ac_role_id, object_type),
+                                              ())
+        for role_id in role_ids:
+          _add_child(obj_children, node, role_id, object_type, object_id)
+  return obj_children
+
+
+def compute_tree(roots, role_tree, index):
+  """Compute expected propagation tree for root nodes.
+
+  Args:
+    roots: list of root nodes.
+    role_tree: RoleTree instance.
+    index: RelationshipIndex instance.
+
+  Returns:
+    list of levels, each level is a dict of parent node to a dict of expected
+    children keyed by (ac_role_id, object_type, object_id).
+  """
+  levels = []
+  frontier = roots
+  for _ in range(PROPAGATION_DEPTH_LIMIT):
+    if not frontier:
+      return levels
+    rel_children = _get_relationship_children(frontier, role_tree, index)
+    levels.append(rel_children)
+    obj_children = _get_object_children(rel_children, role_tree, index)
+    levels.append(obj_children)
+    frontier = [node for children in obj_children.itervalues()
+                for node in children.itervalues()]
+
+  raise Exception("Propagation depth limit exceeded. Check the propagation "
+                  "tree for cycles, invalid entries or too deep entries.")
+
+
+def _load_existing_children(parent_ids):
+  """Get stored propagated entries for the given parent ACL ids.
+
+  Returns:
+    dict of parent id to dict of child ACL id keyed by
+    (ac_role_id, object_type, object_id).
+  """
+  acl = all_models.AccessControlList
+  existing = collections.defaultdict(dict)
+  for ids_chunk in utils.list_chunks(list(parent_ids)):
+    query = db.session.query(
+        acl.id,
+        acl.parent_id,
+        acl.ac_role_id,
+        acl.object_type,
+        acl.object_id,
+    ).filter(
+        acl.parent_id.in_(ids_chunk),
+    )
+    for acl_id, parent_id, role_id, object_type, object_id in query:
+      existing[parent_id][(role_id, object_type, object_id)] = acl_id
+  return existing
+
+
+def _insert_nodes(nodes, node_ids):
+  """Insert ACL entries for nodes and store their new ids in node_ids."""
+  if not nodes:
+    return
+  acl_table = all_models.AccessControlList.__table__
+  now = datetime.datetime.utcnow().replace(microsecond=0)
+  user_id = login.get_current_user_id()
+  for nodes_chunk in utils.list_chunks(nodes):
+    db.session.execute(
+        acl_table.insert().prefix_with("IGNORE").values([{
+            "person_id": node.person_id,
+            "ac_role_id": node.ac_role_id,
+            "object_id": node.object_id,
+            "object_type": node.object_type,
+            "created_at": now,
+            "modified_by_id": user_id,
+            "updated_at": now,
+            "parent_id": node_ids[node.parent],
+            "parent_id_nn": node_ids[node.parent],
+        } for node in nodes_chunk])
+    )
+  inserted = _load_existing_children({node_ids[node.parent] for node in nodes})
+  for node in nodes:
+    key = (node.ac_role_id, node.object_type, node.object_id)
+    node_ids[node] = inserted[node_ids[node.parent]][key]
+
+
+def _delete_acls(acl_ids):
+  """Delete ACL entries, their subtrees are removed by cascade."""
+  acl_table = all_models.AccessControlList.__table__
+  for ids_chunk in utils.list_chunks(list(acl_ids)):
+    db.session.execute(
+        acl_table.delete().where(acl_table.c.id.in_(ids_chunk))
+    )
+
+
+def sync_tree(roots, levels):
+  """Write the difference between expected tree and stored entries.
+
+  Args:
+    roots: dict of root ACL id to root node.
+    levels: expected propagation tree as returned by compute_tree.
+
+  Returns:
+    tuple with counts of inserted and deleted propagated entries.
+  """
+  node_ids = {node: acl_id for acl_id, node in roots.iteritems()}
+  # parents whose children might already be stored
+  stored_parents = set(roots.itervalues())
+  stale_ids = set()
+  inserted_count = 0
+  for level in levels:
+    existing = _load_existing_children(
+        {node_ids[parent] for parent in stored_parents}
+    )
+    for parent in stored_parents:
+      expected_keys = level.get(parent, {})
+      stale_ids.update(
+          acl_id for key, acl_id in existing[node_ids[parent]].iteritems()
+          if key not in expected_keys
+      )
+    new_nodes = []
+    next_stored_parents = set()
+    for parent, children in level.iteritems():
+      stored = existing.get(node_ids[parent], {}) \
+          if parent in stored_parents else {}
+      for key, node in children.iteritems():
+        if key in stored:
+          node_ids[node] = stored[key]
+          next_stored_parents.add(node)
+        else:
+          new_nodes.append(node)
+    _insert_nodes(new_nodes, node_ids)
+    inserted_count += len(new_nodes)
+    stored_parents = next_stored_parents
+  # children of the leaf level entries are stale as well
+  existing = _load_existing_children(
+      {node_ids[parent] for parent in stored_parents}
+  )
+  for children in existing.itervalues():
+    stale_ids.update(children.itervalues())
+  _delete_acls(stale_ids)
+  return inserted_count, len(stale_ids)
+
+
+def propagate_acls(acl_ids, role_tree=None, index=None):
+  """Synchronize propagated entries for a batch of parent ACL entries.
+
+  Args:
+    acl_ids: ids of ACL entries without parents.
+    role_tree: RoleTree instance, can be shared between batches.
+    index: RelationshipIndex instance for this batch, a new one is created
+      if not given.
+  """
+  if not acl_ids:
+    return
+  role_tree = role_tree or RoleTree()
+  index = index or RelationshipIndex()
+  with utils.benchmark("Compute ACL propagation tree"):
+    roots = _load_roots(acl_ids)
+    levels = compute_tree(roots.values(), role_tree, index)
+  with utils.benchmark("Store ACL propagation tree"):
+    inserted, deleted = sync_tree(roots, levels)
+  logger.info("Propagated ACL entries inserted: %s, deleted: %s",
+              inserted, deleted)
@@ -19,6 +19,7 @@ from ggrc import utils
 from ggrc.utils import helpers
 from ggrc.access_control import utils as acl_utils
 from ggrc.models import all_models
+from ggrc.models.hooks.acl import batch_propagation
 
 logger = logging.getLogger(__name__)
 
@@ -392,15 +393,18 @@ def propagate_all():
     with utils.benchmark("Propagate normal acl entries"):
       count = len(non_wf_acl_ids)
       propagated_count = 0
+      role_tree = batch_propagation.RoleTree()
       for acl_ids in utils.list_chunks(non_wf_acl_ids):
         propagated_count += len(acl_ids)
         logger.info("Propagating ACL entries: %s/%s", propagated_count, count)
-        _delete_propagated_acls(acl_ids)
-
-        flask.g.new_acl_ids = acl_ids
-        flask.g.new_relationship_ids = set()
-        flask.g.deleted_objects = set()
-        propagate()
+        # Relationship index is created per chunk so that its size is
+        # bounded by neighbourhoods of a single chunk.
+        batch_propagation.propagate_acls(
+            acl_ids,
+            role_tree=role_tree,
+            index=batch_propagation.RelationshipIndex(),
+        )
+        db.session.plain_commit()
 
     with utils.benchmark("Propagate WF related acl entries"):
       count = len(wf_acl_ids)
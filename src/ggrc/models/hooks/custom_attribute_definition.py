@@ -5,6 +5,9 @@
 
 import datetime
 
+import sqlalchemy as sa
+
+from ggrc.cache import bootstrap_cache
 from ggrc.models import all_models
 from ggrc.services import signals
 from ggrc.login import get_current_user_id
@@ -24,6 +27,12 @@ def invalidate_cache(sender, obj, src=None, service=None):
         obj.definition_type)
 
 
+def invalidate_bootstrap_cache(mapper, connection, target):
+  """Invalidate page bootstrap payloads on any change of cads."""
+  # pylint: disable=unused-argument
+  bootstrap_cache.invalidate()
+
+
 def init_hook():
   """Initialize CAD hooks"""
   # pylint: disable=unused-variable
@@ -48,3 +57,6 @@ def init_hook():
   signals.Restful.model_deleted.connect(invalidate_cache,
                                         all_models.CustomAttributeDefinition,
                                         weak=False)
+  for event in ("after_insert", "after_update", "after_delete"):
+    sa.event.listen(all_models.CustomAttributeDefinition, event,
+                    invalidate_bootstrap_cache)
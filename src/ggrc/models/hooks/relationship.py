@@ -102,14 +102,11 @@ def from_session(*models, **set_selectors):
   return decorator
 
 
-@from_session(all_models.Relationship, new=True, dirty=True)
-def handle_new_audit_issue_mapping(instances):
+def process_new_audit_issue_mappings(instances):
   """Check and process new Audit-Issue mapping rules.
 
   Triggers rule processing functions for creation of Audit-Issue Relationships.
   """
-  # pylint: disable=unused-argument
-
   for instance in instances:
     if not instance.source:
       # TODO: fix actions to make this impossible
@@ -132,6 +129,12 @@ def handle_new_audit_issue_mapping(instances):
       _handle_new_audit_issue_mapping(audit=src, issue=dst)
 
 
+@from_session(all_models.Relationship, new=True, dirty=True)
+def handle_new_audit_issue_mapping(instances):
+  """Process Audit-Issue mapping rules for Relationships in the session."""
+  process_new_audit_issue_mappings(instances)
+
+
 @from_session(all_models.Relationship, deleted=True)
 def handle_del_audit_issue_mapping(instances):
   """Check and process deleted Audit-Issue mapping rules.
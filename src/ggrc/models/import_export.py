@@ -17,6 +17,9 @@ from werkzeug.exceptions import BadRequest, Forbidden, NotFound
 
 logger = getLogger(__name__)
 
+# Number of bytes of the content stored in one chunk row
+CONTENT_CHUNK_SIZE = 1024 * 1024
+
 
 class ImportExport(Identifiable, db.Model):
   """ImportExport Model."""
@@ -59,7 +62,8 @@ class ImportExport(Identifiable, db.Model):
                                uselist=False)
   results = db.Column(mysql.LONGTEXT)
   title = db.Column(db.Text)
-  content = db.Column(mysql.LONGTEXT)
+  # Content of imports, content of exports is stored in ImportExportChunk
+  content = db.deferred(db.Column(mysql.LONGTEXT))
   gdrive_metadata = db.Column('gdrive_metadata', db.Text)
 
   def log_json(self, is_default=False):
@@ -83,6 +87,24 @@ class ImportExport(Identifiable, db.Model):
     return res
 
 
+class ImportExportChunk(Identifiable, db.Model):
+  """Chunk of ImportExport content.
+
+  Chunks of a single entry are ordered by id, so the content is appended
+  with an INSERT and read with an ordered SELECT without touching the
+  previously stored chunks.
+  """
+
+  __tablename__ = 'import_export_chunks'
+
+  import_export_id = db.Column(
+      db.Integer,
+      db.ForeignKey('import_exports.id', ondelete='CASCADE'),
+      nullable=False,
+  )
+  content = db.Column(mysql.LONGTEXT, nullable=False)
+
+
 def create_import_export_entry(**kwargs):
   """Create ImportExport entry"""
   meta = json.dumps(kwargs['gdrive_metadata']) if 'gdrive_metadata' in kwargs \
@@ -171,3 +193,82 @@ def clear_overtimed_tasks():
                      ie_job.job_type,
                      ie_job.id)
   db.session.commit()
+
+
+class ContentWriter(object):
+  """File-like object that appends written data to ImportExport content.
+
+  Data is buffered and stored as a new chunk row once the buffer reaches
+  chunk_size, so the content is never held in memory as a whole. Data must be
+  written in utf-8 encoded whole lines, like the csv module does, so that
+  chunks are always split on character boundaries.
+  """
+
+  def __init__(self, ie_id, chunk_size=CONTENT_CHUNK_SIZE):
+    self.ie_id = ie_id
+    self.chunk_size = chunk_size
+    self._buffer = []
+    self._buffer_size = 0
+
+  def write(self, data):
+    self._buffer.append(data)
+    self._buffer_size += len(data)
+    if self._buffer_size >= self.chunk_size:
+      self.flush()
+
+  def flush(self):
+    """Append buffered data to the stored content."""
+    if not self._buffer:
+      return
+    chunk = "".join(self._buffer).decode("utf-8")
+    self._buffer = []
+    self._buffer_size = 0
+    db.session.execute(
+        ImportExportChunk.__table__.insert().values(
+            import_export_id=self.ie_id,
+            content=chunk,
+        )
+    )
+
+
+def clear_content(ie_id):
+  """Remove stored content of ImportExport entry."""
+  table = ImportExport.__table__
+  db.session.execute(
+      table.update().where(table.c.id == ie_id).values(content=None)
+  )
+  chunk_table = ImportExportChunk.__table__
+  db.session.execute(
+      chunk_table.delete().where(chunk_table.c.import_export_id == ie_id)
+  )
+
+
+def iter_content(ie_id):
+  """Yield stored content of ImportExport entry chunk by chunk.
+
+  Content stored in the entry itself (imports) is yielded first. Chunks are
+  loaded one per query, so only a single chunk is held in memory.
+  """
+  content = db.session.query(
+      ImportExport.content
+  ).filter(
+      ImportExport.id == ie_id
+  ).scalar()
+  if content:
+    yield content
+  chunk = ImportExportChunk
+  last_id = 0
+  while True:
+    row = db.session.query(
+        chunk.id,
+        chunk.content,
+    ).filter(
+        chunk.import_export_id == ie_id,
+        chunk.id > last_id,
+    ).order_by(
+        chunk.id,
+    ).first()
+    if row is None:
+      return
+    last_id, content = row
+    yield content
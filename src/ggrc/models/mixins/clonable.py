@@ -6,6 +6,7 @@
 import itertools
 
 import datetime
+import uuid
 
 from collections import defaultdict
 
@@ -14,9 +15,12 @@ import sqlalchemy as sa
 from werkzeug import exceptions
 
 from ggrc import db
+from ggrc import login
+from ggrc import utils
 from ggrc.models import relationship, inflector
 from ggrc.rbac import permissions
 from ggrc.services import signals
+from ggrc.utils import benchmark
 from ggrc.utils.log_event import log_event
 
 
@@ -147,14 +151,19 @@ class MultiClonable(object):
             {
               "sourceObjectIds": [1, 2],
               "destination": {"type": "Audit", "id": 2},  # optional
-              "mappedObjects":[]  # optional
+              "mappedObjects":[],  # optional
+              "bulk": True  # optional
             }.
+            Copies are created with bulk statements if "bulk" is set, see
+            _bulk_clone.
 
     Returns:
         Response with status code 200 in case of success and 400 if provided
         parameters are invalid.
     """
     source_objs, destination, mapped_types = cls._parse_query(query)
+    if query.get("bulk"):
+      return cls._bulk_clone(source_objs, destination, mapped_types)
 
     clonned_objs = {}
     for source_obj in source_objs:
@@ -189,6 +198,315 @@ class MultiClonable(object):
         )
     return views.json_success_response(collections, datetime.datetime.utcnow())
 
+  @classmethod
+  def _bulk_clone(cls, source_objs, destination, mapped_types):
+    """Clone objects with multi-row INSERT statements.
+
+    Copies, their relationships to targets and local CADs are inserted as
+    table rows without loading them into the session, and their revisions
+    are written in chunks. Cloned models have to implement _clone_values.
+
+    Returns:
+        Response with type and id stubs of created copies.
+    """
+    from ggrc.cache import utils as cache_utils
+    from ggrc.models import all_models
+    from ggrc.models.hooks import acl
+    from ggrc.query import views
+
+    if destination is None:
+      raise exceptions.BadRequest("destination parameter wasn't provided")
+    cls._check_clone_permissions(source_objs, destination)
+
+    pairs = [(destination, source_obj) for source_obj in source_objs]
+    pairs.extend(cls._collect_mapped(source_objs, mapped_types))
+    if not pairs:
+      return views.json_success_response([], datetime.datetime.utcnow())
+
+    context_id = getattr(destination, "context_id", None)
+    user_id = login.get_current_user_id()
+    now = datetime.datetime.utcnow()
+    with benchmark("Insert object copies"):
+      copies = cls._insert_copies(pairs, context_id, user_id, now)
+    with benchmark("Insert relationships of copies"):
+      relationship_ids = cls._insert_copy_relationships(
+          pairs, copies, user_id, now)
+    with benchmark("Insert CADs of copies"):
+      cad_ids = cls._insert_copy_cads(pairs, copies, context_id, user_id, now)
+
+    copy_ids = defaultdict(list)
+    for type_, id_ in copies:
+      copy_ids[type_].append(id_)
+    event = all_models.Event(
+        modified_by_id=user_id,
+        action="BULK",
+        resource_id=0,
+        resource_type=None,
+    )
+    db.session.add(event)
+    db.session.flush()
+    with benchmark("Insert revisions of copies"):
+      for type_, ids in copy_ids.iteritems():
+        cls._insert_revisions(inflector.get_model(type_), ids, event.id,
+                              user_id, now)
+      cls._insert_revisions(relationship.Relationship, relationship_ids,
+                            event.id, user_id, now)
+      cls._insert_revisions(all_models.CustomAttributeDefinition, cad_ids,
+                            event.id, user_id, now)
+    with benchmark("Reindex copies"):
+      cls._reindex_copies(copy_ids)
+    acl.add_relationships(set(relationship_ids))
+    cache_utils.add_query_changes(set(copy_ids) | {
+        relationship.Relationship.__name__,
+        all_models.CustomAttributeDefinition.__name__,
+        all_models.Revision.__name__,
+    })
+    db.session.commit()
+
+    return views.json_success_response(
+        [{"type": type_, "id": id_} for type_, id_ in copies],
+        datetime.datetime.utcnow(),
+    )
+
+  @classmethod
+  def _check_clone_permissions(cls, source_objs, destination):
+    """Check read and create permissions for all source objects.
+
+    Create permission granted for the whole destination context is checked
+    only once, and so is system wide read permission.
+    """
+    context_id = destination.context_id
+    if not permissions.is_allowed_create(cls.__name__, None, context_id):
+      for source_obj in source_objs:
+        if not permissions.is_allowed_create(source_obj.type, source_obj.id,
+                                             context_id):
+          raise exceptions.Forbidden()
+    if permissions.has_system_wide_read():
+      return
+    for source_obj in source_objs:
+      if not permissions.is_allowed_read_for(source_obj):
+        raise exceptions.Forbidden()
+
+  def _clone_values(self, target):
+    """Get column values of a copy of self for bulk cloning.
+
+    This method should be overridden for class that supports bulk cloning.
+    Base columns and slug are filled in by _insert_copies.
+
+    Args:
+      target: Destination object where clonned object should be created.
+
+    Returns:
+      Dict of column names and values of object copy.
+    """
+    raise NotImplementedError()
+
+  @classmethod
+  def _insert_copies(cls, pairs, context_id, user_id, now):
+    """Insert copies of objects with multi-row INSERT statements.
+
+    Copies are inserted with unique placeholder slugs, which are used to
+    find their ids, and get generated slugs afterwards.
+
+    Args:
+        pairs: List of (target, source) tuples.
+        context_id: Context id of copies.
+        user_id: Id of the user cloning the objects.
+        now: Creation time of copies.
+
+    Returns:
+        List of (type, id) tuples of copies in the order of pairs.
+    """
+    # pylint: disable=protected-access
+    copies = [None] * len(pairs)
+    indexes_by_model = defaultdict(list)
+    for index, (_, source_obj) in enumerate(pairs):
+      indexes_by_model[source_obj.__class__].append(index)
+    for model, indexes in indexes_by_model.iteritems():
+      ids = []
+      for chunk in utils.list_chunks(indexes):
+        rows = []
+        slug_indexes = {}
+        for index in chunk:
+          target, source_obj = pairs[index]
+          slug = str(uuid.uuid1())
+          slug_indexes[slug] = index
+          row = source_obj._clone_values(target)
+          row.update({
+              "slug": slug,
+              "context_id": context_id,
+              "modified_by_id": user_id,
+              "created_at": now,
+              "updated_at": now,
+          })
+          rows.append(row)
+        db.session.execute(model.__table__.insert().values(rows))
+        query = db.session.query(model.id, model.slug).filter(
+            model.slug.in_(slug_indexes.keys())
+        )
+        for id_, slug in query:
+          copies[slug_indexes[slug]] = (model.__name__, id_)
+          ids.append(id_)
+      cls._set_copy_slugs(model, ids)
+    return copies
+
+  @staticmethod
+  def _set_copy_slugs(model, ids):
+    """Replace placeholder slugs of copies with generated ones.
+
+    Generated slugs are the same as Slugged.generate_slug_for would give.
+    """
+    prefix = model.generate_slug_prefix()
+    slugs = {id_: "{0}-{1}".format(prefix, id_) for id_ in ids}
+    taken = set()
+    for chunk in utils.list_chunks(slugs.values()):
+      taken.update(slug for slug, in db.session.query(model.slug).filter(
+          model.slug.in_(chunk)
+      ))
+    for id_ in ids:
+      slug_id = id_
+      while slugs[id_] in taken:
+        slug_id += 1000
+        slugs[id_] = "{0}-{1}".format(prefix, slug_id)
+        if db.session.query(
+            model.query.filter(model.slug == slugs[id_]).exists()
+        ).scalar():
+          taken.add(slugs[id_])
+      taken.add(slugs[id_])
+    table = model.__table__
+    updater = table.update().where(
+        table.c.id == sa.bindparam("_id")
+    ).values(slug=sa.bindparam("_slug"))
+    for chunk in utils.list_chunks(ids):
+      db.session.execute(updater, [{"_id": id_, "_slug": slugs[id_]}
+                                   for id_ in chunk])
+
+  @classmethod
+  def _insert_copy_relationships(cls, pairs, copies, user_id, now):
+    """Insert relationships of targets to copies.
+
+    Returns:
+        List of ids of inserted relationships.
+    """
+    rel = relationship.Relationship
+    keys = [(target.type, target.id, copy_type, copy_id)
+            for (target, _), (copy_type, copy_id) in zip(pairs, copies)]
+    ids = []
+    for chunk in utils.list_chunks(keys):
+      rows = []
+      for source_type, source_id, destination_type, destination_id in chunk:
+        rows.append({
+            "modified_by_id": user_id,
+            "created_at": now,
+            "updated_at": now,
+            "source_type": source_type,
+            "source_id": source_id,
+            "destination_type": destination_type,
+            "destination_id": destination_id,
+            "context_id": None,
+            "is_external": False,
+        })
+      db.session.execute(rel.__table__.insert().values(rows))
+      ids.extend(id_ for id_, in db.session.query(rel.id).filter(
+          sa.tuple_(
+              rel.source_type, rel.source_id,
+              rel.destination_type, rel.destination_id,
+          ).in_(chunk)
+      ))
+    return ids
+
+  @classmethod
+  def _insert_copy_cads(cls, pairs, copies, context_id, user_id, now):
+    """Insert copies of local CADs of source objects.
+
+    Returns:
+        List of ids of inserted CADs.
+    """
+    from ggrc.models import all_models
+    cad = all_models.CustomAttributeDefinition
+    rows = []
+    definitions = set()
+    for (_, source_obj), (_, copy_id) in zip(pairs, copies):
+      for source_cad in getattr(source_obj, "custom_attribute_definitions",
+                                []):
+        # Copy only local CADs
+        if not source_cad.definition_id:
+          continue
+        definitions.add((source_cad.definition_type, copy_id))
+        rows.append({
+            "title": source_cad.title,
+            "definition_type": source_cad.definition_type,
+            "definition_id": copy_id,
+            "context_id": context_id,
+            "attribute_type": source_cad.attribute_type,
+            "multi_choice_options": source_cad.multi_choice_options,
+            "multi_choice_mandatory": source_cad.multi_choice_mandatory,
+            "mandatory": source_cad.mandatory,
+            "helptext": source_cad.helptext,
+            "placeholder": source_cad.placeholder,
+            "modified_by_id": user_id,
+            "created_at": now,
+            "updated_at": now,
+        })
+    for chunk in utils.list_chunks(rows):
+      db.session.execute(cad.__table__.insert().values(chunk))
+    ids = []
+    for chunk in utils.list_chunks(list(definitions)):
+      ids.extend(id_ for id_, in db.session.query(cad.id).filter(
+          sa.tuple_(cad.definition_type, cad.definition_id).in_(chunk)
+      ))
+    return ids
+
+  @staticmethod
+  def _insert_revisions(model, ids, event_id, user_id, now):
+    """Insert "created" revisions of objects in chunks.
+
+    Objects of every chunk are expunged after their revisions are built.
+    """
+    from ggrc.models import all_models
+    inserter = all_models.Revision.__table__.insert()
+    for chunk in utils.list_chunks(ids):
+      objs = model.eager_query().filter(model.id.in_(chunk)).all()
+      revisions = []
+      for obj in objs:
+        content = obj.log_json()
+        revisions.append({
+            "resource_id": obj.id,
+            "resource_type": obj.type,
+            "resource_slug": getattr(obj, "slug", None),
+            "event_id": event_id,
+            "action": "created",
+            "content": content,
+            "context_id": content.get("context_id"),
+            "modified_by_id": user_id,
+            "source_type": getattr(obj, "source_type", None),
+            "source_id": getattr(obj, "source_id", None),
+            "destination_type": getattr(obj, "destination_type", None),
+            "destination_id": getattr(obj, "destination_id", None),
+            "created_at": now,
+            "updated_at": now,
+        })
+      if revisions:
+        db.session.execute(inserter.values(revisions))
+      for obj in objs:
+        db.session.expunge(obj)
+
+  @staticmethod
+  def _reindex_copies(copy_ids):
+    """Update full text records of copies or queue them for reindexing."""
+    from ggrc.fulltext import mixin
+    from ggrc.fulltext import reindex_queue
+    model_ids = {type_: ids for type_, ids in copy_ids.iteritems()
+                 if issubclass(inflector.get_model(type_), mixin.Indexed)}
+    if reindex_queue.is_enabled():
+      reindex_queue.enqueue(model_ids)
+      return
+    for type_, ids in model_ids.iteritems():
+      model = inflector.get_model(type_)
+      for ids_chunk in utils.list_chunks(ids,
+                                         reindex_queue.REINDEX_CHUNK_SIZE):
+        model.bulk_record_update_for(ids_chunk)
+
   def _clone(self, target=None):
     """Create a copy of self.
 
@@ -9,6 +9,7 @@ from sqlalchemy.ext.declarative import declared_attr
 from ggrc import db
 from ggrc.models.mixins import base
 from ggrc.models.mixins import Base
+from ggrc.models.mixins.base import Identifiable
 from ggrc.models import utils
 from ggrc.models import reflection
 
@@ -79,3 +80,25 @@ class Notification(BaseNotification):
 
 class NotificationHistory(BaseNotification):
   __tablename__ = 'notifications_history'
+
+
+class DigestRecipient(Identifiable, db.Model):
+  """Recipient who already received the daily digest of the current run.
+
+  Rows are added while the daily digest is being sent and removed when all
+  processed notifications are marked as sent, so that a retried job does not
+  send the digest twice to the same recipient. Every row holds the batch of
+  the run: send_on date and id of the last notification of the digest.
+  """
+  __tablename__ = 'notification_digest_recipients'
+
+  digest_date = db.Column(db.Date, nullable=False)
+  notification_id = db.Column(db.Integer, nullable=False)
+  email = db.Column(db.String, nullable=False)
+
+  @staticmethod
+  def _extra_table_args(_):
+    return (
+        db.UniqueConstraint('digest_date', 'email',
+                            name='uq_notification_digest_recipients'),
+    )
@@ -3,11 +3,15 @@
 
 """Defines a Revision model for storing snapshots."""
 
+from sqlalchemy.ext.hybrid import hybrid_property
+
 from ggrc import builder
 from ggrc import db
 from ggrc.models.mixins import base
 from ggrc.models.mixins import Base
 from ggrc.models import reflection
+from ggrc.models import revision_content
+from ggrc.models import revision_storage
 from ggrc.access_control import role
 from ggrc.models.types import LongJsonType
 from ggrc.utils.revisions_diff import builder as revisions_diff
@@ -25,7 +29,10 @@ class Revision(base.ContextRBAC, Base, db.Model):
   event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
   action = db.Column(db.Enum(u'created', u'modified', u'deleted'),
                      nullable=False)
-  _content = db.Column('content', LongJsonType, nullable=False)
+  _stored_content = db.Column('content', LongJsonType, nullable=False)
+  # Id of the next revision of the same object if content of this revision is
+  # stored as a delta against it, see revision_storage.
+  _delta_base_id = db.Column('delta_base_id', db.Integer, nullable=True)
 
   resource_slug = db.Column(db.String, nullable=True)
   source_type = db.Column(db.String, nullable=True)
@@ -45,6 +52,7 @@ class Revision(base.ContextRBAC, Base, db.Model):
         db.Index("fk_revisions_destination",
                  "destination_type", "destination_id"),
         db.Index('ix_revisions_resource_slug', 'resource_slug'),
+        db.Index('ix_revisions_delta_base_id', 'delta_base_id'),
     )
 
   _api_attrs = reflection.ApiAttributes(
@@ -93,6 +101,20 @@ class Revision(base.ContextRBAC, Base, db.Model):
                  "destination_id"]:
       setattr(self, attr, getattr(obj, attr, None))
 
+  @hybrid_property
+  def _content(self):
+    """Full stored content, reconstructed if it is stored as a delta."""
+    return revision_storage.get_content(self)
+
+  @_content.setter
+  def _content(self, value):
+    revision_storage.set_content(self, value)
+
+  @_content.expression
+  def _content(cls):  # pylint: disable=no-self-argument
+    """Stored content column, contains deltas for compacted revisions."""
+    return cls._stored_content
+
   @builder.callable_property
   def diff_with_current(self):
     """Callable lazy property for revision."""
@@ -406,9 +428,8 @@ class Revision(base.ContextRBAC, Base, db.Model):
     """Setup cads in cav list if they are not presented in content
 
     but now they are associated to instance."""
-    from ggrc.models import custom_attribute_definition
-    cads = custom_attribute_definition.get_custom_attributes_for(
-        self.resource_type, self.resource_id)
+    cads = list(revision_content.get_cads(self.resource_type,
+                                          self.resource_id))
     cavs = {int(i["custom_attribute_id"]): i for i in self._get_cavs()}
     for cad in cads:
       custom_attribute_id = int(cad["id"])
@@ -522,11 +543,17 @@ class Revision(base.ContextRBAC, Base, db.Model):
             cav["attributable_type"] = "Requirement"
         populated_content["custom_attribute_values"] = cavs
 
-  @builder.simple_property
-  def content(self):
-    """Property. Contains the revision content dict.
+  @classmethod
+  def populate_contents(cls, revisions):
+    """Prepare content of a list of revisions with a few queries."""
+    revision_content.populate(revisions)
 
-    Updated by required values, generated from saved content dict."""
+  def populate_content(self):
+    """Get content dict updated by values generated from saved content dict.
+
+    Content version in revision_content must be increased whenever the result
+    of this function changes for existing revisions.
+    """
     # pylint: disable=too-many-locals
     populated_content = self._content.copy()
     populated_content.update(self.populate_acl())
@@ -547,7 +574,15 @@ class Revision(base.ContextRBAC, Base, db.Model):
 
     return populated_content
 
+  @builder.simple_property
+  def content(self):
+    """Property. Contains the revision content dict.
+
+    Populated content is materialized, see revision_content."""
+    return revision_content.get_content(self)
+
   @content.setter
   def content(self, value):
     """ Setter for content property."""
+    revision_content.invalidate(self)
     self._content = value
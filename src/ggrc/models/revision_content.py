@@ -0,0 +1,195 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Materialized populated content of revisions.
+
+Revision.content is built from the stored content by populate functions that
+fix up older revisions and add current custom attribute definitions and
+roles of the revision object (see Revision.populate_content).
+
+Populated content is kept for the current request and, if memcache is
+enabled, pickled in memcache unless it is too large for it. Keys contain
+CONTENT_VERSION and a signature of the definitions and role names the
+population depends on, so content is repopulated on access whenever any of
+them changes. CONTENT_VERSION must be increased whenever the population
+logic or the stored format changes.
+
+populate() prepares content of a list of revisions with a few queries:
+definitions of all revision objects are loaded in bulk and materialized
+content is fetched with a single memcache call.
+"""
+
+import collections
+import copy
+import cPickle
+import hashlib
+import json
+import logging
+
+import flask
+
+from ggrc import settings
+from ggrc.access_control import role
+
+CONTENT_VERSION = 2
+
+KEY_PREFIX = "revision:content:"
+
+# Memcache does not store values larger than 1MB.
+MAX_VALUE_SIZE = 1000000
+
+# Maximum number of populated contents kept for a single request, so that
+# long running jobs reading many revisions do not keep all of them in memory.
+REQUEST_STORE_SIZE = 5000
+
+logger = logging.getLogger(__name__)
+
+
+def _get_request_store(name):
+  """Get a dict stored for the current request."""
+  if not flask.has_app_context():
+    return None
+  store = getattr(flask.g, name, None)
+  if store is None:
+    store = {}
+    setattr(flask.g, name, store)
+  return store
+
+
+def _cache_contents(client, contents):
+  """Store pickled populated contents in memcache."""
+  values = {}
+  for key, content in contents.iteritems():
+    value = cPickle.dumps(content, cPickle.HIGHEST_PROTOCOL)
+    if len(value) > MAX_VALUE_SIZE:
+      logger.warning("Revision content %s is too large for memcache", key)
+      continue
+    values[key] = value
+  if values:
+    client.set_multi(values, settings.REVISION_CONTENT_CACHE_TIMEOUT)
+
+
+def _get_client():
+  if not getattr(settings, "MEMCACHE_MECHANISM", False):
+    return None
+  from ggrc.cache import utils as cache_utils
+  return cache_utils.get_cache_manager().cache_object.memcache_client
+
+
+def get_cads(resource_type, resource_id):
+  """Get current custom attribute definitions of a revision object."""
+  store = _get_request_store("revision_cads")
+  key = (resource_type, resource_id)
+  if store is not None and key in store:
+    return store[key]
+  from ggrc.models import custom_attribute_definition
+  cads = custom_attribute_definition.get_custom_attributes_for(
+      resource_type, resource_id)
+  if store is not None:
+    store[key] = cads
+  return cads
+
+
+def _store_contents(store, contents):
+  """Keep populated contents for the current request."""
+  if len(store) + len(contents) > REQUEST_STORE_SIZE:
+    store.clear()
+  store.update(contents)
+
+
+def clear_cads(mapper, connection, target):
+  """Drop definitions loaded in the current request after a CAD change."""
+  # pylint: disable=unused-argument
+  if flask.has_app_context() and hasattr(flask.g, "revision_cads"):
+    del flask.g.revision_cads
+
+
+def _load_cads(revisions):
+  """Load definitions of all revision objects with a query per type."""
+  from ggrc.models import custom_attribute_definition
+  store = _get_request_store("revision_cads")
+  if store is None:
+    return
+  ids_by_type = collections.defaultdict(set)
+  for revision in revisions:
+    if (revision.resource_type, revision.resource_id) not in store:
+      ids_by_type[revision.resource_type].add(revision.resource_id)
+  for resource_type, ids in ids_by_type.iteritems():
+    cads = custom_attribute_definition.get_custom_attributes_for_many(
+        resource_type, ids)
+    for resource_id, object_cads in cads.iteritems():
+      store[(resource_type, resource_id)] = object_cads
+
+
+def _get_key(revision):
+  """Get storage key of populated content of the revision."""
+  data = json.dumps(
+      [
+          sorted(role.get_custom_roles_for(revision.resource_type).items()),
+          get_cads(revision.resource_type, revision.resource_id),
+      ],
+      sort_keys=True,
+      default=unicode,
+  )
+  return "{}{}:{}:{}".format(KEY_PREFIX, CONTENT_VERSION, revision.id,
+                             hashlib.sha1(data).hexdigest())
+
+
+def get_content(revision):
+  """Get populated content of the revision.
+
+  The content is a deep copy of the stored one, so callers can change it.
+  """
+  store = _get_request_store("revision_content")
+  if revision.id is None or store is None:
+    return revision.populate_content()
+  key = _get_key(revision)
+  content = store.get(key)
+  if content is None:
+    client = _get_client()
+    value = client.get(key) if client else None
+    if value is not None:
+      content = cPickle.loads(value)
+    else:
+      content = revision.populate_content()
+      if client:
+        _cache_contents(client, {key: content})
+    _store_contents(store, {key: content})
+  return copy.deepcopy(content)
+
+
+def populate(revisions):
+  """Prepare populated content of revisions in bulk."""
+  store = _get_request_store("revision_content")
+  revisions = [revision for revision in revisions if revision.id is not None]
+  if store is None or not revisions:
+    return
+  _load_cads(revisions)
+  keys = {}
+  for revision in revisions:
+    key = _get_key(revision)
+    if key not in store:
+      keys[key] = revision
+  if not keys:
+    return
+  client = _get_client()
+  values = client.get_multi(keys.keys()) if client else {}
+  contents = {key: cPickle.loads(value) for key, value in values.iteritems()}
+  missing = {key: revision.populate_content()
+             for key, revision in keys.iteritems() if key not in contents}
+  contents.update(missing)
+  _store_contents(store, contents)
+  if client and missing:
+    _cache_contents(client, missing)
+
+
+def invalidate(revision):
+  """Drop populated content of a revision after its content changes."""
+  store = _get_request_store("revision_content")
+  if revision.id is None or store is None:
+    return
+  key = _get_key(revision)
+  store.pop(key, None)
+  client = _get_client()
+  if client:
+    client.delete(key)
@@ -0,0 +1,310 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Delta compressed storage of revision content.
+
+New revisions are always stored with full content. If REVISION_DELTA_STORAGE
+setting is enabled, the compaction job replaces content of older revisions
+with reverse deltas: a delta of a revision turns content of the next revision
+of the same object into content of the revision. Such revisions have
+delta_base_id set to the id of that next revision.
+
+Counting from the oldest revision of an object, every
+REVISION_KEYFRAME_INTERVAL-th revision is kept as a full keyframe, as well as
+the latest revision, so that the latest content is read with a single row and
+any other content is reconstructed from at most REVISION_KEYFRAME_INTERVAL
+rows.
+
+The id of the latest revision of a compacted object is stored as its
+compaction mark, and only objects with revisions newer than their mark (or
+marked with a different keyframe interval) are compacted again.
+
+A delta of a dict (or of a list of the same length) is a dict with:
+  "set": values of added or replaced keys,
+  "unset": list of removed keys (dicts only),
+  "diff": nested deltas of changed dict and list values.
+List indexes are stored as strings.
+"""
+
+import logging
+
+import sqlalchemy as sa
+
+from ggrc import db
+from ggrc import settings
+from ggrc import utils
+from ggrc.utils import benchmark
+
+logger = logging.getLogger(__name__)
+
+SET = "set"
+UNSET = "unset"
+DIFF = "diff"
+
+
+# pylint: disable=too-few-public-methods
+class CompactionMark(db.Model):
+  """Latest revision of an object at the time of its last compaction."""
+  __tablename__ = 'revision_compaction_marks'
+
+  resource_type = db.Column(db.String(250), primary_key=True)
+  resource_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+  revision_id = db.Column(db.Integer, nullable=False)
+  keyframe_interval = db.Column(db.Integer, nullable=False)
+
+
+def _as_dict(value):
+  if isinstance(value, list):
+    return {unicode(index): item for index, item in enumerate(value)}
+  return value
+
+
+def _is_diffable(base, target):
+  """Check if a delta can be made between two values."""
+  if isinstance(base, dict) and isinstance(target, dict):
+    return True
+  return (isinstance(base, list) and isinstance(target, list) and
+          len(base) == len(target))
+
+
+def make_delta(base, target):
+  """Get delta that turns base dict or list into target."""
+  base_items = _as_dict(base)
+  target_items = _as_dict(target)
+  delta = {}
+  for key, value in target_items.iteritems():
+    if key in base_items:
+      old_value = base_items[key]
+      if old_value == value:
+        continue
+      if _is_diffable(old_value, value):
+        delta.setdefault(DIFF, {})[key] = make_delta(old_value, value)
+        continue
+    delta.setdefault(SET, {})[key] = value
+  unset = [key for key in base_items if key not in target_items]
+  if unset:
+    delta[UNSET] = unset
+  return delta
+
+
+def apply_delta(base, delta):
+  """Get a copy of base dict or list with the delta applied."""
+  if isinstance(base, list):
+    result = list(base)
+    for key, value in delta.get(SET, {}).iteritems():
+      result[int(key)] = value
+    for key, value in delta.get(DIFF, {}).iteritems():
+      result[int(key)] = apply_delta(result[int(key)], value)
+    return result
+  result = dict(base)
+  for key in delta.get(UNSET, []):
+    result.pop(key, None)
+  result.update(delta.get(SET, {}))
+  for key, value in delta.get(DIFF, {}).iteritems():
+    result[key] = apply_delta(result[key], value)
+  return result
+
+
+def _get_keyframe_interval():
+  return max(getattr(settings, "REVISION_KEYFRAME_INTERVAL", 10), 1)
+
+
+def _load_rows(revision, start_id):
+  """Load stored content of newer revisions of the same object."""
+  model = type(revision)
+  # pylint: disable=protected-access
+  query = db.session.query(
+      model.id,
+      model._delta_base_id,
+      model._stored_content,
+  ).filter(
+      model.resource_type == revision.resource_type,
+      model.resource_id == revision.resource_id,
+      model.id >= start_id,
+  ).order_by(
+      model.id,
+  ).limit(
+      _get_keyframe_interval()
+  )
+  return {id_: (base_id, content) for id_, base_id, content in query}
+
+
+def _reconstruct(revision):
+  """Reconstruct full content of a delta stored revision."""
+  # pylint: disable=protected-access
+  deltas = [revision._stored_content]
+  base_id = revision._delta_base_id
+  rows = {}
+  while True:
+    if base_id not in rows:
+      rows.update(_load_rows(revision, base_id))
+      if base_id not in rows:
+        raise ValueError("Base revision {} of revision {} does not "
+                         "exist".format(base_id, revision.id))
+    next_base_id, stored_content = rows[base_id]
+    if next_base_id is None:
+      content = stored_content
+      break
+    deltas.append(stored_content)
+    base_id = next_base_id
+  for delta in reversed(deltas):
+    content = apply_delta(content, delta)
+  return content
+
+
+def get_content(revision):
+  """Get full stored content of a revision."""
+  # pylint: disable=protected-access
+  if revision._delta_base_id is None:
+    return revision._stored_content
+  content = getattr(revision, "_reconstructed_content", None)
+  if content is None:
+    content = _reconstruct(revision)
+    revision._reconstructed_content = content
+  return content
+
+
+def set_content(revision, content):
+  """Store full content of a revision.
+
+  Revisions stored as deltas against the revision are converted to full
+  content first, because their deltas are based on the old content.
+  """
+  # pylint: disable=protected-access
+  if revision.id is not None:
+    dependents = type(revision).query.filter(
+        type(revision)._delta_base_id == revision.id
+    )
+    for dependent in dependents:
+      dependent._stored_content = get_content(dependent)
+      dependent._delta_base_id = None
+    _delete_mark(revision.resource_type, revision.resource_id)
+  revision._stored_content = content
+  revision._delta_base_id = None
+  revision._reconstructed_content = None
+
+
+def _delete_mark(resource_type, resource_id):
+  """Delete compaction mark so that the object is compacted again."""
+  table = CompactionMark.__table__
+  db.session.execute(table.delete().where(sa.and_(
+      table.c.resource_type == resource_type,
+      table.c.resource_id == resource_id,
+  )))
+
+
+def _set_mark(resource_type, resource_id, revision_id, interval):
+  """Store compaction mark of an object."""
+  _delete_mark(resource_type, resource_id)
+  db.session.execute(CompactionMark.__table__.insert().values(
+      resource_type=resource_type,
+      resource_id=resource_id,
+      revision_id=revision_id,
+      keyframe_interval=interval,
+  ))
+
+
+def compact(resource_type, resource_id):
+  """Store revisions of an object as keyframes and deltas.
+
+  Returns:
+    number of updated revisions.
+  """
+  from ggrc.models import all_models
+  model = all_models.Revision
+  # pylint: disable=protected-access
+  rows = db.session.query(
+      model.id,
+      model._delta_base_id,
+      model._stored_content,
+  ).filter(
+      model.resource_type == resource_type,
+      model.resource_id == resource_id,
+  ).order_by(
+      model.id.desc(),
+  ).all()
+  # Bases of deltas are always newer revisions, so full content of all
+  # revisions is reconstructed starting from the latest one.
+  contents = {}
+  for id_, base_id, stored_content in rows:
+    if base_id is None:
+      contents[id_] = stored_content
+    else:
+      contents[id_] = apply_delta(contents[base_id], stored_content)
+
+  rows.reverse()
+  interval = _get_keyframe_interval()
+  updated = 0
+  for index, (id_, base_id, stored_content) in enumerate(rows):
+    new_base_id = None
+    new_content = contents[id_]
+    if index % interval and index < len(rows) - 1:
+      next_id = rows[index + 1][0]
+      delta = make_delta(contents[next_id], contents[id_])
+      if len(utils.as_json(delta)) < len(utils.as_json(contents[id_])):
+        new_base_id, new_content = next_id, delta
+    if new_base_id == base_id and (base_id is None or
+                                   stored_content == new_content):
+      continue
+    db.session.execute(
+        model.__table__.update().where(
+            model.__table__.c.id == id_
+        ).values(
+            delta_base_id=new_base_id,
+            content=new_content,
+        )
+    )
+    updated += 1
+  if rows:
+    _set_mark(resource_type, resource_id, rows[-1][0], interval)
+  return updated
+
+
+def _get_compaction_candidates():
+  """Get objects with revisions added after their last compaction."""
+  from ggrc.models import all_models
+  model = all_models.Revision
+  mark = CompactionMark
+  return db.session.query(
+      model.resource_type,
+      model.resource_id,
+  ).outerjoin(
+      mark,
+      sa.and_(
+          mark.resource_type == model.resource_type,
+          mark.resource_id == model.resource_id,
+      ),
+  ).filter(
+      sa.or_(
+          mark.revision_id.is_(None),
+          model.id > mark.revision_id,
+          mark.keyframe_interval != _get_keyframe_interval(),
+      ),
+  ).distinct().all()
+
+
+def start_compaction():
+  """Queue compaction of revision history from the nightly cron job.
+
+  The first compaction covers the whole history, so it runs in a background
+  task in order not to hold up the cron jobs that follow.
+  """
+  if not getattr(settings, "REVISION_DELTA_STORAGE", False):
+    return
+  from ggrc import views
+  views.start_compact_revisions()
+
+
+def compact_revisions():
+  """Compact revision history of all objects if delta storage is enabled."""
+  if not getattr(settings, "REVISION_DELTA_STORAGE", False):
+    return
+  with benchmark("Compact revisions"):
+    candidates = _get_compaction_candidates()
+    logger.info("Compacting revisions of %s objects", len(candidates))
+    updated = 0
+    for chunk in utils.list_chunks(candidates):
+      for resource_type, resource_id in chunk:
+        updated += compact(resource_type, resource_id)
+      db.session.commit()
+    logger.info("Compacted %s revisions", updated)
@@ -12,9 +12,11 @@ from collections import defaultdict
 from datetime import date
 from datetime import datetime
 from logging import getLogger
+from multiprocessing.pool import ThreadPool
 from operator import itemgetter
 
 from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import subqueryload
 from sqlalchemy.sql.expression import true
 from sqlalchemy import inspect
 from werkzeug.exceptions import Forbidden
@@ -23,8 +25,10 @@ from google.appengine.api import mail
 from ggrc import db
 from ggrc import extensions
 from ggrc import settings
+from ggrc import utils
 from ggrc.models import Person
 from ggrc.models import Notification, NotificationHistory
+from ggrc.models.notification import DigestRecipient
 from ggrc.rbac import permissions
 from ggrc.utils import DATE_FORMAT_US, merge_dict, benchmark
 
@@ -93,7 +97,8 @@ class Services(object):
 
 
 def get_filter_data(
-    notification, people_cache, tasks_cache=None, del_rels_cache=None
+    notification, people_cache, tasks_cache=None, del_rels_cache=None,
+    data=None,
 ):
   """Get filtered notification data.
 
@@ -109,14 +114,16 @@ def get_filter_data(
       accessible by their ID as a key
     del_rels_cache (dict): prefetched Revision instances representing the
       relationships to Tasks that were deleted grouped by task ID as a key
+    data (dict): notification data for all users if it is already computed.
 
   Returns:
     dict: dictionary containing notification data for all users who should
       receive it, according to their notification settings.
   """
   result = {}
-  data = Services.call_service(
-      notification, tasks_cache=tasks_cache, del_rels_cache=del_rels_cache)
+  if data is None:
+    data = Services.call_service(
+        notification, tasks_cache=tasks_cache, del_rels_cache=del_rels_cache)
 
   for user, user_data in data.iteritems():
     if should_receive(notification, user_data, people_cache):
@@ -141,15 +148,27 @@ def get_notification_data(notifications):
   if not notifications:
     return {}
   aggregate_data = {}
-  people_cache = {}
 
   tasks_cache = cycle_tasks_cache(notifications)
   deleted_rels_cache = deleted_task_rels_cache(tasks_cache.keys())
 
-  for notification in notifications:
-    filtered_data = get_filter_data(
-        notification, people_cache, tasks_cache=tasks_cache,
-        del_rels_cache=deleted_rels_cache)
+  with benchmark("Get data of all notifications"):
+    notifications_data = [
+        (notification, Services.call_service(
+            notification, tasks_cache=tasks_cache,
+            del_rels_cache=deleted_rels_cache))
+        for notification in notifications
+    ]
+  with benchmark("Load notification recipients"):
+    people_cache = load_people(
+        user_data["user"]["id"]
+        for _, data in notifications_data
+        for user_data in data.itervalues()
+    )
+
+  # Data of all notifications is merged into a single dict per recipient.
+  for notification, data in notifications_data:
+    filtered_data = get_filter_data(notification, people_cache, data=data)
     aggregate_data = merge_dict(aggregate_data, filtered_data)
 
   # Remove notifications for objects without a contact (such as task groups)
@@ -207,21 +226,46 @@ def get_pending_notifications():
   return notifications, data
 
 
-def get_daily_notifications():
+def get_daily_notifications(digest_date=None, last_id=None):
   """Get notification data for all future notifications.
 
+  Args:
+    digest_date (date): last send_on date of included notifications, today
+      by default.
+    last_id (int): id of the last included notification, if set.
+
   Returns
     list of Notifications, data: a tuple of notifications that were handled
       and corresponding data for those notifications.
   """
-  notifications = db.session.query(Notification).filter(
-      (Notification.send_on <= datetime.today()) &
+  query = db.session.query(Notification).filter(
+      (Notification.send_on <= (digest_date or datetime.today())) &
       ((Notification.sent_at.is_(None)) | (Notification.repeating == true()))
-  ).all()
+  )
+  if last_id is not None:
+    query = query.filter(Notification.id <= last_id)
+  notifications = query.all()
 
   return notifications, get_notification_data(notifications)
 
 
+def load_people(person_ids):
+  """Load people with roles and notification configs in bulk.
+
+  Returns:
+    dict of person id to Person, with None for people that do not exist.
+  """
+  person_ids = {id_ for id_ in person_ids if id_ != -1}
+  people = dict.fromkeys(person_ids)
+  for ids in utils.list_chunks(list(person_ids)):
+    query = db.session.query(Person).options(
+        subqueryload('user_roles').joinedload('role'),
+        subqueryload('notification_configs')
+    ).filter(Person.id.in_(ids))
+    people.update((person.id, person) for person in query)
+  return people
+
+
 def should_receive(notif, user_data, people_cache):
   """Check if a user should receive a notification or not.
 
@@ -247,7 +291,7 @@ def should_receive(notif, user_data, people_cache):
     people_cache[person_id] = person
 
   # If the user has no access we should not send any emails
-  if person.system_wide_role == "No Access":
+  if person is None or person.system_wide_role == "No Access":
     return False
 
   def is_enabled(notif_type, person):
@@ -275,29 +319,111 @@ def should_receive(notif, user_data, people_cache):
   return has_digest
 
 
+def render_digest(data):
+  """Render daily digest email body for notification data of a recipient."""
+  return settings.EMAIL_DIGEST.render(digest=modify_data(data))
+
+
+def get_digest_batch():
+  """Get batch of an unfinished daily digest run.
+
+  Returns:
+    tuple of send_on date and id of the last notification of the batch, or
+    None if the previous run finished.
+  """
+  return db.session.query(
+      DigestRecipient.digest_date,
+      DigestRecipient.notification_id,
+  ).first()
+
+
+def get_digest_recipients():
+  """Get recipients who already received the digest in an unfinished run."""
+  return {email for email, in db.session.query(DigestRecipient.email)}
+
+
+def add_digest_recipients(batch, emails):
+  """Store recipients who received the digest batch and commit them.
+
+  Args:
+    batch (tuple): send_on date and id of the last notification of the batch.
+    emails (list): recipient emails.
+  """
+  if not emails:
+    return
+  digest_date, notification_id = batch
+  db.session.execute(
+      DigestRecipient.__table__.insert().prefix_with("IGNORE"),
+      [{"digest_date": digest_date, "notification_id": notification_id,
+        "email": email} for email in emails],
+  )
+  db.session.commit()
+
+
+def clear_digest_recipients():
+  db.session.execute(DigestRecipient.__table__.delete())
+
+
 def send_daily_digest_notifications():
   """Send emails for today's or overdue notifications.
 
+  Emails are sent in chunks of DIGEST_BATCH_SIZE recipients by a pool of
+  DIGEST_SEND_WORKERS threads. Every recipient who received the email is
+  stored together with the batch of the run: its send_on date and the id of
+  its last notification. A retried job, even one
+  started on the next day, first finishes the same batch, skipping the
+  stored recipients, and then sends a new batch of the remaining
+  notifications. The stored recipients are removed when all notifications
+  of the batch are marked as sent.
+
   Returns:
     str: String containing a simple list of who received the notification.
   """
   # pylint: disable=invalid-name
   with benchmark("contributed cron job send_daily_digest_notifications"):
-    notif_list, notif_data = get_daily_notifications()
     sent_emails = []
-    subject = "GGRC daily digest for {}".format(date.today().strftime("%b %d"))
+    batch = get_digest_batch()
+    if batch is not None:
+      sent_emails.extend(_send_digest_batch(batch))
+    sent_emails.extend(_send_digest_batch())
+    return "emails sent to: <br> {}".format("<br>".join(sent_emails))
 
-    with benchmark("sending daily emails"):
-      for user_email, data in notif_data.iteritems():
-        data = modify_data(data)
-        email_body = settings.EMAIL_DIGEST.render(digest=data)
-        send_email(user_email, subject, email_body)
-        sent_emails.append(user_email)
 
-    with benchmark("processing sent notifications"):
-      process_sent_notifications(notif_list)
+def _send_digest_batch(batch=None):
+  """Send daily digest emails of a batch and mark its notifications as sent.
 
-    return "emails sent to: <br> {}".format("<br>".join(sent_emails))
+  Args:
+    batch (tuple): send_on date and id of the last notification of an
+      unfinished batch, or None to send a new batch.
+
+  Returns:
+    list of emails the digest was sent to.
+  """
+  if batch is None:
+    notif_list, notif_data = get_daily_notifications()
+    batch = (date.today(), max([notif.id for notif in notif_list] or [0]))
+  else:
+    notif_list, notif_data = get_daily_notifications(*batch)
+  sent_emails = []
+  subject = "GGRC daily digest for {}".format(batch[0].strftime("%b %d"))
+  recipients = sorted(set(notif_data) - get_digest_recipients())
+
+  def mark_sent(email):
+    add_digest_recipients(batch, [email])
+    sent_emails.append(email)
+
+  with benchmark("sending daily emails"):
+    workers = getattr(settings, "DIGEST_SEND_WORKERS", 0)
+    batch_size = getattr(settings, "DIGEST_BATCH_SIZE", 100)
+    for emails in utils.list_chunks(recipients, batch_size):
+      send_emails([(email, subject, render_digest(notif_data[email]))
+                   for email in emails], workers, mark_sent)
+
+  with benchmark("processing sent notifications"):
+    clear_digest_recipients()
+    process_sent_notifications(notif_list)
+
+  return sent_emails
 
 
 def process_sent_notifications(notif_list):
@@ -409,6 +535,52 @@ def send_email(user_email, subject, body):
   message.send()
 
 
+def _send_message(message):
+  """Send an email and get the exception raised by sending, if any."""
+  user_email, subject, body = message
+  try:
+    send_email(user_email, subject, body)
+  except Exception as error:  # pylint: disable=broad-except
+    return user_email, error
+  return user_email, None
+
+
+def send_emails(messages, workers=0, on_sent=None):
+  """Send a batch of emails.
+
+  Sending is I/O bound, so emails are sent in a pool of threads. The first
+  sending error is raised after all other emails are sent.
+
+  Args:
+    messages (list of tuples): recipient email, subject and html body of
+      every email.
+    workers (int): number of sending threads, values lower than 2 send the
+      emails serially.
+    on_sent (callable): called with the recipient email of every sent email
+      in the calling thread.
+  """
+  workers = min(workers, len(messages))
+  if workers < 2:
+    results = (_send_message(message) for message in messages)
+    pool = None
+  else:
+    pool = ThreadPool(workers)
+    results = pool.imap_unordered(_send_message, messages)
+  errors = []
+  try:
+    for user_email, error in results:
+      if error is not None:
+        errors.append(error)
+      elif on_sent is not None:
+        on_sent(user_email)
+  finally:
+    if pool is not None:
+      pool.close()
+      pool.join()
+  if errors:
+    raise errors[0]
+
+
 def modify_data(data):
   """Modify notification data dictionary.
 
@@ -9,17 +9,20 @@ This class is used to build SqlAlchemy queries and fetch the result ids.
 # flake8: noqa
 import collections
 import datetime
+import json
 
 import sqlalchemy as sa
 
 from ggrc import db
 from ggrc import models
+from ggrc import settings
 from ggrc.models import inflector
 from ggrc.utils import benchmark
 from ggrc.rbac import permissions
 from ggrc.query import custom_operators
 from ggrc.query import pagination
 from ggrc.query.exceptions import BadQueryException
+from ggrc.query.result_cache import CountCache, ResultCache
 
 
 # pylint: disable=too-few-public-methods
@@ -43,6 +46,11 @@ class QueryHelper(object):
         }
       ]
       limit: [from, to] - limit the result list to a slice result[from, to]
+      cursor: optional; "next_cursor" of the previous page or null for the
+              first page, enables keyset paging instead of "limit"
+      page_size: the number of objects in a page when "cursor" is used
+      total_mode: optional; "approximate" to get an estimated total count
+                  while the exact count is computed in a background task
       filters: {
         relevant_filters:
           these filters will return all ids of the "search class name" object
@@ -72,6 +80,9 @@ class QueryHelper(object):
       object_name: search class name,
       (all other object query fields)
       ids: [ list of filtered objects ids ]
+      next_cursor: cursor of the next page or None for the last page
+                   (present if "cursor" is used)
+      total_approximate: True if "total" is an estimate
     }
   ]
 
@@ -266,6 +277,13 @@ class QueryHelper(object):
       child_type = self._get_snapshot_child_type(object_query)
       tgt_class = getattr(models.all_models, child_type, object_class)
 
+    result_cache = ResultCache(object_query, object_class, tgt_class)
+    with benchmark("Get cached ids: _get_ids > result_cache.get"):
+      cached = result_cache.get()
+    if cached is not None:
+      ids, object_query["total"] = cached
+      return ids
+
     requested_permissions = object_query.get("permissions", "read")
     with benchmark("Get permissions: _get_ids > _get_type_query"):
       type_query = self._get_type_query(object_class, requested_permissions)
@@ -280,7 +298,10 @@ class QueryHelper(object):
       )
       if filter_expression is not None:
         query = query.filter(filter_expression)
-    if object_query.get("order_by"):
+    # total count does not depend on ordering joins
+    filter_query = query
+    use_cursor = "cursor" in object_query
+    if object_query.get("order_by") and not use_cursor:
       with benchmark("Sorting: _get_ids > order_by"):
         query = pagination.apply_order_by(
             object_class,
@@ -290,17 +311,71 @@ class QueryHelper(object):
         )
     with benchmark("Apply limit"):
       limit = object_query.get("limit")
-      if limit:
+      if use_cursor:
+        ids, object_query["next_cursor"] = pagination.get_cursor_page(
+            object_class,
+            query,
+            object_query,
+            tgt_class,
+        )
+        total = self._get_total_count(object_query, filter_query,
+                                      object_class, tgt_class)
+      elif limit:
         limit_query = pagination.apply_limit(query, limit)
-        total = pagination.get_total_count(query)
+        total = self._get_total_count(object_query, filter_query,
+                                      object_class, tgt_class)
         ids = [obj.id for obj in limit_query]
       else:
         ids = [obj.id for obj in query]
         total = len(ids)
       object_query["total"] = total
 
+    if not object_query.get("total_approximate"):
+      result_cache.set(ids, total)
     return ids
 
+  @staticmethod
+  def _start_exact_count(object_query, count_cache):
+    """Start a background task computing the exact total count.
+
+    Returns:
+      False if the task can not be started or its result can not be cached,
+      and the exact count should be computed in the current request.
+    """
+    if not getattr(settings, "APP_ENGINE", False) or count_cache.key is None:
+      return False
+    exact_query = dict(object_query, limit=[0, 1])
+    exact_query.pop("total_mode", None)
+    exact_query.pop("cursor", None)
+    try:
+      json.dumps(exact_query)
+    except (TypeError, ValueError):
+      return False
+    if count_cache.mark_pending():
+      from ggrc import views
+      views.start_compute_query_count(exact_query)
+    return True
+
+  def _get_total_count(self, object_query, query, object_class, tgt_class):
+    """Get total count of the filtered objects.
+
+    Exact counts are cached until objects of the queried models change. On a
+    cache miss, queries with "approximate" total_mode get an estimate from the
+    query plan and the exact count is cached by a background task.
+    """
+    count_cache = CountCache(object_query, object_class, tgt_class)
+    with benchmark("Get cached count: _get_total_count > count_cache.get"):
+      total = count_cache.get()
+    if total is not None:
+      return total
+    if (object_query.get("total_mode") == "approximate" and
+            self._start_exact_count(object_query, count_cache)):
+      object_query["total_approximate"] = True
+      return pagination.get_estimated_count(query, object_class.__tablename__)
+    total = pagination.get_total_count(query)
+    count_cache.set(total)
+    return total
+
   @staticmethod
   def _slugs_to_ids(object_name, slugs):
     """Convert SLUG to proper ids for the given objec."""
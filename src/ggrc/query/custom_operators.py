@@ -14,6 +14,7 @@ from sqlalchemy.orm import load_only
 from ggrc import db
 from ggrc.models import all_models
 from ggrc.access_control.list import AccessControlList
+from ggrc.fulltext import trigrams
 from ggrc.fulltext.mysql import MysqlRecordProperty as Record
 from ggrc.models import inflector
 from ggrc.models import relationship_helper
@@ -195,13 +196,16 @@ def text_search(exp, object_class, target_class, query):
     sqlalchemy.sql.elements.BinaryExpression if an object of `object_class`
     has an indexed property that contains `text`.
   """
-  return object_class.id.in_(
-      db.session.query(Record.key).filter(
-          Record.type == object_class.__name__,
-          Record.subproperty != '__sort__',
-          Record.content.ilike(u"%{}%".format(exp['text'])),
-      ),
+  query = db.session.query(Record.key).filter(
+      Record.type == object_class.__name__,
+      Record.subproperty != '__sort__',
+      Record.content.ilike(u"%{}%".format(exp['text'])),
   )
+  candidates = trigrams.get_candidates_query(exp['text'],
+                                             object_class.__name__)
+  if candidates is not None:
+    query = query.filter(Record.key.in_(candidates))
+  return object_class.id.in_(query)
 
 
 @validate("object_name", "ids")
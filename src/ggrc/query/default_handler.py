@@ -3,6 +3,7 @@
 
 """This module contains special query helper class for query API."""
 
+from ggrc import db
 from ggrc.builder import json
 from ggrc.query.builder import QueryHelper
 from ggrc.models import inflector
@@ -32,6 +33,7 @@ class DefaultHandler(QueryHelper):
       ids: [ ids of filtered objects ] (present if type is "ids")
       count: the number of objects filtered, after "limit" is applied
       total: the number of objects filtered, before "limit" is applied
+      next_cursor: cursor of the next page (present if "cursor" is used)
   """
 
   def get_results(self):
@@ -51,8 +53,15 @@ class DefaultHandler(QueryHelper):
                                   "are supported now")
       model = inflector.get_model(object_query["object_name"])
       if query_type == "values":
+        projection = self._get_projection(model, object_query.get("fields"))
+        if projection is not None:
+          self._set_projected_values(object_query, model, projection)
+          continue
         with benchmark("Get result set: get_results > _get_objects"):
           objects = self._get_objects(object_query)
+        if model.__name__ == "Revision":
+          with benchmark("get_results > populate_contents"):
+            model.populate_contents(objects)
         object_query["count"] = len(objects)
         with benchmark("get_results > _get_last_modified"):
           object_query["last_modified"] = self._get_last_modified(model,
@@ -71,10 +80,49 @@ class DefaultHandler(QueryHelper):
           object_query["ids"] = ids
     return self.query
 
+  @staticmethod
+  def _get_projection(model, fields):
+    """Get projection for fields that can be published from table columns."""
+    if not fields:
+      return None
+    return json.get_json_builder(model).get_projection(fields)
+
+  def _set_projected_values(self, object_query, model, projection):
+    """Get requested fields of filtered objects without loading the objects.
+
+    Only the columns needed for the requested fields are selected and JSON
+    values are built directly from the result rows.
+    """
+    with benchmark("Get result set: get_results > _get_ids"):
+      ids = self._get_ids(object_query)
+    columns = [column for _, column, _ in projection if column is not None]
+    has_updated_at = hasattr(model, "updated_at")
+    if has_updated_at:
+      columns.append(model.updated_at)
+    rows = {}
+    if ids:
+      with benchmark("Get projected rows: get_results > query"):
+        query = db.session.query(model.id, *columns).filter(
+            model.id.in_(ids)
+        )
+        rows = {row[0]: row[1:] for row in query}
+    ids = [id_ for id_ in ids if id_ in rows]
+    object_query["count"] = len(ids)
+    if has_updated_at and ids:
+      object_query["last_modified"] = max(rows[id_][-1] for id_ in ids)
+    else:
+      object_query["last_modified"] = None
+    with benchmark("serialization: get_results > publish_row"):
+      builder = json.get_json_builder(model)
+      objects_json = [builder.publish_row(projection, id_, rows[id_])
+                      for id_ in ids]
+      object_query["values"] = json.publish_representation(objects_json)
+
   @staticmethod
   def _transform_to_json(objects, fields=None):
     """Make a JSON representation of objects from the list."""
-    objects_json = [json.publish(obj) for obj in objects]
+    objects_json = [json.publish(obj, attribute_whitelist=fields)
+                    for obj in objects]
     objects_json = json.publish_representation(objects_json)
     if fields:
       objects_json = [{f: o.get(f) for f in fields}
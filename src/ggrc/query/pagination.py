@@ -1,7 +1,18 @@
 # Copyright (C) 2018 Google Inc.
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
-"""Pagination helpers module for query generation."""
+"""Pagination helpers module for query generation.
+
+Two paging modes are supported. "limit" pages are fetched with OFFSET/LIMIT.
+Cursor pages are fetched with a seek predicate on the order_by key values of
+the last row of the previous page, so that the database does not need to scan
+and discard all preceding rows and deep pages cost the same as the first one.
+"""
+
+import base64
+import datetime
+import hashlib
+import json
 
 import sqlalchemy as sa
 
@@ -61,7 +72,31 @@ def get_total_count(query):
   return total
 
 
-def _joins_and_order(counter, clause, model, tgt_class):
+def get_estimated_count(query, table_name):
+  """Get estimated count of objects in the query from the MySQL query plan.
+
+  The estimate is the number of rows MySQL expects to examine in the queried
+  table, it is much cheaper to get than the exact count. Plans of queries
+  with joins or subqueries have a row per table, so the row of table_name is
+  used and the first row only if none of the rows matches.
+  """
+  with benchmark("Apply limit: get_estimated_count > explain"):
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = db.session.connection().execute(
+        "EXPLAIN " + compiled.string, params
+    ).fetchall()
+  if not rows:
+    return 0
+  row = next((row for row in rows if row["table"] == table_name), rows[0])
+  estimate = row["rows"] or 0
+  filtered = row["filtered"] if "filtered" in row.keys() else None
+  if filtered is not None:
+    estimate = estimate * filtered / 100
+  return int(estimate)
+
+
+def _joins_and_key(counter, clause, model, tgt_class):
   """Get join operations and ordering field from item of order_by list.
 
   Args:
@@ -69,10 +104,10 @@ def _joins_and_order(counter, clause, model, tgt_class):
               "desc": reverse sort on this field if True}
 
   Returns:
-    ([joins], order) - a tuple of joins required for this ordering to work
-                        and ordering clause itself; join is None if no join
-                        required or [(aliased entity, relationship field)]
-                        if joins required.
+    ([joins], key) - a tuple of joins required for this ordering to work
+                      and the ordering field itself; join is None if no join
+                      required or [(aliased entity, relationship field)]
+                      if joins required.
   """
 
   def by_fulltext():
@@ -116,9 +151,14 @@ def _joins_and_order(counter, clause, model, tgt_class):
     # Snapshot or non object attributes are treated as custom attributes
     joins, order = by_fulltext()
 
+  return joins, order
+
+
+def _joins_and_order(counter, clause, model, tgt_class):
+  """Get join operations and ordering clause from item of order_by list."""
+  joins, order = _joins_and_key(counter, clause, model, tgt_class)
   if clause.get("desc", False):
     order = order.desc()
-
   return joins, order
 
 
@@ -156,3 +196,140 @@ def apply_order_by(model, query, order_by, tgt_class):
     query = query.outerjoin(*join_list)
 
   return query.order_by(*orders)
+
+
+def _get_page_size(page_size):
+  """Get page size of a cursor query."""
+  try:
+    page_size = int(page_size)
+  except (ValueError, TypeError):
+    raise BadQueryException("Invalid page_size. Integer expected.")
+  if page_size <= 0:
+    raise BadQueryException("page_size should be a positive number.")
+  return page_size
+
+
+def _get_signature(object_name, order_by):
+  """Get a short hash of the ordering a cursor was created for."""
+  data = json.dumps([object_name, order_by], sort_keys=True)
+  return hashlib.sha1(data).hexdigest()[:8]
+
+
+def _dump_value(value):
+  """Make a JSON serializable representation of an order_by key value."""
+  if isinstance(value, datetime.datetime):
+    return {"datetime": value.strftime("%Y-%m-%dT%H:%M:%S.%f")}
+  if isinstance(value, datetime.date):
+    return {"date": value.strftime("%Y-%m-%d")}
+  if value is None or isinstance(value, (basestring, bool, int, long, float)):
+    return value
+  return unicode(value)
+
+
+def _load_value(value):
+  """Restore order_by key value from its representation in a cursor."""
+  if isinstance(value, dict):
+    if "datetime" in value:
+      return datetime.datetime.strptime(value["datetime"],
+                                        "%Y-%m-%dT%H:%M:%S.%f")
+    if "date" in value:
+      return datetime.datetime.strptime(value["date"], "%Y-%m-%d").date()
+    raise ValueError("Unknown cursor value")
+  return value
+
+
+def encode_cursor(signature, values):
+  """Encode order_by key values of the last row into an opaque token."""
+  data = json.dumps([signature, [_dump_value(value) for value in values]],
+                    separators=(",", ":"))
+  return base64.urlsafe_b64encode(data)
+
+
+def decode_cursor(token, signature, size):
+  """Decode order_by key values from a token created by encode_cursor."""
+  try:
+    token_signature, values = json.loads(
+        base64.urlsafe_b64decode(token.encode("ascii"))
+    )
+    values = [_load_value(value) for value in values]
+  except (ValueError, TypeError, AttributeError, UnicodeError):
+    raise BadQueryException("Invalid cursor.")
+  if token_signature != signature or len(values) != size:
+    raise BadQueryException("Cursor does not match the query order_by.")
+  return values
+
+
+def _after(key, desc, value):
+  """Get condition for rows placed after the value by the key.
+
+  MySQL puts NULL values first in ascending order and last in descending
+  order.
+  """
+  if value is None:
+    return sa.sql.false() if desc else key.isnot(None)
+  if desc:
+    return sa.or_(key < value, key.is_(None))
+  return key > value
+
+
+def _equal(key, value):
+  return key.is_(None) if value is None else key == value
+
+
+def _seek_predicate(keys, values):
+  """Get condition for rows placed after the row with given key values."""
+  (key, desc), value = keys[-1], values[-1]
+  predicate = _after(key, desc, value)
+  for (key, desc), value in reversed(zip(keys[:-1], values[:-1])):
+    predicate = sa.or_(
+        _after(key, desc, value),
+        sa.and_(_equal(key, value), predicate),
+    )
+  return predicate
+
+
+def get_cursor_page(model, query, object_query, tgt_class):
+  """Get a page of ids with keyset pagination.
+
+  Rows are ordered by order_by keys of the object query with the object id as
+  the last key, so that every row has a unique position. The page continues
+  after the row encoded in the "cursor" of the object query.
+
+  Args:
+    model: the model instances of which are requested in query;
+    query: filter query selecting model ids;
+    object_query: dict with "cursor" (token or None for the first page),
+        "page_size" and optional "order_by" parameters;
+    tgt_class: the snapshotted model if `model` is Snapshot else `model`.
+
+  Returns:
+    tuple of list of ids on the page and cursor of the next page, which is
+    None for the last page.
+  """
+  page_size = _get_page_size(object_query.get("page_size"))
+  order_by = object_query.get("order_by") or []
+  signature = _get_signature(object_query["object_name"], order_by)
+  keys = []
+  for counter, clause in enumerate(order_by):
+    joins, key = _joins_and_key(counter, clause, model, tgt_class)
+    if joins is not None:
+      query = query.outerjoin(*joins)
+    keys.append((key, clause.get("desc", False)))
+  keys.append((model.id, False))
+
+  token = object_query.get("cursor")
+  if token:
+    values = decode_cursor(token, signature, len(keys))
+    query = query.filter(_seek_predicate(keys, values))
+
+  query = query.add_columns(*[column for column, _ in keys]).order_by(
+      *[column.desc() if desc else column for column, desc in keys]
+  )
+  with benchmark("Apply cursor: get_cursor_page > query_limit"):
+    rows = query.limit(page_size + 1).all()
+
+  next_cursor = None
+  if len(rows) > page_size:
+    rows = rows[:page_size]
+    next_cursor = encode_cursor(signature, rows[-1][1:])
+  return [row[0] for row in rows], next_cursor
@@ -0,0 +1,279 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Cache of /query result ids and total counts.
+
+Results are cached per canonicalized object query (expression, order_by,
+limit and requested permission) and a fingerprint of the part of the user
+permissions that is used to filter the queried model. Users with the same
+permissions share the cached results. Total counts do not depend on
+order_by and limit, so they are cached separately and shared by all pages of
+the query.
+
+Every cache key also contains the current generations of all models that
+the query depends on. Generations are stored in memcache and are dropped
+after every commit that changes objects of the models (see
+ggrc.cache.utils.expire_query_results), so that results cached before the
+change are never read again and expire on their own. Objects changed in
+session flushes are recorded automatically, writers that use plain SQL
+statements record their models with ggrc.cache.utils.add_query_changes.
+
+Ids are stored as a compressed binary array, so that "ids" and "count"
+queries can be served without touching the database.
+"""
+
+import array
+import hashlib
+import json
+import logging
+import sys
+import uuid
+import zlib
+
+from ggrc import settings
+from ggrc.cache import utils as cache_utils
+from ggrc.rbac import permissions
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "query:result:"
+COUNT_KEY_PREFIX = "query:count:"
+
+# Exact counts of approximate totals are computed once per this period.
+COUNT_PENDING_TIMEOUT = 60
+
+# Models whose changes can affect results of any filter expression.
+COMMON_DEPENDENCIES = ("Relationship", "AccessControlList", "Snapshot")
+
+# Memcache does not store values larger than 1MB.
+MAX_VALUE_SIZE = 1000000
+
+_TYPECODE = "i"
+
+
+def is_enabled():
+  return (getattr(settings, "MEMCACHE_MECHANISM", False) and
+          getattr(settings, "QUERY_CACHE_TIMEOUT", 0) > 0)
+
+
+def _get_client():
+  return cache_utils.get_cache_manager().cache_object.memcache_client
+
+
+def _collect_names(expression, names):
+  """Collect model names used in the expression.
+
+  Returns:
+    False if the expression references results of other queries and can not
+    be cached, True otherwise.
+  """
+  if not isinstance(expression, dict):
+    return True
+  object_name = expression.get("object_name")
+  if object_name == "__previous__":
+    return False
+  if isinstance(object_name, basestring):
+    names.add(object_name)
+  return (_collect_names(expression.get("left"), names) and
+          _collect_names(expression.get("right"), names))
+
+
+def get_dependencies(object_query, target_name):
+  """Get names of models that can affect query results.
+
+  Returns:
+    sorted list of model names, or None if the query can not be cached.
+  """
+  names = set(COMMON_DEPENDENCIES)
+  names.add(object_query["object_name"])
+  names.add(target_name)
+  expression = object_query.get("filters", {}).get("expression")
+  if not _collect_names(expression, names):
+    return None
+  return sorted(names)
+
+
+def permissions_fingerprint(model_name, permission_type):
+  """Get a hash of permissions used to filter objects of the model."""
+  if permission_type == "read" and permissions.has_system_wide_read():
+    return "all"
+  if permission_type == "update" and permissions.has_system_wide_update():
+    return "all"
+  contexts, resources = permissions.get_context_resource(
+      model_name=model_name, permission_type=permission_type
+  )
+  if contexts is None:
+    return "all"
+  if not resources:
+    return "none"
+  if hasattr(resources, "to_bytes"):
+    data = resources.to_bytes()
+  else:
+    data = ",".join(str(id_) for id_ in sorted(resources))
+  return hashlib.sha1(data).hexdigest()
+
+
+def _get_generations(client, names):
+  """Get current generations of models, create missing ones."""
+  keys = [cache_utils.get_query_generation_key(name) for name in names]
+  generations = client.get_multi(keys)
+  missing = {key: uuid.uuid4().hex[:8] for key in keys
+             if key not in generations}
+  if missing:
+    client.add_multi(missing)
+    generations.update(missing)
+  return [generations[key] for key in keys]
+
+
+def _get_hash(data):
+  canonical = json.dumps(data, sort_keys=True, separators=(",", ":"),
+                         default=str)
+  return hashlib.sha1(canonical).hexdigest()
+
+
+def _get_filter_data(object_query, fingerprint, generations):
+  """Get the part of the object query that defines the filtered set."""
+  return {
+      "object_name": object_query["object_name"],
+      "expression": object_query.get("filters", {}).get("expression"),
+      "permissions": object_query.get("permissions", "read"),
+      "fingerprint": fingerprint,
+      "generations": generations,
+  }
+
+
+def get_key(object_query, fingerprint, generations):
+  """Build cache key for the canonicalized object query."""
+  data = _get_filter_data(object_query, fingerprint, generations)
+  data["order_by"] = object_query.get("order_by")
+  data["limit"] = object_query.get("limit")
+  return KEY_PREFIX + _get_hash(data)
+
+
+def get_count_key(object_query, fingerprint, generations):
+  """Build total count cache key for the canonicalized object query."""
+  return COUNT_KEY_PREFIX + _get_hash(
+      _get_filter_data(object_query, fingerprint, generations)
+  )
+
+
+def pack_ids(ids, total):
+  """Pack ordered result ids and total count into a compact value."""
+  ids = array.array(_TYPECODE, ids)
+  if sys.byteorder != "little":
+    ids.byteswap()
+  return total, zlib.compress(ids.tostring())
+
+
+def unpack_ids(value):
+  """Unpack value created by pack_ids.
+
+  Returns:
+    tuple of list of ids and total count.
+  """
+  total, data = value
+  ids = array.array(_TYPECODE)
+  ids.fromstring(zlib.decompress(data))
+  if sys.byteorder != "little":
+    ids.byteswap()
+  return ids.tolist(), total
+
+
+class _QueryCache(object):
+  """Base class for caches of object query results."""
+
+  def __init__(self, object_query, object_class, target_class):
+    self.key = None
+    self.client = None
+    if not is_enabled() or not self._is_cacheable(object_query):
+      return
+    names = get_dependencies(object_query, target_class.__name__)
+    if names is None:
+      return
+    permission_type = object_query.get("permissions", "read")
+    try:
+      self.client = _get_client()
+      generations = _get_generations(self.client, names)
+    except Exception:  # pylint: disable=broad-except
+      logger.exception("Failed to get query cache generations")
+      self.client = None
+      return
+    self.key = self._get_key(
+        object_query,
+        permissions_fingerprint(object_class.__name__, permission_type),
+        generations,
+    )
+
+  @staticmethod
+  def _is_cacheable(object_query):
+    # pylint: disable=unused-argument
+    return True
+
+  @staticmethod
+  def _get_key(object_query, fingerprint, generations):
+    raise NotImplementedError()
+
+
+class ResultCache(_QueryCache):
+  """Cache of result ids of a single object query."""
+
+  @staticmethod
+  def _is_cacheable(object_query):
+    # Cursor pages are cheap to fetch with seek predicates.
+    return "cursor" not in object_query
+
+  @staticmethod
+  def _get_key(object_query, fingerprint, generations):
+    return get_key(object_query, fingerprint, generations)
+
+  def get(self):
+    """Get cached ids and total count.
+
+    Returns:
+      tuple of ids list and total count, or None on cache miss.
+    """
+    if self.key is None:
+      return None
+    value = self.client.get(self.key)
+    if value is None:
+      return None
+    return unpack_ids(value)
+
+  def set(self, ids, total):
+    """Store ids and total count in cache."""
+    if self.key is None:
+      return
+    value = pack_ids(ids, total)
+    if len(value[1]) > MAX_VALUE_SIZE:
+      return
+    self.client.set(self.key, value, settings.QUERY_CACHE_TIMEOUT)
+
+
+class CountCache(_QueryCache):
+  """Cache of the total count of a single object query."""
+
+  @staticmethod
+  def _get_key(object_query, fingerprint, generations):
+    return get_count_key(object_query, fingerprint, generations)
+
+  def get(self):
+    """Get cached total count or None on cache miss."""
+    if self.key is None:
+      return None
+    return self.client.get(self.key)
+
+  def set(self, total):
+    if self.key is None:
+      return
+    self.client.set(self.key, total, settings.QUERY_CACHE_TIMEOUT)
+
+  def mark_pending(self):
+    """Mark exact count as being computed.
+
+    Returns:
+      True if the exact count is not computed by another request yet.
+    """
+    if self.key is None:
+      return False
+    return bool(self.client.add(self.key + ":pending", True,
+                                COUNT_PENDING_TIMEOUT))
@@ -11,6 +11,7 @@ from flask import request
 from flask import current_app
 from werkzeug.exceptions import BadRequest
 
+from ggrc.fulltext import reindex_queue
 from ggrc.models import all_models
 from ggrc.query.exceptions import BadQueryException
 from ggrc.query.default_handler import DefaultHandler
@@ -76,7 +77,8 @@ def get_objects_by_query():
                         if result["last_modified"]]
   last_modified = max(last_modified_list) if last_modified_list else None
   collections = []
-  collection_fields = ["ids", "values", "count", "total", "object_name"]
+  collection_fields = ["ids", "values", "count", "total", "object_name",
+                       "next_cursor", "total_approximate"]
 
   for result in results:
     model = get_model(result["object_name"])
@@ -100,7 +102,7 @@ def init_query_views(app):
   def query_objects():
     """Advanced object collection queries view."""
     try:
-      return get_objects_by_query()
+      return reindex_queue.add_lag_header(get_objects_by_query())
     except (NotImplementedError, BadQueryException) as exc:
       raise BadRequest(exc.message)
 
@@ -96,6 +96,16 @@ def is_allowed_update_for(instance):
   return permissions_for(get_user()).is_allowed_update_for(instance)
 
 
+def filter_allowed_update(resource_type, resource_ids):
+  """Ids of resources of the specified type the user is allowed to update.
+
+  Gives the same result as is_allowed_update without a context for every id,
+  but checks permissions only once for the resource type.
+  """
+  return permissions_for(get_user()).filter_allowed_update(
+      resource_type, resource_ids)
+
+
 def is_allowed_delete(resource_type, resource_id, context_id):
   """Whether or not the user is allowed to delete a resource of the specified
   type in the context.
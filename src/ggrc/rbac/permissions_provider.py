@@ -358,6 +358,11 @@ class DefaultUserPermissions(object):
     """Whether or not the user is allowed to update the given instance"""
     return self._is_allowed_for(instance, 'update')
 
+  def filter_allowed_update(self, resource_type, resource_ids):
+    """Ids of resources of the specified type the user is allowed to
+    update."""
+    return self._filter_allowed('update', resource_type, resource_ids)
+
   def is_allowed_delete(self, resource_type, resource_id, context_id):
     """Whether or not the user is allowed to delete a resource of the
     specified type in the context."""
@@ -368,6 +373,17 @@ class DefaultUserPermissions(object):
     """Whether or not the user is allowed to delete the given instance"""
     return self._is_allowed_for(instance, 'delete')
 
+  def _filter_allowed(self, action, resource_type, resource_ids):
+    """Get ids of resources allowed for the action without a context."""
+    if self._is_allowed(Permission(action, resource_type, None, None)):
+      # the action is allowed for all resources of the type
+      return set(resource_ids)
+    resources = self._permissions()\
+        .get(action, {})\
+        .get(resource_type, {})\
+        .get('resources', [])
+    return set(resource_ids) & set(resources)
+
   def _get_resources_for(self, action, resource_type):
     """Get resources resources (object ids) for a given action and
     resource_type"""
@@ -16,6 +16,7 @@ def contributed_services():
   from ggrc.services.resources.audit import AuditResource
   from ggrc.services.resources.assessment import AssessmentResource
   from ggrc.services.resources.person import PersonResource
+  from ggrc.services.resources.revision import RevisionResource
   from ggrc.services.resources import related_assessments
   from ggrc.access_control.role import AccessControlRole
 
@@ -56,7 +57,7 @@ def contributed_services():
       service('projects', models.Project),
       service('programs', models.Program),
       service('relationships', models.Relationship, RelationshipResource),
-      service('revisions', models.Revision, ReadOnlyResource),
+      service('revisions', models.Revision, RevisionResource),
       service('requirements', models.Requirement),
       service('risk_assessments', models.RiskAssessment),
       service('risks', models.Risk),
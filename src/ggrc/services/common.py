@@ -1254,6 +1254,8 @@ class Resource(ModelView):
       query = model.eager_query()
       # We force the query here so that we can benchmark it
       objs = query.filter(model.id.in_(ids.keys())).all()
+    with benchmark("Preload data for publishing"):
+      self.preload_publish_data(objs)
     with benchmark("Publish objects"):
       resources = {}
       includes = self.get_properties_to_include(request.args.get('__include'))
@@ -1263,6 +1265,10 @@ class Resource(ModelView):
       ggrc.builder.json.publish_representation(resources)
     return resources
 
+  def preload_publish_data(self, objs):
+    """Load data required to publish objs in bulk, nothing by default."""
+    pass
+
   def build_collection_representation(self, objs, extras=None):
     table_plural = self.model._inflector.table_plural
     collection_name = '{0}_collection'.format(table_plural)
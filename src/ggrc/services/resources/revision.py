@@ -0,0 +1,16 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Read only resource for revisions that populates their content in bulk."""
+
+from ggrc.models.revision import Revision
+from ggrc.services import common
+
+
+class RevisionResource(common.ReadOnlyResource):
+  """Resource handler for revisions."""
+
+  # pylint: disable=abstract-method
+
+  def preload_publish_data(self, objs):
+    Revision.populate_contents(objs)
@@ -9,6 +9,7 @@ from werkzeug.exceptions import BadRequest
 import ggrc.models.relationship
 
 from ggrc.fulltext import get_indexer
+from ggrc.fulltext import reindex_queue
 from ggrc.utils import GrcEncoder, url_for, benchmark
 from ggrc import db
 
@@ -84,7 +85,7 @@ def do_counts(terms, types=None, contact_id=None,
                              extra_columns=extra_columns)
 
   results = [(r[2] if r[2] != "" else r[0], r[1]) for r in results]
-  return current_app.make_response((
+  return reindex_queue.add_lag_header(current_app.make_response((
       json.dumps({
           'results': {
               'selfLink': request.url,
@@ -93,7 +94,7 @@ def do_counts(terms, types=None, contact_id=None,
       }, cls=GrcEncoder),
       200,
       [('Content-Type', 'application/json')],
-  ))
+  )))
 
 
 def _build_relevant_filter(types, relevant_objects):
@@ -153,7 +154,7 @@ def do_search(terms, list_for_type, types=None, permission_type='read',
 
 
 def make_search_result(entries):
-  return current_app.make_response((
+  return reindex_queue.add_lag_header(current_app.make_response((
       json.dumps({
           'results': {
               'selfLink': request.url,
@@ -162,7 +163,7 @@ def make_search_result(entries):
       }, cls=GrcEncoder),
       200,
       [('Content-Type', 'application/json')],
-  ))
+  )))
 
 
 def basic_search(terms, types=None,
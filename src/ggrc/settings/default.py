@@ -107,10 +107,67 @@ EMAIL_DAILY = JINJA2.get_template("notifications/view_daily_digest.html")
 EMAIL_PENDING = JINJA2.get_template("notifications/view_pending_digest.html")
 EMAIL_IMPORT_EXPORT = JINJA2.get_template("notifications/import_export.html")
 
+# Number of threads sending daily digest emails, values lower than 2 send
+# them serially. Digests are sent in chunks of DIGEST_BATCH_SIZE recipients.
+DIGEST_SEND_WORKERS = int(os.environ.get("GGRC_DIGEST_SEND_WORKERS", "4"))
+DIGEST_BATCH_SIZE = int(os.environ.get("GGRC_DIGEST_BATCH_SIZE", "100"))
+
+# Queue objects for full text reindexing instead of updating their records
+# before commit. The queue is drained by a cron job every minute in batches of
+# FULLTEXT_QUEUE_BATCH_SIZE rows.
+FULLTEXT_ASYNC_INDEXING = bool(os.environ.get("GGRC_FULLTEXT_ASYNC_INDEXING"))
+FULLTEXT_QUEUE_BATCH_SIZE = int(os.environ.get(
+    "GGRC_FULLTEXT_QUEUE_BATCH_SIZE", "1000"))
+
+# Use trigram posting lists to find candidates of full text searches. Enable
+# only after the posting lists are built with /admin/rebuild_fulltext_trigrams.
+FULLTEXT_TRIGRAM_SEARCH = bool(os.environ.get("GGRC_FULLTEXT_TRIGRAM_SEARCH"))
+
+# Number of threads starting cycles of recurring workflows in the nightly cron
+# job, values lower than 2 process workflows serially.
+WORKFLOW_CYCLE_WORKERS = int(os.environ.get("GGRC_WORKFLOW_CYCLE_WORKERS",
+                                            "1"))
+
 USE_APP_ENGINE_ASSETS_SUBDOMAIN = False
 
 BACKGROUND_COLLECTION_POST_SLEEP = 0
 
+# Number of worker processes for analysis of independent import blocks.
+# Values lower than 2 disable parallel analysis. It is not used on App Engine.
+IMPORT_ANALYSIS_WORKERS = int(
+    os.environ.get("GGRC_IMPORT_ANALYSIS_WORKERS", "0"))
+
+# Time in seconds for which /query result ids are cached in memcache.
+# 0 disables the cache.
+QUERY_CACHE_TIMEOUT = int(os.environ.get("GGRC_QUERY_CACHE_TIMEOUT", "300"))
+
+# Time in seconds for which page bootstrap payloads (custom attribute
+# definitions, roles and attribute definitions) are cached in memcache.
+# 0 disables the cache.
+BOOTSTRAP_CACHE_TIMEOUT = int(
+    os.environ.get("GGRC_BOOTSTRAP_CACHE_TIMEOUT", "3600"))
+
+# Maximum number of revisions with searchable snapshot attributes kept in
+# memory of each process. 0 disables the store.
+SNAPSHOT_CONTENT_STORE_SIZE = int(
+    os.environ.get("GGRC_SNAPSHOT_CONTENT_STORE_SIZE", "50000"))
+
+# Time in seconds for which populated revision content is kept in memcache.
+REVISION_CONTENT_CACHE_TIMEOUT = int(
+    os.environ.get("GGRC_REVISION_CONTENT_CACHE_TIMEOUT", "86400"))
+
+# Store content of older revisions as deltas against the next revision of the
+# same object. Compaction runs in the nightly cron job and can be started at
+# /admin/compact_revisions. Every REVISION_KEYFRAME_INTERVAL-th revision of an
+# object and its latest revision are always stored in full.
+REVISION_DELTA_STORAGE = bool(os.environ.get("GGRC_REVISION_DELTA_STORAGE"))
+REVISION_KEYFRAME_INTERVAL = int(
+    os.environ.get("GGRC_REVISION_KEYFRAME_INTERVAL", "10"))
+
+# Default number of revisions in a page of /api/revisions/history.
+REVISION_HISTORY_PAGE_SIZE = int(
+    os.environ.get("GGRC_REVISION_HISTORY_PAGE_SIZE", "100"))
+
 
 LOGGING_HANDLER = {
     "class": "logging.StreamHandler",
@@ -143,6 +200,16 @@ LOGGING_LOGGERS = {
 
 DEBUG_BENCHMARK = os.environ.get("GGRC_BENCHMARK")
 
+# Share of requests (from 0 to 1) profiled with SQL query statistics, see
+# ggrc.utils.profiling. 0 disables profiling.
+PROFILING_SAMPLE_RATE = float(
+    os.environ.get("GGRC_PROFILING_SAMPLE_RATE", "0"))
+# Maximum number of SQL queries expected in a profiled request, 0 disables
+# the check. Budgets of single endpoints can be set in QUERY_BUDGETS, e.g.
+# {"POST /query": 30, "GET /api/controls/<id>": 20}.
+DEFAULT_QUERY_BUDGET = int(os.environ.get("GGRC_DEFAULT_QUERY_BUDGET", "0"))
+QUERY_BUDGETS = {}
+
 # GGRCQ integration
 GGRC_Q_INTEGRATION_URL = os.environ.get('GGRC_Q_INTEGRATION_URL', '')
 
@@ -164,6 +231,17 @@ ISSUE_TRACKER_BUG_URL_TMPL = os.environ.get('ISSUE_TRACKER_BUG_URL_TMPL')
 # Flag defining whether we need to mock issue tracker responses
 ISSUE_TRACKER_MOCK = bool(os.environ.get('ISSUE_TRACKER_MOCK'))
 
+# Number of threads fetching and updating Issue Tracker issues concurrently
+# in synchronization cron jobs. Values lower than 2 disable concurrency.
+ISSUE_TRACKER_SYNC_WORKERS = int(
+    os.environ.get('ISSUE_TRACKER_SYNC_WORKERS', '4'))
+
+# Maximum number of search and update requests per second that
+# synchronization jobs of a process send to Issue Tracker. 0 disables the
+# limit.
+ISSUE_TRACKER_RATE_LIMIT = int(
+    os.environ.get('ISSUE_TRACKER_RATE_LIMIT', '10'))
+
 # Dashboard integration
 _DEFAULT_DASHBOARD_INTEGRATION_CONFIG = {
     "ca_name_regexp": r"^Dashboard_(.*)$",
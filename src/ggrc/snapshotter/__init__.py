@@ -29,6 +29,7 @@ from ggrc.snapshotter.helpers import create_snapshot_dict
 from ggrc.snapshotter.helpers import create_snapshot_revision_dict
 from ggrc.snapshotter.helpers import get_revisions
 from ggrc.snapshotter.helpers import get_snapshots
+from ggrc.snapshotter.indexer import get_revisions_attributes
 from ggrc.snapshotter.indexer import reindex_pairs
 
 from ggrc.snapshotter.rules import get_rules
@@ -69,7 +70,7 @@ class SnapshotGenerator(object):
     parent_object = db.session.query(model).filter(model.id == _id).one()
     self.parents.add(parent)
     self.snapshots[parent] = children
-    self.children = children
+    self.children = self.children | children
     self.context_cache[parent] = parent_object.context_id
 
   def _fetch_neighborhood(self, parent_object, objects):
@@ -150,6 +151,13 @@ class SnapshotGenerator(object):
       self._create_audit_relationships()
     return result
 
+  def _populate_content_store(self, revision_ids):
+    """Load searchable attributes of snapshot revisions in bulk."""
+    if self.dry_run:
+      return
+    with benchmark("Snapshot.populate content store"):
+      get_revisions_attributes(revision_ids)
+
   def _update(self, for_update, event, revisions, _filter):
     """Update (or create) parent objects' snapshots and create revisions for
     them.
@@ -233,6 +241,10 @@ class SnapshotGenerator(object):
       if not modified_snapshot_keys:
         return OperationResponse("update", True, set(), response_data)
 
+      self._populate_content_store({
+          revision_id_cache[key] for key in modified_snapshot_keys
+      })
+
       with benchmark("Snapshot._update.write snapshots to database"):
         update_sql = models.Snapshot.__table__.update().where(
             models.Snapshot.id == bindparam("_id")).values(
@@ -393,6 +405,10 @@ class SnapshotGenerator(object):
             "Tried to create snapshots for the following objects but "
             "found no revisions: %s", missed_keys)
 
+      self._populate_content_store({
+          data["revision_id"] for data in data_payload
+      })
+
       with benchmark("Snapshot._create.write to database"):
         self._execute(
             models.Snapshot.__table__.insert(),
@@ -0,0 +1,199 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""In-memory columnar store of searchable snapshot attributes.
+
+Snapshots of the same object in different audits usually point to the same
+revision. Searchable attributes extracted from populated revision content
+are therefore kept per revision id, so that revision content is loaded and
+deserialized only once per process.
+
+Populated content is not immutable: it depends on the current custom
+attribute definitions, access control roles and people, and the stored
+content of a revision can be rewritten with revision_storage.set_content,
+for example by data migrations. The store relies on these assumptions:
+
+  - custom attribute definitions are covered by the definitions signature
+    checked on every read, see below;
+  - other sources of populated content, such as roles, people and labels,
+    and rewrites of stored content are rare administrative changes, and
+    stored rows are not invalidated by them. Attributes stay stale until
+    the process is restarted or the store is cleared when it reaches
+    SNAPSHOT_CONTENT_STORE_SIZE rows. Setting it to 0 disables the store
+    where such changes must be indexed at once.
+
+Attributes of every resource type are stored in columns. Each column is
+dictionary encoded: it keeps an array of integer codes, one per stored
+revision, and a list of distinct values. Statuses, people and other values
+shared by many revisions are stored only once.
+
+Values of custom attributes depend on the custom attribute definitions, so
+the stored rows of a resource type are dropped whenever the definitions
+signature of that type changes.
+"""
+
+import array
+import json
+import threading
+
+from ggrc import settings
+
+MISSING = -1
+
+_TYPECODE = "i"
+
+
+def _get_key(value):
+  """Get dictionary key of a value.
+
+  Strings are their own keys, so the key does not take any extra memory.
+  Other scalars are keyed together with their type, so that 1 and True get
+  different keys. Lists and dicts are keyed by the hash of their JSON.
+  """
+  if isinstance(value, basestring):
+    return value
+  if isinstance(value, (list, dict)):
+    return hash(json.dumps(value, sort_keys=True, default=unicode))
+  return type(value), value
+
+
+def _is_same(stored, value):
+  return type(stored) is type(value) and stored == value
+
+
+class Column(object):
+  """Dictionary encoded column of JSON serializable values."""
+
+  def __init__(self, size=0):
+    self.codes = array.array(_TYPECODE, [MISSING] * size)
+    self.values = []
+    self._value_codes = {}
+
+  def append(self, value):
+    """Add a value for the next row.
+
+    A value whose key collides with a different stored value is stored
+    again, which only costs memory.
+    """
+    key = _get_key(value)
+    code = self._value_codes.get(key)
+    if code is None or not _is_same(self.values[code], value):
+      code = len(self.values)
+      self.values.append(value)
+      self._value_codes.setdefault(key, code)
+    self.codes.append(code)
+
+  def append_missing(self):
+    self.codes.append(MISSING)
+
+  def get(self, row):
+    """Get value code and value of the row."""
+    code = self.codes[row]
+    if code == MISSING:
+      return MISSING, None
+    return code, self.values[code]
+
+
+class TypeStore(object):
+  """Stored attributes of revisions of a single resource type."""
+
+  def __init__(self, signature):
+    self.signature = signature
+    self.rows = {}
+    self.columns = {}
+
+  def __len__(self):
+    return len(self.rows)
+
+  def add(self, revision_id, attributes):
+    """Store attributes of a revision."""
+    if revision_id in self.rows:
+      return
+    row = len(self.rows)
+    for name, value in attributes.iteritems():
+      if name not in self.columns:
+        self.columns[name] = Column(row)
+      self.columns[name].append(value)
+    for name, column in self.columns.iteritems():
+      if name not in attributes:
+        column.append_missing()
+    self.rows[revision_id] = row
+
+  def get(self, revision_id):
+    """Get attributes of a revision or None if the revision is not stored."""
+    row = self.rows.get(revision_id)
+    if row is None:
+      return None
+    attributes = {}
+    for name, column in self.columns.iteritems():
+      code, value = column.get(row)
+      if code != MISSING:
+        attributes[name] = value
+    return attributes
+
+
+class ContentStore(object):
+  """Searchable attributes of revisions keyed by revision id.
+
+  Returned attribute values are shared between revisions and must not be
+  modified.
+  """
+
+  def __init__(self, max_rows):
+    self.max_rows = max_rows
+    self._types = {}
+    self._revision_types = {}
+    self._lock = threading.Lock()
+
+  def _get_type_store(self, resource_type, signature):
+    """Get store for the resource type, reset it if signature changed."""
+    store = self._types.get(resource_type)
+    if store is None or store.signature != signature:
+      if store is not None:
+        for revision_id in store.rows:
+          self._revision_types.pop(revision_id, None)
+      store = TypeStore(signature)
+      self._types[resource_type] = store
+    return store
+
+  def get(self, revision_ids, signatures):
+    """Get stored attributes.
+
+    Args:
+      revision_ids: iterable of revision ids.
+      signatures: dict with current definitions signature of every resource
+          type.
+
+    Returns:
+      dict of revision id to tuple of resource type and attributes, for the
+      stored revisions only.
+    """
+    result = {}
+    with self._lock:
+      for revision_id in revision_ids:
+        resource_type = self._revision_types.get(revision_id)
+        if resource_type is None:
+          continue
+        store = self._types[resource_type]
+        if store.signature != signatures.get(resource_type):
+          continue
+        result[revision_id] = (resource_type, store.get(revision_id))
+    return result
+
+  def add(self, revision_id, resource_type, signature, attributes):
+    """Store attributes of a revision."""
+    if self.max_rows <= 0:
+      return
+    with self._lock:
+      if len(self._revision_types) >= self.max_rows:
+        self.clear()
+      store = self._get_type_store(resource_type, signature)
+      store.add(revision_id, attributes)
+      self._revision_types[revision_id] = resource_type
+
+  def clear(self):
+    self._types = {}
+    self._revision_types = {}
+
+
+STORE = ContentStore(getattr(settings, "SNAPSHOT_CONTENT_STORE_SIZE", 0))
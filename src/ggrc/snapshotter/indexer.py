@@ -16,9 +16,11 @@ from ggrc import models
 from ggrc.models import all_models
 from ggrc.fulltext.mysql import MysqlRecordProperty as Record
 from ggrc.fulltext import get_indexer
+from ggrc.fulltext import trigrams
 from ggrc.models.reflection import AttributeInfo
-from ggrc.utils import generate_query_chunks, helpers
+from ggrc.utils import generate_query_chunks, helpers, list_chunks
 
+from ggrc.snapshotter import content_store
 from ggrc.snapshotter.rules import Types
 from ggrc.snapshotter.datastructures import Pair
 from ggrc.fulltext.attributes import FullTextAttr
@@ -110,6 +112,60 @@ def get_searchable_attributes(attributes, cads, content):
   return searchable_values
 
 
+def _get_cads_signature(cads):
+  """Get signature of custom attribute definitions used for indexing."""
+  return tuple(
+      (cad.id, cad.title, cad.attribute_type, cad.default_value)
+      for cad in cads
+  )
+
+
+def get_revisions_attributes(revision_ids, cad_dict=None):
+  """Get searchable attributes of revisions.
+
+  Attributes are taken from the snapshot content store. Content of revisions
+  missing in the store is loaded in chunks and the extracted attributes are
+  added to the store.
+
+  Args:
+    revision_ids: set of revision ids.
+    cad_dict: custom attribute definitions as returned by
+        _get_custom_attribute_dict.
+  Returns:
+    dict of revision id to tuple of resource type and searchable attributes.
+  """
+  if cad_dict is None:
+    cad_dict = _get_custom_attribute_dict()
+  signatures = {
+      type_: _get_cads_signature(cad_dict[type_]) for type_ in Types.all
+  }
+  result = content_store.STORE.get(revision_ids, signatures)
+  missing_ids = [id_ for id_ in revision_ids if id_ not in result]
+  for ids_chunk in list_chunks(missing_ids):
+    query = models.Revision.query.filter(
+        models.Revision.id.in_(ids_chunk)
+    ).options(
+        orm.load_only(
+            "id",
+            "resource_type",
+            "resource_id",
+            "_stored_content",
+            "_delta_base_id",
+        ),
+    )
+    for revision in query:
+      resource_type = revision.resource_type
+      attributes = get_searchable_attributes(
+          CLASS_PROPERTIES[resource_type],
+          cad_dict[resource_type],
+          revision.content,
+      )
+      content_store.STORE.add(revision.id, resource_type,
+                              signatures.get(resource_type), attributes)
+      result[revision.id] = (resource_type, attributes)
+  return result
+
+
 def get_options():
   """Get options.
 
@@ -172,6 +228,7 @@ def delete_records(snapshot_ids):
       Record.type == "Snapshot",
       Record.key.in_(snapshot_ids)
   ).delete(synchronize_session=False)
+  trigrams.delete_for("Snapshot", snapshot_ids)
   db.session.commit()
 
 
@@ -183,6 +240,7 @@ def insert_records(payload):
   """
   engine = db.engine
   engine.execute(Record.__table__.insert(), payload)
+  trigrams.insert_for_records(payload)
   db.session.commit()
 
 
@@ -368,12 +426,6 @@ def reindex_pairs(pairs):
           {pair.to_4tuple() for pair in pairs}
       )
   ).options(
-      orm.subqueryload("revision").load_only(
-          "id",
-          "resource_type",
-          "resource_id",
-          "_content",
-      ),
       orm.load_only(
           "id",
           "parent_type",
@@ -383,19 +435,21 @@ def reindex_pairs(pairs):
           "revision_id",
       )
   )
-  cad_dict = _get_custom_attribute_dict()
-  for snapshot in snapshot_query:
-    revision = snapshot.revision
+  snapshot_list = snapshot_query.all()
+  revisions_attributes = get_revisions_attributes(
+      {snapshot.revision_id for snapshot in snapshot_list}
+  )
+  for snapshot in snapshot_list:
+    if snapshot.revision_id not in revisions_attributes:
+      continue
+    _, attributes = revisions_attributes[snapshot.revision_id]
     snapshots[snapshot.id] = {
         "id": snapshot.id,
         "parent_type": snapshot.parent_type,
         "parent_id": snapshot.parent_id,
         "child_type": snapshot.child_type,
         "child_id": snapshot.child_id,
-        "revision": get_searchable_attributes(
-            CLASS_PROPERTIES[revision.resource_type],
-            cad_dict[revision.resource_type],
-            revision.content)
+        "revision": attributes,
     }
   search_payload = []
   for snapshot in snapshots.values():
@@ -20,6 +20,7 @@ import time
 from collections import defaultdict
 
 from ggrc import settings
+from ggrc.utils import profiling
 
 
 logger = logging.getLogger(__name__)
@@ -40,10 +41,12 @@ class BenchmarkContextManager(object):
     self.start = 0
 
   def __enter__(self):
+    profiling.start_benchmark(self.message)
     self.start = time.time()
 
   def __exit__(self, exc_type, exc_value, exc_trace):
     end = time.time()
+    profiling.end_benchmark(end - self.start)
     logger.debug("%.4f %s", end - self.start, self.message)
 
 
@@ -8,6 +8,7 @@ This class mocks responses from Issue Tracker
 so it can be properly tested on FE.
 """
 
+import json
 import os
 from google.appengine.api import apiproxy_stub
 from google.appengine.api import apiproxy_stub_map
@@ -21,13 +22,26 @@ class FetchServiceMock(apiproxy_stub.APIProxyStub):
     dirname = os.path.dirname(os.path.realpath(__file__))
     json_file = os.path.join(dirname, 'response.json')
     self.mock_response_issue = open(json_file).read()
+    self.requests = []
+
+  def _get_search_response(self, payload):
+    """Return mocked issue for every issue id of search request."""
+    issue = json.loads(self.mock_response_issue)
+    issue_ids = json.loads(payload or "{}").get("issue_ids") or []
+    return json.dumps({
+        "issues": [dict(issue, issueId=issue_id) for issue_id in issue_ids],
+    })
 
   # pylint: disable=invalid-name
   def _Dynamic_Fetch(self, request, response):
     """Process request to urlfetch serice"""
     print "Request:"
     print ("Request: {}").format(request)
-    response.set_content(self.mock_response_issue)
+    self.requests.append(request)
+    if request.url().endswith("/search"):
+      response.set_content(self._get_search_response(request.payload()))
+    else:
+      response.set_content(self.mock_response_issue)
     response.set_statuscode(200)
     new_header = response.add_header()
     new_header.set_key('Content-type')
@@ -0,0 +1,240 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Sampled request profiling.
+
+A share of requests set by PROFILING_SAMPLE_RATE setting is profiled: the
+number of SQL queries, total SQL time, number of fetched rows, request time
+and timings of benchmark blocks are collected for every profiled request.
+The data is aggregated per endpoint into in-memory histograms of the current
+process, which are available to admins at /admin/profiling.
+
+Profiled requests that execute more SQL queries than the budget of their
+endpoint (QUERY_BUDGETS or DEFAULT_QUERY_BUDGET settings) are logged and
+counted, so that N+1 query regressions are easy to spot.
+
+Unlike SQLALCHEMY_RECORD_QUERIES and GGRC_BENCHMARK, profiling does not keep
+query statements and does not print anything per request, so it is safe to
+enable it in production with a low sample rate.
+"""
+
+import bisect
+import random
+import threading
+import time
+from logging import getLogger
+
+import flask
+import sqlalchemy as sa
+
+from ggrc import settings
+
+
+logger = getLogger(__name__)
+
+HISTOGRAM_BOUNDS = {
+    "queries": (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+    "sql_time": (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    "rows": (1, 10, 100, 1000, 10000, 100000),
+    "request_time": (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+}
+
+BENCHMARK_PATH_SEPARATOR = " > "
+
+
+class Histogram(object):
+  """Histogram of values with fixed bucket upper bounds."""
+
+  def __init__(self, bounds):
+    self.bounds = bounds
+    self.counts = [0] * (len(bounds) + 1)
+    self.count = 0
+    self.sum = 0
+    self.max = 0
+
+  def add(self, value):
+    self.counts[bisect.bisect_left(self.bounds, value)] += 1
+    self.count += 1
+    self.sum += value
+    self.max = max(self.max, value)
+
+  def to_dict(self):
+    """Get JSON serializable representation of the histogram."""
+    bounds = list(self.bounds) + ["+Inf"]
+    return {
+        "count": self.count,
+        "sum": self.sum,
+        "avg": float(self.sum) / self.count if self.count else 0,
+        "max": self.max,
+        "buckets": [{"le": bound, "count": count}
+                    for bound, count in zip(bounds, self.counts)],
+    }
+
+
+class EndpointStats(object):
+  """Aggregated profiling data of a single endpoint."""
+
+  def __init__(self, budget):
+    self.budget = budget
+    self.over_budget = 0
+    self.histograms = {name: Histogram(bounds)
+                       for name, bounds in HISTOGRAM_BOUNDS.iteritems()}
+    self.benchmarks = {}
+
+  def add(self, profile, request_time):
+    """Add data of a profiled request."""
+    self.histograms["queries"].add(profile.queries)
+    self.histograms["sql_time"].add(profile.sql_time)
+    self.histograms["rows"].add(profile.rows)
+    self.histograms["request_time"].add(request_time)
+    for path, duration in profile.benchmarks.iteritems():
+      count, total, max_ = self.benchmarks.get(path, (0, 0, 0))
+      self.benchmarks[path] = (count + 1, total + duration,
+                               max(max_, duration))
+    if self.budget and profile.queries > self.budget:
+      self.over_budget += 1
+
+  def to_dict(self):
+    """Get JSON serializable representation of endpoint stats."""
+    return {
+        "budget": self.budget,
+        "over_budget": self.over_budget,
+        "histograms": {name: histogram.to_dict()
+                       for name, histogram in self.histograms.iteritems()},
+        "benchmarks": {
+            path: {"count": count, "sum": total, "max": max_}
+            for path, (count, total, max_) in self.benchmarks.iteritems()
+        },
+    }
+
+
+class Profiler(object):
+  """Per process store of endpoint profiling stats."""
+
+  def __init__(self):
+    self._stats = {}
+    self._lock = threading.Lock()
+
+  def add(self, endpoint, profile, request_time):
+    with self._lock:
+      if endpoint not in self._stats:
+        self._stats[endpoint] = EndpointStats(get_query_budget(endpoint))
+      self._stats[endpoint].add(profile, request_time)
+
+  def report(self):
+    with self._lock:
+      return {endpoint: stats.to_dict()
+              for endpoint, stats in self._stats.iteritems()}
+
+  def reset(self):
+    with self._lock:
+      self._stats = {}
+
+
+PROFILER = Profiler()
+
+
+class RequestProfile(object):
+  """Profiling data of the current request."""
+  # pylint: disable=too-few-public-methods
+
+  def __init__(self):
+    self.start = time.time()
+    self.queries = 0
+    self.sql_time = 0.0
+    self.rows = 0
+    self.benchmarks = {}
+    self.benchmark_stack = []
+
+
+def get_query_budget(endpoint):
+  """Get maximum number of SQL queries expected for the endpoint."""
+  budgets = getattr(settings, "QUERY_BUDGETS", {})
+  return budgets.get(endpoint, getattr(settings, "DEFAULT_QUERY_BUDGET", 0))
+
+
+def get_request_profile():
+  """Get profile of the current request if it is profiled."""
+  if not flask.has_app_context():
+    return None
+  return getattr(flask.g, "request_profile", None)
+
+
+def start_benchmark(message):
+  """Register start of a benchmark block in the current request."""
+  profile = get_request_profile()
+  if profile is not None:
+    profile.benchmark_stack.append(message)
+
+
+def end_benchmark(duration):
+  """Register end of the innermost benchmark block in the current request."""
+  profile = get_request_profile()
+  if profile is None or not profile.benchmark_stack:
+    return
+  path = BENCHMARK_PATH_SEPARATOR.join(profile.benchmark_stack)
+  profile.benchmarks[path] = profile.benchmarks.get(path, 0) + duration
+  profile.benchmark_stack.pop()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+  """Store the query start time."""
+  # pylint: disable=unused-argument,too-many-arguments
+  if get_request_profile() is not None:
+    conn.info.setdefault("profiling_start", []).append(time.time())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+  """Add query stats to the current request profile."""
+  # pylint: disable=unused-argument,too-many-arguments
+  profile = get_request_profile()
+  starts = conn.info.get("profiling_start")
+  if profile is None or not starts:
+    return
+  profile.queries += 1
+  profile.sql_time += time.time() - starts.pop()
+  if cursor.description is not None and cursor.rowcount > 0:
+    profile.rows += cursor.rowcount
+
+
+def _get_endpoint():
+  """Get low cardinality endpoint name of the current request."""
+  rule = flask.request.url_rule
+  path = rule.rule if rule is not None else "<unknown>"
+  return u"{} {}".format(flask.request.method, path)
+
+
+def init_profiling(app):
+  """Set up request profiling if it is enabled in settings."""
+  sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0)
+  if sample_rate <= 0:
+    return
+
+  sa.event.listen(sa.engine.Engine, "before_cursor_execute",
+                  _before_cursor_execute)
+  sa.event.listen(sa.engine.Engine, "after_cursor_execute",
+                  _after_cursor_execute)
+
+  # pylint: disable=unused-variable
+  @app.before_request
+  def start_request_profile():
+    """Start profiling of a sampled request."""
+    if random.random() < sample_rate:
+      flask.g.request_profile = RequestProfile()
+
+  @app.after_request
+  def store_request_profile(response):
+    """Add profile of the request to endpoint stats."""
+    profile = get_request_profile()
+    if profile is None:
+      return response
+    del flask.g.request_profile
+    endpoint = _get_endpoint()
+    PROFILER.add(endpoint, profile, time.time() - profile.start)
+    budget = get_query_budget(endpoint)
+    if budget and profile.queries > budget:
+      logger.warning("%s executed %s SQL queries, query budget is %s",
+                     endpoint, profile.queries, budget)
+    return response
@@ -28,6 +28,8 @@ from ggrc.builder.json import publish_representation
 from ggrc.converters import get_importables, get_exportables
 from ggrc.extensions import get_extension_modules
 from ggrc.fulltext import get_indexer, mixin
+from ggrc.fulltext import incremental
+from ggrc.fulltext import trigrams
 from ggrc.integrations import issues
 from ggrc.integrations import integrations_errors
 from ggrc.login import get_current_user
@@ -39,6 +41,7 @@ from ggrc.models.background_task import create_task
 from ggrc.models.background_task import make_task_response
 from ggrc.models.background_task import queued_task
 from ggrc.models.reflection import AttributeInfo
+from ggrc.models import revision_storage
 from ggrc.models.revision import Revision
 from ggrc.rbac import permissions
 from ggrc.services.common import as_json
@@ -50,11 +53,15 @@ from ggrc.views import converters
 from ggrc.views import cron
 from ggrc.views import filters
 from ggrc.views import notifications
+from ggrc.views import relationships as relationship_views
+from ggrc.views import revisions as revision_views
 from ggrc.views.utils import DocumentEndpoint
 from ggrc.views.registry import object_view
 from ggrc import utils
 from ggrc.utils import benchmark, helpers
+from ggrc.utils import profiling
 from ggrc.utils import revisions
+from ggrc.cache import bootstrap_cache
 from ggrc.cache.utils import clear_permission_cache
 
 logger = logging.getLogger(__name__)
@@ -78,6 +85,22 @@ def create_missing_revisions(_):
   return app.make_response(("success", 200, [("Content-Type", "text/html")]))
 
 
+@app.route("/_background_tasks/compact_revisions", methods=["POST"])
+@queued_task
+def compact_revisions(_):
+  """Web hook to store older revisions as deltas."""
+  revision_storage.compact_revisions()
+  return app.make_response(("success", 200, [("Content-Type", "text/html")]))
+
+
+@app.route("/_background_tasks/rebuild_fulltext_trigrams", methods=["POST"])
+@queued_task
+def rebuild_fulltext_trigrams(_):
+  """Web hook to build trigram posting lists of full text records."""
+  trigrams.rebuild()
+  return app.make_response(("success", 200, [("Content-Type", "text/html")]))
+
+
 @app.route("/_background_tasks/reindex_snapshots", methods=["POST"])
 @queued_task
 def reindex_snapshots(_):
@@ -104,6 +127,14 @@ def full_reindex(_):
   return app.make_response(("success", 200, [("Content-Type", "text/html")]))
 
 
+@app.route("/_background_tasks/incremental_reindex", methods=["POST"])
+@queued_task
+def incremental_reindex(task):
+  """Web hook to update the full text search index for changed rows."""
+  do_incremental_reindex(task)
+  return app.make_response(("success", 200, [("Content-Type", "text/html")]))
+
+
 @app.route("/_background_tasks/compute_attributes", methods=["POST"])
 def compute_attributes(*_, **kwargs):
   """Web hook to update the full text search index."""
@@ -181,6 +212,47 @@ def start_compute_attributes(revision_ids=None, event_id=None):
   )
 
 
+@app.route("/_background_tasks/compute_query_count", methods=["POST"])
+@login_required
+def compute_query_count(*_, **kwargs):
+  """Web hook to cache exact total count of an object query."""
+  from ggrc.query.builder import QueryHelper
+  with benchmark("Run compute_query_count background task"):
+    object_query = utils.get_task_attr("object_query", kwargs)
+    QueryHelper([object_query]).get_ids()
+    return app.make_response(("success", 200, [("Content-Type", "text/html")]))
+
+
+def start_compute_query_count(object_query):
+  """Start a background task computing total count of an object query."""
+  background_task.create_lightweight_task(
+      name="compute_query_count",
+      url=url_for(compute_query_count.__name__),
+      parameters={"object_query": object_query},
+      method="POST",
+      queued_callback=compute_query_count
+  )
+
+
+@app.route("/_background_tasks/nightly_compact_revisions", methods=["POST"])
+@login_required
+def nightly_compact_revisions(*_, **__):
+  """Web hook to store older revisions as deltas after the nightly cron."""
+  with benchmark("Run nightly_compact_revisions background task"):
+    revision_storage.compact_revisions()
+    return app.make_response(("success", 200, [("Content-Type", "text/html")]))
+
+
+def start_compact_revisions():
+  """Start a background task compacting revision history."""
+  background_task.create_lightweight_task(
+      name="nightly_compact_revisions",
+      url=url_for(nightly_compact_revisions.__name__),
+      method="POST",
+      queued_callback=nightly_compact_revisions
+  )
+
+
 def start_update_audit_issues(audit_id, message):
   """Start a background task to update IssueTracker issues related to Audit."""
   task = create_task(
@@ -196,15 +268,16 @@ def start_update_audit_issues(audit_id, message):
   task.start()
 
 
-@helpers.without_sqlalchemy_cache
-def do_reindex(with_reindex_snapshots=False):
-  """Update the full text search index."""
-
-  indexer = get_indexer()
-  indexed_models = {
+def _get_indexed_models():
+  """Get dict of models that require global reindex."""
+  return {
       m.__name__: m for m in all_models.all_models
       if issubclass(m, mixin.Indexed) and m.REQUIRED_GLOBAL_REINDEX
   }
+
+
+def _warmup_indexer_cache(indexer):
+  """Preload people and roles used for building fulltext records."""
   people_query = db.session.query(all_models.Person.id,
                                   all_models.Person.name,
                                   all_models.Person.email)
@@ -213,6 +286,15 @@ def do_reindex(with_reindex_snapshots=False):
       all_models.AccessControlRole.id,
       all_models.AccessControlRole.name,
   ))
+
+
+@helpers.without_sqlalchemy_cache
+def do_reindex(with_reindex_snapshots=False):
+  """Update the full text search index."""
+
+  indexer = get_indexer()
+  indexed_models = _get_indexed_models()
+  _warmup_indexer_cache(indexer)
   for model_name in sorted(indexed_models.keys()):
     logger.info("Updating index for: %s", model_name)
     with benchmark("Create records for %s" % model_name):
@@ -242,6 +324,19 @@ def do_full_reindex():
   start_compute_attributes(revision_ids="all_latest")
 
 
+@helpers.without_sqlalchemy_cache
+def do_incremental_reindex(task):
+  """Update the full text search index for rows changed since last run.
+
+  Progress is checkpointed into the given task, so a failed run is resumed by
+  the next one from the last committed chunk.
+  """
+  indexer = get_indexer()
+  _warmup_indexer_cache(indexer)
+  incremental.reindex(task, _get_indexed_models())
+  indexer.invalidate_cache()
+
+
 class SetEncoder(json.JSONEncoder):
   """Encoder that can handle python sets"""
   # pylint: disable=method-hidden
@@ -250,7 +345,7 @@ class SetEncoder(json.JSONEncoder):
   def default(self, obj):  # pylint: disable=arguments-differ
     """If we get a set we first transform it to a list and then just use
        the default encoder"""
-    if isinstance(obj, set):
+    if isinstance(obj, collections.Set):
       return list(obj)
     return super(SetEncoder, self).default(obj)
 
@@ -324,6 +419,7 @@ def get_current_user_json():
     })
 
 
+@bootstrap_cache.cached_payload
 def get_access_control_roles_json():
   """Get a list of all access control roles"""
   with benchmark("Get access roles JSON"):
@@ -337,6 +433,7 @@ def get_access_control_roles_json():
     return as_json(published)
 
 
+@bootstrap_cache.cached_payload
 def get_internal_roles_json():
   """Get a list of all access control roles"""
   with benchmark("Get access roles JSON"):
@@ -350,6 +447,7 @@ def get_internal_roles_json():
     return as_json(published)
 
 
+@bootstrap_cache.cached_payload
 def get_attributes_json():
   """Get a list of all custom attribute definitions"""
   with benchmark("Get attributes JSON"):
@@ -389,16 +487,19 @@ def get_import_types(export_only=False):
   return response_json
 
 
+@bootstrap_cache.cached_payload
 def get_export_definitions():
   with benchmark("Get export definitions"):
     return get_import_types(export_only=True)
 
 
+@bootstrap_cache.cached_payload
 def get_import_definitions():
   with benchmark("Get import definitions"):
     return get_import_types(export_only=False)
 
 
+@bootstrap_cache.cached_payload
 def get_all_attributes_json(load_custom_attributes=False):
   """Get a list of all attribute definitions
 
@@ -533,6 +634,22 @@ def admin_full_reindex():
                          [('Content-Type', 'text/html')])))
 
 
+@app.route("/admin/incremental_reindex", methods=["POST"])
+@login_required
+@admin_required
+def admin_incremental_reindex():
+  """Calls a webhook that reindexes indexable objects changed since last run
+  """
+  task_queue = create_task(
+      name=incremental.TASK_NAME,
+      url=url_for(incremental_reindex.__name__),
+      queued_callback=incremental_reindex
+  )
+  return task_queue.make_response(
+      app.make_response(("scheduled %s" % task_queue.name, 200,
+                         [('Content-Type', 'text/html')])))
+
+
 @app.route("/admin/compute_attributes", methods=["POST"])
 @login_required
 @admin_required
@@ -579,6 +696,47 @@ def admin_create_missing_revisions():
                         [('Content-Type', 'text/html')])))
 
 
+@app.route("/admin/compact_revisions", methods=["POST"])
+@login_required
+@admin_required
+def admin_compact_revisions():
+  """Calls a webhook that stores older revisions as deltas"""
+  task_queue = create_task(
+      name="compact_revisions",
+      url=url_for(compact_revisions.__name__),
+      queued_callback=compact_revisions,
+  )
+  return task_queue.make_response(
+      app.make_response(("scheduled %s" % task_queue.name, 200,
+                         [('Content-Type', 'text/html')])))
+
+
+@app.route("/admin/rebuild_fulltext_trigrams", methods=["POST"])
+@login_required
+@admin_required
+def admin_rebuild_fulltext_trigrams():
+  """Calls a webhook that builds trigram posting lists of full text records"""
+  task_queue = create_task(
+      name="rebuild_fulltext_trigrams",
+      url=url_for(rebuild_fulltext_trigrams.__name__),
+      queued_callback=rebuild_fulltext_trigrams,
+  )
+  return task_queue.make_response(
+      app.make_response(("scheduled %s" % task_queue.name, 200,
+                         [('Content-Type', 'text/html')])))
+
+
+@app.route("/admin/profiling", methods=["GET", "DELETE"])
+@login_required
+@admin_required
+def admin_profiling():
+  """Get or reset request profiling stats of the current process."""
+  if request.method == "DELETE":
+    profiling.PROFILER.reset()
+  return app.make_response((as_json(profiling.PROFILER.report()), 200,
+                            [("Content-Type", "application/json")]))
+
+
 @app.route("/admin")
 @login_required
 @admin_required
@@ -665,6 +823,8 @@ def init_extra_views(app_):
   notifications.init_notification_views(app_)
   query_views.init_query_views(app_)
   query_views.init_clone_views(app_)
+  relationship_views.init_relationship_views(app_)
+  revision_views.init_revision_views(app_)
 
 
 def init_all_views(app_):
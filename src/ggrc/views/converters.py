@@ -22,6 +22,7 @@ from flask import request
 from flask import json
 from flask import render_template
 from flask import g
+from flask import stream_with_context
 from werkzeug.exceptions import (
     BadRequest, InternalServerError, Unauthorized, Forbidden, NotFound
 )
@@ -93,6 +94,18 @@ def export_file(export_to, filename, csv_string=None):
   raise BadRequest("Bad params")
 
 
+def stream_file(ie_id):
+  """Stream stored ImportExport content as csv file chunk by chunk."""
+  headers = [
+      ("Content-Type", "text/csv"),
+      ("Content-Disposition", "attachment"),
+  ]
+  content = stream_with_context(
+      chunk.encode("utf-8") for chunk in import_export.iter_content(ie_id)
+  )
+  return current_app.response_class(content, 200, headers)
+
+
 def handle_export_request_error(handle_function):
   """Decorator for handle exceptions during exporting"""
   @wraps(handle_function)
@@ -167,6 +180,17 @@ def make_export(objects):
   return csv_data, object_names
 
 
+def stream_export(objects, ie_id):
+  """Make export and store its content in ImportExport entry by chunks."""
+  query_helper = QueryHelper(objects)
+  ids_by_type = query_helper.get_ids()
+  converter = ExportConverter(ids_by_type=ids_by_type)
+  import_export.clear_content(ie_id)
+  writer = import_export.ContentWriter(ie_id)
+  converter.stream_csv_data(writer)
+  writer.flush()
+
+
 def check_import_file():
   """Check if imported file format and type is valid"""
   if "file" not in request.files or not request.files["file"]:
@@ -235,13 +259,14 @@ def run_export(objects, ie_id, user_id, url_root):
       ie = import_export.get(ie_id)
       check_for_previous_run()
 
-      content, _ = make_export(objects)
+      stream_export(objects, ie.id)
       db.session.refresh(ie)
       if ie.status == "Stopped":
+        import_export.clear_content(ie.id)
+        db.session.commit()
         return
       ie.status = "Finished"
       ie.end_at = datetime.utcnow()
-      ie.content = content
       db.session.commit()
       job_emails.send_email(job_emails.EXPORT_COMPLETED, user.email, url_root,
                             ie.title, ie_id)
@@ -490,7 +515,10 @@ def handle_file_download(id2):
   try:
     export_to = request.args.get("export_to")
     ie = import_export.get(id2)
-    return export_file(export_to, ie.title, ie.content.encode("utf-8"))
+    if export_to == "csv":
+      return stream_file(ie.id)
+    content = u"".join(import_export.iter_content(ie.id))
+    return export_file(export_to, ie.title, content.encode("utf-8"))
   except (Forbidden, NotFound, Unauthorized):
     raise
   except Exception as e:
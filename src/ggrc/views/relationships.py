@@ -0,0 +1,357 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Bulk relationship creation endpoint.
+
+Mapping thousands of objects through the regular relationships collection
+POST handles every relationship separately and runs automapping inside the
+flush listener per relationship. This endpoint accepts a list of
+source-destination pairs and processes them as a set:
+
+  - pairs already mapped in any direction are found with a single query;
+  - new relationships are inserted with a multi-row INSERT;
+  - automapping, ACL propagation and revision logging run once for the
+    whole set;
+  - Parent-Snapshottable pairs become snapshots created by a single
+    SnapshotGenerator pass, as in RelationshipResource.
+
+Only a short summary is returned instead of the JSON of created objects.
+"""
+
+import collections
+from datetime import datetime
+
+import flask
+import sqlalchemy as sa
+from sqlalchemy.orm.attributes import set_committed_value
+from werkzeug.exceptions import BadRequest, Forbidden
+
+from ggrc import db
+from ggrc import login
+from ggrc import utils
+from ggrc.automapper import AutomapperGenerator
+from ggrc.cache import utils as cache_utils
+from ggrc.login import login_required
+from ggrc.models import all_models
+from ggrc.models import exceptions
+from ggrc.models.cache import Cache
+from ggrc.models.hooks import acl
+from ggrc.models.hooks import relationship as relationship_hooks
+from ggrc.models.inflector import get_model
+from ggrc.models.relationship import Relatable, Stub
+from ggrc.rbac import permissions
+from ggrc.services import common
+from ggrc.services import signals
+from ggrc.snapshotter import SnapshotGenerator
+from ggrc.snapshotter import rules as snapshot_rules
+from ggrc.utils import benchmark
+from ggrc.utils.log_event import log_event
+
+
+def _parse_stub(data, field):
+  """Get Stub of a relatable object from a request item field."""
+  value = data.get(field)
+  if not isinstance(value, dict):
+    raise BadRequest(u"Missing {}".format(field))
+  model = get_model(value.get("type"))
+  if model is None or not issubclass(model, Relatable):
+    raise BadRequest(u"Invalid {} type: {}".format(field, value.get("type")))
+  try:
+    return Stub(model.__name__, int(value.get("id")))
+  except (TypeError, ValueError):
+    raise BadRequest(u"Invalid {} id: {}".format(field, value.get("id")))
+
+
+def parse_pairs(body):
+  """Get unique source-destination pairs from the request body.
+
+  Every item of the body is a dict with "source" and "destination" stubs,
+  optionally wrapped in a "relationship" key. Pairs repeated in any direction
+  are returned only once.
+  """
+  if not isinstance(body, list):
+    raise BadRequest("Request body must be a list of relationships")
+  pairs = []
+  seen = set()
+  for item in body:
+    if not isinstance(item, dict):
+      raise BadRequest("Relationship must be an object")
+    item = item.get("relationship", item)
+    source = _parse_stub(item, "source")
+    destination = _parse_stub(item, "destination")
+    if source == destination:
+      raise BadRequest(u"Can not map {} {} to itself".format(*source))
+    key = frozenset((source, destination))
+    if key not in seen:
+      seen.add(key)
+      pairs.append((source, destination))
+  return pairs
+
+
+def _load_objects(pairs):
+  """Load all mapped objects with a single query per type."""
+  ids_by_type = collections.defaultdict(set)
+  for pair in pairs:
+    for stub in pair:
+      ids_by_type[stub.type].add(stub.id)
+  objects = {}
+  for type_, ids in ids_by_type.iteritems():
+    model = get_model(type_)
+    for chunk in utils.list_chunks(list(ids)):
+      for obj in model.query.filter(model.id.in_(chunk)):
+        objects[Stub(type_, obj.id)] = obj
+  missing = [stub for pair in pairs for stub in pair if stub not in objects]
+  if missing:
+    raise BadRequest(u"Object {} {} does not exist".format(*missing[0]))
+  return objects
+
+
+def _is_snapshot_pair(source, destination):
+  """Check if the pair should be stored as a snapshot, return parent first."""
+  if source.type in snapshot_rules.Types.parents:
+    parent, child = source, destination
+  elif destination.type in snapshot_rules.Types.parents:
+    parent, child = destination, source
+  else:
+    return None
+  if child.type not in snapshot_rules.Types.all:
+    return None
+  return parent, child
+
+
+def _validate_pair(source, destination, objects):
+  """Check that pair may be mapped, raise an error otherwise."""
+  for stub, other in ((source, destination), (destination, source)):
+    obj = objects[stub]
+    if (stub.type == all_models.Snapshot.__name__ and
+            (obj.child_type, obj.child_id) == other):
+      raise exceptions.ValidationError(
+          u"Can not map Snapshot {} to its own object".format(obj.id))
+    if (stub.type == all_models.Audit.__name__ and obj.archived and
+            other.type != all_models.Issue.__name__):
+      # Issues can be mapped even if audit is archived.
+      raise Forbidden()
+
+
+def _check_permissions(pairs, objects):
+  """Check update permissions on all mapped objects and create permissions.
+
+  Mapping a person does not require a permission check on the Person object.
+  Create permission is checked on a transient relationship of every pair, as
+  in POST of the relationships collection.
+  """
+  for obj in objects.itervalues():
+    if isinstance(obj, all_models.Person):
+      continue
+    if not permissions.is_allowed_update_for(obj):
+      raise Forbidden()
+  for source, destination in pairs:
+    relationship = all_models.Relationship(
+        source_type=source.type,
+        source_id=source.id,
+        destination_type=destination.type,
+        destination_id=destination.id,
+    )
+    # Endpoints are set without backref events, so that the relationship is
+    # not cascaded into the session.
+    set_committed_value(relationship, relationship.source_attr,
+                        objects[source])
+    set_committed_value(relationship, relationship.destination_attr,
+                        objects[destination])
+    if not permissions.is_allowed_create_for(relationship):
+      raise Forbidden()
+
+
+def _get_existing(pairs):
+  """Get pairs mapped in any direction with a single query per chunk."""
+  rel = all_models.Relationship
+  keys = set()
+  for source, destination in pairs:
+    keys.add((source.type, source.id, destination.type, destination.id))
+    keys.add((destination.type, destination.id, source.type, source.id))
+  existing = set()
+  for chunk in utils.list_chunks(list(keys)):
+    query = db.session.query(
+        rel.source_type, rel.source_id,
+        rel.destination_type, rel.destination_id,
+    ).filter(
+        sa.tuple_(
+            rel.source_type, rel.source_id,
+            rel.destination_type, rel.destination_id,
+        ).in_(chunk)
+    )
+    for source_type, source_id, destination_type, destination_id in query:
+      existing.add(frozenset((Stub(source_type, source_id),
+                              Stub(destination_type, destination_id))))
+  return existing
+
+
+def _insert_relationships(pairs):
+  """Insert relationships with a multi-row INSERT and load them back.
+
+  Returns:
+    list of inserted relationships.
+  """
+  rel = all_models.Relationship
+  current_user_id = login.get_current_user_id()
+  is_external = login.is_external_app_user()
+  # created_at is compared with stored values of second precision.
+  now = datetime.utcnow().replace(microsecond=0)
+  # INSERT IGNORE skips relationships created by a simultaneous request.
+  inserter = rel.__table__.insert().prefix_with("IGNORE")
+  relationships = []
+  for chunk in utils.list_chunks(pairs):
+    result = db.session.execute(inserter.values([{
+        "modified_by_id": current_user_id,
+        "created_at": now,
+        "updated_at": now,
+        "source_id": source.id,
+        "source_type": source.type,
+        "destination_id": destination.id,
+        "destination_type": destination.type,
+        "context_id": None,
+        "is_external": is_external,
+    } for source, destination in chunk]))
+    if not result.rowcount:
+      continue
+    # Rows skipped by INSERT IGNORE were written by another request, they are
+    # told apart from inserted rows by author and time.
+    inserted = rel.query.filter(
+        sa.tuple_(
+            rel.source_type, rel.source_id,
+            rel.destination_type, rel.destination_id,
+        ).in_([(source.type, source.id, destination.type, destination.id)
+               for source, destination in chunk]),
+        rel.modified_by_id == current_user_id,
+        rel.created_at == now,
+    )
+    relationships.extend(inserted)
+  return relationships
+
+
+def _process_relationships(relationships):
+  """Run relationship hooks, automapping and ACL propagation for the set."""
+  with benchmark("Send model POSTed events"):
+    for relationship in relationships:
+      signals.Restful.model_posted.send(
+          all_models.Relationship, obj=relationship, src=None, service=None)
+    signals.Restful.collection_posted.send(
+        all_models.Relationship, objects=relationships, sources=[])
+  with benchmark("Process Audit-Issue mappings"):
+    audit_issue = {all_models.Audit.__name__, all_models.Issue.__name__}
+    relationship_hooks.process_new_audit_issue_mappings(
+        rel for rel in relationships
+        if {rel.source_type, rel.destination_type} == audit_issue
+    )
+  with benchmark("Generate automappings"):
+    automapper = AutomapperGenerator()
+    for relationship in relationships:
+      automapper.generate_automappings(relationship)
+    automapper.propagate_acl()
+  acl.add_relationships({relationship.id for relationship in relationships})
+  cache = Cache.get_cache(create=True)
+  cache.new.update((relationship, relationship.log_json())
+                   for relationship in relationships)
+
+
+def _create_snapshots(families, event):
+  """Create snapshots of all families in a single generator pass.
+
+  Returns:
+    number of created snapshots.
+  """
+  generator = SnapshotGenerator(dry_run=False)
+  for parent, children in families.iteritems():
+    generator.add_family(parent, children)
+  return len(generator.create(event=event, revisions=set()).response)
+
+
+def create_relationships(pairs):
+  """Create relationships and snapshots for the source-destination pairs.
+
+  Returns:
+    dict with numbers of created relationships, created snapshots and pairs
+    that were already mapped.
+  """
+  with benchmark("Load mapped objects"):
+    objects = _load_objects(pairs)
+    for source, destination in pairs:
+      _validate_pair(source, destination, objects)
+    _check_permissions(pairs, objects)
+
+  families = collections.defaultdict(set)
+  new_pairs = []
+  with benchmark("Find existing relationships"):
+    existing = _get_existing(pairs)
+  for source, destination in pairs:
+    family = _is_snapshot_pair(source, destination)
+    if family:
+      parent, child = family
+      families[parent].add(child)
+    elif frozenset((source, destination)) not in existing:
+      new_pairs.append((source, destination))
+
+  event = None
+  if families:
+    event = all_models.Event(
+        modified_by_id=login.get_current_user_id(),
+        action="BULK",
+        resource_id=0,
+        resource_type=None,
+    )
+    db.session.add(event)
+    db.session.flush()
+
+  with benchmark("Insert relationships"):
+    relationships = _insert_relationships(new_pairs)
+  _process_relationships(relationships)
+
+  created_snapshots = 0
+  if families:
+    with benchmark("Create snapshots"):
+      created_snapshots = _create_snapshots(families, event)
+
+  with benchmark("Get modified objects"):
+    modified_objects = common.get_modified_objects(db.session)
+  with benchmark("Log event for all objects"):
+    event = log_event(db.session, flush=False, event=event)
+  with benchmark("Update memcache before commit for bulk relationships"):
+    cache_utils.update_memcache_before_commit(
+        flask.request, modified_objects, common.CACHE_EXPIRY_COLLECTION)
+  with benchmark("Commit relationships"):
+    db.session.commit()
+  with benchmark("Update index"):
+    common.update_snapshot_index(modified_objects)
+  with benchmark("Update memcache after commit for bulk relationships"):
+    cache_utils.update_memcache_after_commit(flask.request)
+  if event is not None:
+    with benchmark("Send event job"):
+      common.send_event_job(event)
+
+  return {
+      "created": len(relationships),
+      "snapshots": created_snapshots,
+      "existing": len(pairs) - len(relationships) - created_snapshots,
+      "requested": len(pairs),
+  }
+
+
+def init_relationship_views(app):
+  """Initialize bulk relationship endpoint."""
+  # pylint: disable=unused-variable
+  @app.route("/api/relationships/bulk", methods=["POST"])
+  @login_required
+  def bulk_create_relationships():
+    """Create relationships for a list of source-destination pairs."""
+    pairs = parse_pairs(flask.request.json)
+    with benchmark("Bulk create relationships"):
+      try:
+        result = create_relationships(pairs)
+      except exceptions.ValidationError as exc:
+        db.session.rollback()
+        raise BadRequest(exc.message)
+      except Exception:
+        db.session.rollback()
+        raise
+    return app.make_response((utils.as_json(result), 200,
+                              [("Content-Type", "application/json")]))
@@ -0,0 +1,212 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Paged revision history endpoint.
+
+The change log of an object with thousands of revisions should not be loaded
+and published at once. This endpoint returns revisions of a single object,
+newest first, in pages of at most MAX_PAGE_SIZE revisions. The page after
+the current one is requested with the id of its last revision as the cursor:
+
+  GET /api/revisions/history?type=Control&id=1&cursor=<next_cursor>
+
+Everything the populate functions of a page need is loaded in bulk before
+the response starts: events and authors of revisions, roles of revision
+types, custom attribute definitions of the object and populated contents
+(see revision_content.populate), as well as people referenced by the page.
+The response is then streamed one revision at a time:
+
+  {"people": {...}, "revisions": [...], "next_cursor": <id or null>}
+
+Revisions are published without diff_with_current and meta, which can be
+requested for a single revision.
+"""
+
+import flask
+import sqlalchemy as sa
+from werkzeug.exceptions import BadRequest, Forbidden, NotFound
+
+from ggrc import db
+from ggrc import settings
+from ggrc import utils
+from ggrc.access_control import role
+from ggrc.login import login_required
+from ggrc.models import all_models
+from ggrc.models import revision_content
+from ggrc.models.inflector import get_model
+from ggrc.rbac import permissions
+from ggrc.utils import benchmark
+
+MAX_PAGE_SIZE = 1000
+
+
+def _get_int_arg(name, default=None):
+  """Get integer request argument or default if it is missing."""
+  value = flask.request.args.get(name)
+  if value is None:
+    return default
+  try:
+    return int(value)
+  except ValueError:
+    raise BadRequest(u"Invalid {}: {}".format(name, value))
+
+
+def _get_object(type_, id_):
+  """Get object of the history and check that it can be read."""
+  model = get_model(type_)
+  if model is None or id_ is None:
+    raise BadRequest("Missing or invalid type and id parameters")
+  obj = model.query.get(id_)
+  if obj is None:
+    raise NotFound()
+  if not permissions.is_allowed_read_for(obj):
+    raise Forbidden()
+  return obj
+
+
+def get_page(obj, cursor=None, limit=None, include_mappings=False):
+  """Get a page of object revisions, newest first.
+
+  Args:
+    obj: object whose revisions are returned.
+    cursor: id of the last revision of the previous page.
+    limit: maximal number of revisions in the page.
+    include_mappings: whether to include revisions of relationships of the
+        object.
+
+  Returns:
+    tuple of list of revisions and cursor of the next page, which is None for
+    the last page.
+  """
+  revision = all_models.Revision
+  conditions = [sa.and_(revision.resource_type == obj.type,
+                        revision.resource_id == obj.id)]
+  if include_mappings:
+    conditions.append(sa.and_(revision.source_type == obj.type,
+                              revision.source_id == obj.id))
+    conditions.append(sa.and_(revision.destination_type == obj.type,
+                              revision.destination_id == obj.id))
+  # MySQL can not use the resource, source and destination indexes for an
+  # OR of the conditions, so every condition is queried separately and the
+  # pages are merged.
+  revisions = {}
+  for condition in conditions:
+    query = revision.eager_query().filter(condition)
+    if cursor is not None:
+      query = query.filter(revision.id < cursor)
+    for rev in query.order_by(revision.id.desc()).limit(limit + 1):
+      revisions[rev.id] = rev
+  revisions = sorted(revisions.values(), key=lambda rev: rev.id,
+                     reverse=True)
+  next_cursor = None
+  if len(revisions) > limit:
+    revisions = revisions[:limit]
+    next_cursor = revisions[-1].id
+  return revisions, next_cursor
+
+
+def _get_person_ids(revisions):
+  """Get ids of authors and people in roles of revisions."""
+  person_ids = set()
+  for revision in revisions:
+    person_ids.add(revision.modified_by_id)
+    for acl in revision.content.get("access_control_list") or []:
+      person_ids.add(acl.get("person_id"))
+  person_ids.discard(None)
+  return person_ids
+
+
+def load_people(person_ids):
+  """Get dict of person stubs by ids."""
+  person = all_models.Person
+  people = {}
+  for chunk in utils.list_chunks(sorted(person_ids)):
+    query = db.session.query(
+        person.id,
+        person.name,
+        person.email,
+    ).filter(
+        person.id.in_(chunk)
+    )
+    for id_, name, email in query:
+      people[id_] = {
+          "id": id_,
+          "type": "Person",
+          "name": name,
+          "email": email,
+      }
+  return people
+
+
+def prefetch(revisions):
+  """Load data needed for publishing of revisions in bulk.
+
+  Returns:
+    dict of person stubs referenced by revisions.
+  """
+  with benchmark("Load roles of revision types"):
+    for resource_type in {revision.resource_type for revision in revisions}:
+      role.get_custom_roles_for(resource_type)
+  with benchmark("Populate revision contents"):
+    revision_content.populate(revisions)
+  with benchmark("Load people of revisions"):
+    return load_people(_get_person_ids(revisions))
+
+
+def publish_revision(revision):
+  """Get published dict of a revision."""
+  return {
+      "id": revision.id,
+      "type": revision.type,
+      "resource_type": revision.resource_type,
+      "resource_id": revision.resource_id,
+      "resource_slug": revision.resource_slug,
+      "source_type": revision.source_type,
+      "source_id": revision.source_id,
+      "destination_type": revision.destination_type,
+      "destination_id": revision.destination_id,
+      "action": revision.action,
+      "event_id": revision.event_id,
+      "modified_by_id": revision.modified_by_id,
+      "created_at": revision.created_at,
+      "updated_at": revision.updated_at,
+      "description": revision.description,
+      "content": revision.content,
+  }
+
+
+def stream_page(revisions, people, next_cursor):
+  """Yield JSON of the page in chunks, one revision per chunk."""
+  yield u'{{"people": {}, "revisions": ['.format(utils.as_json(people))
+  for index, revision in enumerate(revisions):
+    if index:
+      yield u","
+    yield utils.as_json(publish_revision(revision))
+  yield u'], "next_cursor": {}}}'.format(utils.as_json(next_cursor))
+
+
+def init_revision_views(app):
+  """Initialize revision history endpoint."""
+  # pylint: disable=unused-variable
+  @app.route("/api/revisions/history", methods=["GET"])
+  @login_required
+  def revision_history():
+    """Stream a page of revisions of an object."""
+    obj = _get_object(flask.request.args.get("type"), _get_int_arg("id"))
+    limit = _get_int_arg("limit", settings.REVISION_HISTORY_PAGE_SIZE)
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    include_mappings = flask.request.args.get("mappings") == "true"
+    with benchmark("Get revision history page"):
+      revisions, next_cursor = get_page(
+          obj,
+          cursor=_get_int_arg("cursor"),
+          limit=limit,
+          include_mappings=include_mappings,
+      )
+      people = prefetch(revisions)
+    content = flask.stream_with_context(
+        chunk.encode("utf-8")
+        for chunk in stream_page(revisions, people, next_cursor)
+    )
+    return app.response_class(content, 200,
+                              [("Content-Type", "application/json")])
@@ -3,10 +3,9 @@
 
 """RBAC module"""
 
-import cPickle
 import datetime
 import itertools
-import zlib
+import logging
 
 import flask
 import sqlalchemy as sa
@@ -24,6 +23,7 @@ from ggrc.models.audit import Audit
 from ggrc.models.program import Program
 from ggrc.rbac import permissions as rbac_permissions
 from ggrc.rbac.permissions_provider import DefaultUserPermissions
+from ggrc.cache import permissions_store
 from ggrc.cache import utils as cache_utils
 from ggrc.services import signals
 from ggrc.services.registry import service
@@ -42,7 +42,9 @@ blueprint = flask.Blueprint(
     static_url_path='/static/ggrc_basic_permissions',
 )
 
-PERMISSION_CACHE_TIMEOUT = 3600  # 60 minutes
+PERMISSION_CACHE_TIMEOUT = cache_utils.PERMISSION_CACHE_TIMEOUT
+
+logger = logging.getLogger(__name__)
 
 
 def get_public_config(_):
@@ -164,9 +166,9 @@ def query_memcache(key):
 
   permissions_data = cache.get(key)
   if permissions_data:
-    # permissions_cache is stored in compressed state,
-    # need to decompress it before using
-    permissions_cache = cPickle.loads(zlib.decompress(permissions_data))
+    # permissions_cache is stored in compact binary format, resource ids are
+    # decoded only when they are accessed
+    permissions_cache = permissions_store.loads(permissions_data)
     # If the key is both in permissions:list and in memcache itself
     # it is safe to return the cached permissions
     return cache, permissions_cache
@@ -400,8 +402,11 @@ def store_results_into_memcache(permissions, cache, key):
   cached_keys_set = cache.get('permissions:list') or set()
   if key in cached_keys_set:
     # Size of permissions dict can be too big for memcache (> 1 Mb),
-    # so compressed dict will be stored.
-    compressed_permissions = zlib.compress(cPickle.dumps(permissions))
+    # so resource ids are stored as packed integer arrays.
+    compressed_permissions = permissions_store.dumps(permissions)
+    if len(compressed_permissions) > permissions_store.MAX_VALUE_SIZE:
+      logger.warning("Permissions %s are too large for memcache", key)
+      return
 
     # We only add the permissions to the cache if the
     # key still exists in the permissions:list after
@@ -13,7 +13,7 @@ from flask import Blueprint
 from sqlalchemy import inspect, orm
 
 from ggrc import db
-from ggrc.login import get_current_user
+from ggrc.login import get_current_user, get_current_user_id
 from ggrc.models import all_models
 from ggrc.models.relationship import Relationship
 from ggrc.rbac.permissions import is_allowed_update
@@ -21,6 +21,7 @@ from ggrc.access_control import role
 from ggrc.services import signals
 from ggrc.utils import benchmark
 from ggrc.utils.log_event import log_event
+from ggrc_workflows import cycle_builder
 from ggrc_workflows import models, notification
 from ggrc_workflows import services
 from ggrc_workflows.models import relationship_helper
@@ -210,7 +211,21 @@ def _create_cycle_task(task_group_task, cycle, cycle_task_group, current_user):
   return cycle_task_group_object_task
 
 
-def create_old_style_cycle(cycle, task_group, cycle_task_group, current_user):
+def _map_cycle_task(cycle_task, task_group_object, relationships):
+  """Map a cycle task to the object of a task group object.
+
+  If relationships list is given, the mapping is collected as a tuple for
+  cycle_builder.insert_relationships instead of creating a Relationship.
+  """
+  if relationships is None:
+    Relationship(source=cycle_task, destination=task_group_object.object)
+  else:
+    relationships.append((cycle_task, task_group_object.object_type,
+                          task_group_object.object_id))
+
+
+def create_old_style_cycle(cycle, task_group, cycle_task_group, current_user,
+                           relationships=None):
   """ This function preserves the old style of creating cycles, so each object
   gets its own task assigned to it.
   """
@@ -221,16 +236,21 @@ def create_old_style_cycle(cycle, task_group, cycle_task_group, current_user):
           current_user)
 
   for task_group_object in task_group.task_group_objects:
-    object_ = task_group_object.object
     for task_group_task in task_group.task_group_tasks:
       cycle_task_group_object_task = _create_cycle_task(
           task_group_task, cycle, cycle_task_group,
           current_user)
-      Relationship(source=cycle_task_group_object_task, destination=object_)
+      _map_cycle_task(cycle_task_group_object_task, task_group_object,
+                      relationships)
+
 
+def build_cycle(workflow, cycle=None, current_user=None, relationships=None):
+  """Build a cycle with it's child objects.
 
-def build_cycle(workflow, cycle=None, current_user=None):
-  """Build a cycle with it's child objects"""
+  If relationships list is given, mappings of cycle tasks to task group
+  objects are appended to it as (task, object type, object id) tuples and
+  must be inserted with cycle_builder.insert_relationships after flush.
+  """
   build_failed = False
 
   if not workflow.tasks:
@@ -285,16 +305,16 @@ def build_cycle(workflow, cycle=None, current_user=None):
     # preserve the old cycle creation for old workflows, so each object
     # gets its own cycle task
     if workflow.is_old_workflow:
-      create_old_style_cycle(cycle, task_group, cycle_task_group, current_user)
+      create_old_style_cycle(cycle, task_group, cycle_task_group, current_user,
+                             relationships)
     else:
       for task_group_task in task_group.task_group_tasks:
         cycle_task_group_object_task = _create_cycle_task(
             task_group_task, cycle, cycle_task_group, current_user)
 
         for task_group_object in task_group.task_group_objects:
-          object_ = task_group_object.object
-          Relationship(source=cycle_task_group_object_task,
-                       destination=object_)
+          _map_cycle_task(cycle_task_group_object_task, task_group_object,
+                          relationships)
 
   update_cycle_dates(cycle)
   workflow.repeat_multiplier += 1
@@ -742,29 +762,69 @@ def init_extra_views(app):
   views.init_extra_views(app)
 
 
+def start_workflow_cycles(workflow_id, event_id):
+  """Start all due cycles of a recurring workflow and commit them.
+
+  Cycle task relationships, their revisions and task notifications are
+  inserted in bulk. All revisions are logged under the event with event_id.
+  """
+  workflow = models.Workflow.query.get(workflow_id)
+  # Revisions of the event are not loaded, new ones are only appended.
+  event = all_models.Event.query.options(
+      orm.noload("revisions"),
+  ).populate_existing().filter_by(id=event_id).one()
+  user_id = get_current_user_id()
+  # Follow same steps as in model_posted.connect_via(models.Cycle)
+  while workflow.next_cycle_start_date <= date.today():
+    relationships = []
+    cycle = build_cycle(workflow, relationships=relationships)
+    if not cycle:
+      break
+    db.session.add(cycle)
+    db.session.flush()
+    cycle_builder.insert_relationships(relationships, event, user_id)
+    notification.handle_cycle_created(cycle, False, bulk=True)
+    notification.handle_workflow_modify(None, workflow)
+  # 'Cycles' for each 'Workflow' are committed separately to free memory on
+  # each iteration. Single commit exeeded maximum memory limit on AppEngine
+  # instance.
+  log_event(db.session, event=event)
+  db.session.commit()
+
+
 def start_recurring_cycles():
-  """Start recurring cycles by cron job."""
+  """Start recurring cycles by cron job.
+
+  Workflows are processed in parallel if WORKFLOW_CYCLE_WORKERS setting
+  allows it. Revisions of all workflows are logged under a single event.
+  """
   with benchmark("contributed cron job start_recurring_cycles"):
     today = date.today()
-    workflows = models.Workflow.query.filter(
+    workflow_ids = [workflow_id for workflow_id, in db.session.query(
+        models.Workflow.id
+    ).filter(
         models.Workflow.next_cycle_start_date <= today,
         models.Workflow.recurrences == True  # noqa
+    ).order_by(
+        models.Workflow.id
+    )]
+    if not workflow_ids:
+      return
+    event = all_models.Event(
+        modified_by_id=get_current_user_id(),
+        action="BULK",
+        resource_id=0,
+        resource_type=None,
     )
-    event = None
-    for workflow in workflows:
-      # Follow same steps as in model_posted.connect_via(models.Cycle)
-      while workflow.next_cycle_start_date <= date.today():
-        cycle = build_cycle(workflow)
-        if not cycle:
-          break
-        db.session.add(cycle)
-        notification.handle_cycle_created(cycle, False)
-        notification.handle_workflow_modify(None, workflow)
-      # db.session.commit was moved into cycle intentionally.
-      # 'Cycles' for each 'Workflow' should be committed separately
-      # to free memory on each iteration. Single commit exeeded
-      # maximum memory limit on AppEngine instance.
-      event = log_event(db.session, event=event)
+    db.session.add(event)
+    db.session.commit()
+    event_id = event.id
+    db.session.expunge(event)
+    cycle_builder.process_workflows(start_workflow_cycles, workflow_ids,
+                                    event_id)
+    revisions = all_models.Revision.query.filter_by(event_id=event_id)
+    if not db.session.query(revisions.exists()).scalar():
+      all_models.Event.query.filter_by(id=event_id).delete()
       db.session.commit()
 
 
@@ -0,0 +1,147 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Bulk creation of cycles of recurring workflows.
+
+Every cycle task is mapped to every object of its task group, so the number
+of relationships of a cycle is the product of the numbers of tasks and
+objects. Instead of a Relationship object per mapping, build_cycle can collect
+mappings as (task, object type, object id) tuples. After the cycle is flushed
+they are inserted with multi-row INSERT IGNORE statements; revisions of the
+inserted relationships are written in the same chunks and relationship ids
+are queued for ACL propagation, so no relationship stays in the session.
+
+Workflows are independent of each other, so the nightly cron job can start
+their cycles in a pool of WORKFLOW_CYCLE_WORKERS threads, each with its own
+app context and session.
+"""
+
+import logging
+from datetime import datetime
+from multiprocessing.pool import ThreadPool
+
+import sqlalchemy as sa
+
+from ggrc import db
+from ggrc import settings
+from ggrc import utils
+from ggrc.models import all_models
+from ggrc.models.hooks import acl
+from ggrc.utils import benchmark
+
+logger = logging.getLogger(__name__)
+
+
+def _get_relationship_dict(key, user_id, now):
+  """Get Relationship table row for a source-destination key."""
+  source_type, source_id, destination_type, destination_id = key
+  return {
+      "modified_by_id": user_id,
+      "created_at": now,
+      "updated_at": now,
+      "source_type": source_type,
+      "source_id": source_id,
+      "destination_type": destination_type,
+      "destination_id": destination_id,
+      "context_id": None,
+      "is_external": False,
+  }
+
+
+def _get_revision_dict(relationship, event_id, user_id, now):
+  """Get Revision table row of a newly created relationship."""
+  return {
+      "resource_id": relationship.id,
+      "resource_type": relationship.type,
+      "event_id": event_id,
+      "action": "created",
+      "content": relationship.log_json(),
+      "modified_by_id": user_id,
+      "source_type": relationship.source_type,
+      "source_id": relationship.source_id,
+      "destination_type": relationship.destination_type,
+      "destination_id": relationship.destination_id,
+      "created_at": now,
+      "updated_at": now,
+  }
+
+
+def insert_relationships(mappings, event, user_id):
+  """Insert relationships of flushed cycle tasks in chunks.
+
+  Args:
+    mappings: list of (task, object type, object id) tuples.
+    event: flushed Event instance the revisions belong to.
+    user_id: id of the user creating the cycle.
+
+  Returns:
+    number of inserted relationships.
+  """
+  rel = all_models.Relationship
+  keys = sorted({(task.type, task.id, object_type, object_id)
+                 for task, object_type, object_id in mappings})
+  now = datetime.utcnow()
+  inserter = rel.__table__.insert().prefix_with("IGNORE")
+  count = 0
+  with benchmark("Insert cycle task relationships"):
+    for chunk in utils.list_chunks(keys):
+      db.session.execute(inserter.values([
+          _get_relationship_dict(key, user_id, now) for key in chunk
+      ]))
+      relationships = rel.query.filter(
+          sa.tuple_(
+              rel.source_type, rel.source_id,
+              rel.destination_type, rel.destination_id,
+          ).in_(chunk)
+      ).all()
+      if not relationships:
+        continue
+      db.session.execute(
+          all_models.Revision.__table__.insert(),
+          [_get_revision_dict(relationship, event.id, user_id, now)
+           for relationship in relationships],
+      )
+      acl.add_relationships({relationship.id
+                             for relationship in relationships})
+      count += len(relationships)
+      for relationship in relationships:
+        db.session.expunge(relationship)
+  return count
+
+
+def _run_in_app_context(args):
+  """Worker thread entry point: call handler in a new app context."""
+  handler, workflow_id, event_id = args
+  from ggrc.app import app
+  with app.app_context():
+    try:
+      handler(workflow_id, event_id)
+    except Exception:
+      db.session.rollback()
+      raise
+    finally:
+      db.session.remove()
+
+
+def process_workflows(handler, workflow_ids, event_id):
+  """Call handler for every workflow id and the id of a committed event.
+
+  Workflows are processed in a pool of WORKFLOW_CYCLE_WORKERS threads if the
+  setting allows it. Handlers must commit their own changes.
+  """
+  workers = min(getattr(settings, "WORKFLOW_CYCLE_WORKERS", 1),
+                len(workflow_ids))
+  if workers < 2:
+    for workflow_id in workflow_ids:
+      handler(workflow_id, event_id)
+    return
+  logger.info("Processing %s workflows in %s threads",
+              len(workflow_ids), workers)
+  pool = ThreadPool(workers)
+  try:
+    pool.map(_run_in_app_context,
+             [(handler, workflow_id, event_id)
+              for workflow_id in workflow_ids])
+  finally:
+    pool.close()
+    pool.join()
@@ -177,7 +177,12 @@ def handle_cycle_modify(obj):
     ).delete(synchronize_session="fetch")
 
 
-def handle_cycle_created(obj, manually):
+def handle_cycle_created(obj, manually, bulk=False):
+  """Create notifications for a new cycle and its tasks.
+
+  If bulk is set, task notifications are inserted with multi-row INSERTs
+  instead of being added to the session, so all tasks must be flushed.
+  """
   today = datetime.date.today()
   if manually:
     create_notification = "manual_cycle_created"
@@ -202,11 +207,15 @@ def handle_cycle_created(obj, manually):
     object_ids = exists_notifications[notification_type.id]
     notify_tasks = [t for t in tasks if not (t.id in object_ids or t.is_done)]
     if create_notification == notification_type.name:
-      pusher.create_notifications_for_objects(notification_type,
-                                              today,
-                                              *notify_tasks)
+      tasks_by_date = {today: notify_tasks}
     else:
+      tasks_by_date = collections.defaultdict(list)
       for task in notify_tasks:
+        tasks_by_date[task.end_date].append(task)
+    for send_at, date_tasks in tasks_by_date.iteritems():
+      if bulk:
+        pusher.insert_notifications(notification_type, send_at, date_tasks)
+      else:
         pusher.create_notifications_for_objects(notification_type,
-                                                task.end_date,
-                                                task)
+                                                send_at,
+                                                *date_tasks)
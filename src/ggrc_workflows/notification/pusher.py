@@ -9,6 +9,7 @@ from sqlalchemy import tuple_
 from sqlalchemy.sql.expression import true
 
 from ggrc import db
+from ggrc import utils
 from ggrc.models.notification import Notification
 from ggrc.models.notification import NotificationType
 
@@ -120,3 +121,38 @@ def create_notifications_for_objects(notification_type, send_at, *objs):
     return
   for obj in objs:
     push(obj, **notification_context)
+
+
+def insert_notifications(notification_type, send_at, objs):
+  """Create notifications for objects with multi-row INSERTs.
+
+  Unlike create_notifications_for_objects, notifications are not added to the
+  session, so all objects must already be flushed.
+
+  Args:
+      notification_type: instance of notification type.
+      send_at: date of the notified event.
+      objs: list of notified instances.
+  """
+  if not objs:
+    return
+  notification_context = get_notification_context(notification_type, send_at)
+  today = datetime.datetime.combine(datetime.date.today(),
+                                    datetime.datetime.min.time())
+  send_on = notification_context["send_on"]
+  if send_on < today:
+    return
+  now = datetime.datetime.utcnow()
+  rows = [{
+      "object_id": obj.id,
+      "object_type": obj.type,
+      "notification_type_id": notification_type.id,
+      "send_on": send_on,
+      "repeating": notification_context["repeating"],
+      "custom_message": u"",
+      "force_notifications": False,
+      "created_at": now,
+      "updated_at": now,
+  } for obj in objs]
+  for chunk in utils.list_chunks(rows):
+    db.session.execute(Notification.__table__.insert().values(chunk))
@@ -20,6 +20,7 @@ from google.appengine.ext import testbed
 
 from ggrc import db
 from ggrc.app import app
+from ggrc.cache import bootstrap_cache
 from ggrc import settings
 from ggrc.converters.import_helper import read_csv_file
 from ggrc.views.converters import check_import_file
@@ -167,6 +168,7 @@ class TestCase(BaseTestCase, object):
     if hasattr(db.session, "reindex_set"):
       delattr(db.session, "reindex_set")
     db.session.commit()
+    bootstrap_cache.invalidate()
 
   def setUp(self):
     """Setup method."""
@@ -4,7 +4,6 @@
 """Test automappings"""
 
 import itertools
-from contextlib import contextmanager
 from sqlalchemy.orm import load_only
 
 import ggrc
@@ -23,15 +22,6 @@ def make_name(msg):
   return random_str(prefix=msg)
 
 
-@contextmanager
-def automapping_count_limit(new_limit):
-  """Automapping count limit"""
-  original_limit = ggrc.automapper.AutomapperGenerator.COUNT_LIMIT
-  ggrc.automapper.AutomapperGenerator.COUNT_LIMIT = new_limit
-  yield
-  ggrc.automapper.AutomapperGenerator.COUNT_LIMIT = original_limit
-
-
 class TestAutomappings(TestCase):
   """Test automappings"""
 
@@ -173,22 +163,22 @@ class TestAutomappings(TestCase):
         relevant=[regulation, requirement, objective]
     )
 
-  def test_automapping_limit(self):
-    """Test mapping limit"""
-    with automapping_count_limit(-1):
-      regulation = self.create_object(models.Regulation, {
-          'title': make_name('Test Regulation')
-      })
-      requirement = self.create_object(models.Requirement, {
-          'title': make_name('Test requirement'),
-      })
-      objective = self.create_object(models.Objective, {
-          'title': make_name('Objective')
-      })
-      self.assert_mapping_implication(
-          to_create=[(regulation, requirement), (objective, requirement)],
-          implied=[],
-      )
+  def test_automapping_set(self):
+    """Test all automappings of a mapped directive are created"""
+    regulation = self.create_object(models.Regulation, {
+        'title': make_name('Test Regulation')
+    })
+    requirements = [self.create_object(models.Requirement, {
+        'title': make_name('Test requirement'),
+    }) for _ in range(5)]
+    program = self.create_object(models.Program, {
+        'title': make_name('Program')
+    })
+    self.assert_mapping_implication(
+        to_create=[(regulation, requirement) for requirement in requirements] +
+        [(program, regulation)],
+        implied=[(program, requirement) for requirement in requirements],
+    )
 
   def test_mapping_to_objective(self):
     """Test mapping to objective"""
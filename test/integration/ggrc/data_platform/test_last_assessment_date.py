@@ -29,7 +29,9 @@ import datetime
 import itertools
 
 import freezegun
+from mock import patch
 
+from ggrc import db
 from ggrc import models
 from ggrc.data_platform import computed_attributes
 from ggrc.converters import errors
@@ -302,3 +304,81 @@ class TestLastAssessmentDate(TestCase):
         models.all_models.Attributes.query.count(),
         2,  # One entry for control and one for the control snapshot.
     )
+
+  def _get_lad(self, title):
+    return models.Control.query.filter_by(
+        title=title
+    ).one().last_assessment_date
+
+  def test_later_finished_assessment(self):
+    """Stored dates are updated from later finished assessments only."""
+    first_date = datetime.datetime(2017, 2, 20, 13, 40, 0)
+    second_date = datetime.datetime(2017, 3, 30, 14, 55, 0)
+    with freezegun.freeze_time(first_date):
+      asmt = models.Assessment.query.filter_by(title="Assessment_0").first()
+      self.api.put(asmt, {"status": "Completed"})
+    control_1 = ("Control", models.Control.query.filter_by(
+        title="Control_1").one().id)
+
+    with patch.object(computed_attributes, "compute_values",
+                      wraps=computed_attributes.compute_values) as compute:
+      with freezegun.freeze_time(second_date):
+        asmt = models.Assessment.query.filter_by(title="Assessment_1").first()
+        self.api.put(asmt, {"status": "Completed"})
+
+    for affected_objects, _ in (call[0] for call in compute.call_args_list):
+      for objects in affected_objects.itervalues():
+        self.assertNotIn(control_1, objects)
+    self.assertEqual(self._get_lad("Control_1"), second_date)
+    self.assertEqual(self._get_lad("Control_2"), second_date)
+
+  def test_reopened_assessment(self):
+    """Dates are recomputed when the source assessment is reopened."""
+    first_date = datetime.datetime(2017, 2, 20, 13, 40, 0)
+    second_date = datetime.datetime(2017, 3, 30, 14, 55, 0)
+    with freezegun.freeze_time(first_date):
+      asmt = models.Assessment.query.filter_by(title="Assessment_0").first()
+      self.api.put(asmt, {"status": "Completed"})
+    with freezegun.freeze_time(second_date):
+      asmt = models.Assessment.query.filter_by(title="Assessment_1").first()
+      self.api.put(asmt, {"status": "Completed"})
+
+    asmt = models.Assessment.query.filter_by(title="Assessment_1").first()
+    self.api.put(asmt, {"status": "In Progress"})
+
+    self.assertEqual(self._get_lad("Control_1"), first_date)
+
+  def test_unchanged_values(self):
+    """Values equal to the stored ones are not written again."""
+    with freezegun.freeze_time(datetime.datetime(2017, 2, 20, 13, 40, 0)):
+      asmt = models.Assessment.query.filter_by(title="Assessment_0").first()
+      asmt_id = asmt.id
+      self.api.put(asmt, {"status": "Completed"})
+    revision = models.Revision.query.filter_by(
+        resource_type="Assessment",
+        resource_id=asmt_id,
+    ).order_by(models.Revision.id.desc()).first()
+
+    with patch.object(computed_attributes, "store_data") as store_data:
+      computed_attributes.compute_attributes([revision.id])
+
+    store_data.assert_called_once_with([], [])
+
+  def test_full_reindex(self):
+    """Full reindex recomputes stored values instead of merging into them."""
+    finish_date = datetime.datetime(2017, 2, 20, 13, 40, 0)
+    with freezegun.freeze_time(finish_date):
+      asmt = models.Assessment.query.filter_by(title="Assessment_0").first()
+      self.api.put(asmt, {"status": "Completed"})
+    models.all_models.Attributes.query.update(
+        {
+            "source_id": 0,
+            "value_datetime": datetime.datetime(2018, 1, 1, 0, 0, 0),
+        },
+        synchronize_session=False,
+    )
+    db.session.commit()
+
+    computed_attributes.compute_attributes("all_latest")
+
+    self.assertEqual(self._get_lad("Control_1"), finish_date)
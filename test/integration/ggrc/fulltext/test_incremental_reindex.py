@@ -0,0 +1,123 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Test for incremental reindex procedure."""
+
+import freezegun
+
+from ggrc import db
+from ggrc import fulltext
+from ggrc.fulltext import incremental
+from ggrc.models import all_models
+
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class TestIncrementalReindex(TestCase):
+  """Tests for incremental reindex procedure."""
+
+  def setUp(self):
+    super(TestIncrementalReindex, self).setUp()
+    self.client.get("/login")
+    self.record_type = fulltext.get_indexer().record_type
+
+  def _clear_records(self):
+    """Remove all fulltext records."""
+    self.record_type.query.delete()
+    db.session.commit()
+
+  def _indexed_keys(self, type_):
+    """Get ids of objects of the given type present in fulltext index."""
+    return {
+        key for key, in db.session.query(self.record_type.key).filter(
+            self.record_type.type == type_
+        ).distinct()
+    }
+
+  def _last_task(self):
+    return all_models.BackgroundTask.query.filter(
+        all_models.BackgroundTask.name.like(incremental.TASK_NAME + "%")
+    ).order_by(all_models.BackgroundTask.id.desc()).first()
+
+  def test_first_run_reindexes_all(self):
+    """Test incremental reindex without previous runs indexes everything."""
+    with factories.single_commit():
+      control_ids = {factories.ControlFactory().id for _ in range(3)}
+    self._clear_records()
+
+    self.client.post("/admin/incremental_reindex")
+
+    self.assertEqual(self._indexed_keys("Control"), control_ids)
+    self.assertEqual(self._last_task().status, "Success")
+
+  def test_reindex_changed_only(self):
+    """Test incremental reindex handles only rows changed since last run."""
+    with freezegun.freeze_time("2018-01-01 12:00:00"):
+      with factories.single_commit():
+        factories.ControlFactory()
+      self.client.post("/admin/incremental_reindex")
+
+    with freezegun.freeze_time("2018-01-02 12:00:00"):
+      with factories.single_commit():
+        new_control_id = factories.ControlFactory().id
+      self._clear_records()
+      self.client.post("/admin/incremental_reindex")
+
+    self.assertEqual(self._indexed_keys("Control"), {new_control_id})
+
+  def test_reindex_same_second(self):
+    """Test rows stamped in the second of the previous run are handled."""
+    with freezegun.freeze_time("2018-01-01 12:00:00"):
+      with factories.single_commit():
+        factories.ControlFactory()
+      self.client.post("/admin/incremental_reindex")
+      with factories.single_commit():
+        new_control_id = factories.ControlFactory().id
+      self._clear_records()
+      self.client.post("/admin/incremental_reindex")
+
+    self.assertIn(new_control_id, self._indexed_keys("Control"))
+
+  def test_reindex_same_second_update(self):
+    """Test lower id row updated in the second of the previous run."""
+    with freezegun.freeze_time("2018-01-01 12:00:00"):
+      with factories.single_commit():
+        control_ids = sorted(factories.ControlFactory().id for _ in range(2))
+      self.client.post("/admin/incremental_reindex")
+      control = all_models.Control.query.get(control_ids[0])
+      control.title = "changed title"
+      db.session.commit()
+      self._clear_records()
+      self.client.post("/admin/incremental_reindex")
+
+    self.assertIn(control_ids[0], self._indexed_keys("Control"))
+
+  def test_resume_retry(self):
+    """Test retried task resumes from its own checkpoint."""
+    self.client.post("/admin/incremental_reindex")
+    task = self._last_task()
+    state = dict(task.parameters, done=["Control"])
+    task.parameters = state
+
+    self.assertEqual(incremental.init_state(task, []), state)
+
+  def test_resume_after_failure(self):
+    """Test incremental reindex resumes from the last checkpoint."""
+    with factories.single_commit():
+      control_ids = sorted(factories.ControlFactory().id for _ in range(3))
+    self.client.post("/admin/incremental_reindex")
+
+    failed_task = self._last_task()
+    state = dict(failed_task.parameters)
+    state["done"] = [name for name in state["done"] if name != "Control"]
+    state["last_id"] = {"Control": control_ids[0]}
+    failed_task.parameters = state
+    failed_task.status = "Failure"
+    db.session.commit()
+    self._clear_records()
+
+    self.client.post("/admin/incremental_reindex")
+
+    self.assertEqual(self._indexed_keys("Control"), set(control_ids[1:]))
+    self.assertEqual(self._indexed_keys("Person"), set())
@@ -0,0 +1,74 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Integration tests for asynchronous full text indexing queue."""
+
+import datetime
+
+from mock import patch
+
+from ggrc import db
+from ggrc.fulltext import mysql
+from ggrc.fulltext import reindex_queue
+from ggrc.models import all_models
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class TestReindexQueue(TestCase):
+  """Tests for queued reindexing of changed objects."""
+
+  def setUp(self):
+    super(TestReindexQueue, self).setUp()
+    with factories.single_commit():
+      control = factories.ControlFactory(title=u"old title")
+    self.control_id = control.id
+
+  def _get_title_records(self):
+    record = mysql.MysqlRecordProperty
+    return [content for content, in db.session.query(record.content).filter(
+        record.type == "Control",
+        record.key == self.control_id,
+        record.property == "title",
+    )]
+
+  @patch("ggrc.settings.FULLTEXT_ASYNC_INDEXING", True, create=True)
+  def test_queued_reindex(self):
+    """Changed objects are reindexed when the queue is drained."""
+    for title in (u"new title", u"newer title"):
+      control = all_models.Control.query.get(self.control_id)
+      control.title = title
+      db.session.commit()
+
+    self.assertEqual(self._get_title_records(), [u"old title"])
+    self.assertEqual(reindex_queue.ReindexQueueItem.query.filter_by(
+        type="Control", key=self.control_id,
+    ).count(), 2)
+    self.assertGreaterEqual(reindex_queue.get_index_lag(), 0)
+
+    self.assertGreaterEqual(reindex_queue.drain(), 2)
+
+    self.assertEqual(self._get_title_records(), [u"newer title"])
+    self.assertEqual(reindex_queue.ReindexQueueItem.query.count(), 0)
+    self.assertEqual(reindex_queue.get_index_lag(), 0)
+
+  def test_sync_reindex(self):
+    """Changed objects are reindexed before commit by default."""
+    control = all_models.Control.query.get(self.control_id)
+    control.title = u"new title"
+    db.session.commit()
+
+    self.assertEqual(self._get_title_records(), [u"new title"])
+    self.assertEqual(reindex_queue.ReindexQueueItem.query.count(), 0)
+
+  def test_index_lag(self):
+    """Index lag is the age of the oldest queued row."""
+    now = datetime.datetime.utcnow()
+    db.session.execute(reindex_queue.ReindexQueueItem.__table__.insert(), [
+        {"type": "Control", "key": self.control_id,
+         "created_at": now - datetime.timedelta(hours=1)},
+        {"type": "Control", "key": self.control_id, "created_at": now},
+    ])
+    db.session.commit()
+
+    self.assertGreaterEqual(reindex_queue.get_index_lag(), 3600)
@@ -0,0 +1,72 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Integration tests for trigram posting lists of full text records."""
+
+import ddt
+from mock import patch
+
+from ggrc import db
+from ggrc.fulltext import get_indexer
+from ggrc.fulltext import trigrams
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+@ddt.ddt
+@patch("ggrc.settings.FULLTEXT_TRIGRAM_SEARCH", True, create=True)
+class TestTrigrams(TestCase):
+  """Tests for trigram candidates of full text searches."""
+
+  def setUp(self):
+    super(TestTrigrams, self).setUp()
+    with factories.single_commit():
+      self.first = factories.ControlFactory(title=u"Cafe latte control")
+      self.second = factories.ControlFactory(title=u"Espresso control")
+    self.first_id = self.first.id
+    self.second_id = self.second.id
+
+  def _search(self, terms):
+    return {(type_, key) for key, type_ in get_indexer().search(
+        terms, types=["Control"])}
+
+  @ddt.data(
+      (u"LATTE con", {"first"}),
+      (u"control", {"first", "second"}),
+      (u"press", {"second"}),
+      (u"mocha", set()),
+  )
+  @ddt.unpack
+  def test_search(self, terms, expected):
+    """Search by trigram candidates finds the same objects as LIKE."""
+    ids = {"first": self.first_id, "second": self.second_id}
+    self.assertEqual(self._search(terms),
+                     {("Control", ids[name]) for name in expected})
+
+  def test_get_candidates(self):
+    """Posting lists of all trigrams of a term are intersected."""
+    candidates = trigrams.get_candidates_query(u"spres", "Control")
+    self.assertEqual([key for key, in candidates], [self.second_id])
+    self.assertIsNone(trigrams.get_candidates_query(u"co"))
+    self.assertIsNone(trigrams.get_candidates_query(u"con%"))
+
+  def test_rebuild(self):
+    """Posting lists are rebuilt from existing records."""
+    trigrams.delete_for()
+    db.session.commit()
+    self.assertEqual(self._search(u"press"), set())
+
+    trigrams.rebuild()
+
+    self.assertEqual(self._search(u"press"), {("Control", self.second_id)})
+
+  def test_delete(self):
+    """Posting lists of deleted objects are removed."""
+    db.session.delete(self.second)
+    db.session.commit()
+    self.assertEqual(
+        trigrams.RecordTrigram.query.filter_by(
+            type="Control", key=self.second_id,
+        ).count(),
+        0,
+    )
@@ -7,6 +7,8 @@
 # pylint: disable=invalid-name
 
 
+import datetime
+
 import ddt
 import mock
 import flask
@@ -76,6 +78,33 @@ class TestIssueIntegration(ggrc.TestCase):
     issue = all_models.Issue.query.get(iti.issue_tracked_obj.id)
     self.assertEquals(issue.status, issue_status)
 
+  def test_sync_deprecated_end_date(self):
+    """Test setting end date of issue moved to Deprecated status."""
+    iti = factories.IssueTrackerIssueFactory(
+        enabled=True,
+        issue_id="1",
+        issue_tracked_obj=factories.IssueFactory(status="Draft",
+                                                 end_date=None)
+    )
+    batches = [
+        {
+            "1": {
+                "status": "obsolete",
+                "type": "BUG",
+                "priority": "P2",
+                "severity": "S2",
+            }
+        }
+    ]
+
+    with mock.patch.object(sync_utils, "iter_issue_batches",
+                           return_value=batches):
+      issue_sync_job.sync_issue_attributes()
+
+    issue = all_models.Issue.query.get(iti.issue_tracked_obj.id)
+    self.assertEquals(issue.status, "Deprecated")
+    self.assertEquals(issue.end_date, datetime.date.today())
+
   def initialize_test_issuetracker_info(self):
     """Create Issue with admin and primary contact"""
     iti = factories.IssueTrackerIssueFactory(
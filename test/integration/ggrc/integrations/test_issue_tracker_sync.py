@@ -0,0 +1,70 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Integration tests for concurrent Issue Tracker synchronization."""
+
+import mock
+from google.appengine.api import apiproxy_stub_map
+from google.appengine.ext import testbed
+
+from ggrc.integrations import issues
+from ggrc.integrations.synchronization_jobs import assessment_sync_job
+from ggrc.integrations.synchronization_jobs import issue_sync_job
+from ggrc.integrations.synchronization_jobs import sync_utils
+from ggrc.models import all_models
+from ggrc.utils import issue_tracker_mock
+from integration import ggrc
+from integration.ggrc.models import factories
+
+
+@mock.patch("ggrc.settings.ISSUE_TRACKER_SYNC_WORKERS", 2, create=True)
+@mock.patch.object(sync_utils, "_BATCH_SIZE", 2)
+@mock.patch.object(issues.Client, "ENDPOINT", "https://issuetracker.test")
+class TestIssueTrackerSync(ggrc.TestCase):
+  """Tests for sync jobs running against Issue Tracker mock."""
+
+  def setUp(self):
+    super(TestIssueTrackerSync, self).setUp()
+    self.urlfetch_testbed = testbed.Testbed()
+    self.urlfetch_testbed.activate()
+    self.fetch_mock = issue_tracker_mock.FetchServiceMock()
+    apiproxy_stub_map.apiproxy.RegisterStub("urlfetch", self.fetch_mock)
+
+  def tearDown(self):
+    self.urlfetch_testbed.deactivate()
+    super(TestIssueTrackerSync, self).tearDown()
+
+  def _count_requests(self):
+    searches = [request for request in self.fetch_mock.requests
+                if request.url().endswith("/search")]
+    return len(searches), len(self.fetch_mock.requests) - len(searches)
+
+  def test_sync_assessment_statuses(self):
+    """Differing tickets of all batches are updated."""
+    for _ in range(3):
+      factories.IssueTrackerIssueFactory(
+          enabled=True,
+          issue_tracked_obj=factories.AssessmentFactory(status="Completed"),
+      )
+
+    assessment_sync_job.sync_assessment_statuses()
+
+    self.assertEqual(self._count_requests(), (2, 3))
+
+  def test_sync_issue_statuses(self):
+    """Statuses of issue objects of all batches are updated."""
+    issue_ids = []
+    for _ in range(3):
+      iti = factories.IssueTrackerIssueFactory(
+          enabled=True,
+          issue_tracked_obj=factories.IssueFactory(status="Active"),
+      )
+      issue_ids.append(iti.issue_tracked_obj.id)
+
+    issue_sync_job.sync_issue_attributes()
+
+    self.assertEqual(self._count_requests(), (2, 0))
+    statuses = {status for status, in all_models.Issue.query.filter(
+        all_models.Issue.id.in_(issue_ids)
+    ).values(all_models.Issue.status)}
+    self.assertEqual(statuses, {"Draft"})
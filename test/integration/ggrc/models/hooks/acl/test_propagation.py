@@ -362,6 +362,58 @@ class TestPropagation(BaseTestPropagation):
     propagation.propagate_all()
     self.assertEqual(all_models.AccessControlList.query.count(), 6)
 
+  def _setup_program_editor(self):
+    """Create a program editor propagated to an audit of the program."""
+    with factories.single_commit():
+      person = factories.PersonFactory()
+      audit = factories.AuditFactory()
+      relationship = factories.RelationshipFactory(
+          source=audit,
+          destination=audit.program,
+      )
+      acl_id = factories.AccessControlListFactory(
+          ac_role=self.roles["Program"]["Program Editors"],
+          object=audit.program,
+          person=person,
+      ).id
+    propagation._propagate([acl_id])
+    return relationship.id
+
+  @staticmethod
+  def _propagated_acl_ids():
+    return {
+        acl_id for acl_id, in db.session.query(
+            all_models.AccessControlList.id
+        ).filter(
+            all_models.AccessControlList.parent_id.isnot(None)
+        )
+    }
+
+  def test_propagate_all_keeps_entries(self):
+    """Test propagate_all does not rewrite valid propagated entries."""
+    self._setup_program_editor()
+    propagated_ids = self._propagated_acl_ids()
+    self.assertEqual(len(propagated_ids), 2)
+
+    propagation.propagate_all()
+
+    self.assertEqual(self._propagated_acl_ids(), propagated_ids)
+
+  def test_propagate_all_removes_stale(self):
+    """Test propagate_all removes entries for missing relationships."""
+    relationship_id = self._setup_program_editor()
+    self.assertEqual(len(self._propagated_acl_ids()), 2)
+    db.session.execute(
+        all_models.Relationship.__table__.delete().where(
+            all_models.Relationship.__table__.c.id == relationship_id
+        )
+    )
+    db.session.commit()
+
+    propagation.propagate_all()
+
+    self.assertEqual(self._propagated_acl_ids(), set())
+
   def test_complex_propagation_count(self):
     """Test multiple object ACL propagation.
 
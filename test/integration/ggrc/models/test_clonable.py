@@ -50,7 +50,7 @@ class TestClonable(SnapshotterBaseTestCase):
             }
         })
 
-  def clone_asmnt_templates(self, obj_ids, audit):
+  def clone_asmnt_templates(self, obj_ids, audit, bulk=False):
     """Perform clone operation on an object"""
     clone_data = [{
         "sourceObjectIds": obj_ids,
@@ -58,7 +58,8 @@ class TestClonable(SnapshotterBaseTestCase):
             "type": "Audit",
             "id": audit.id
         },
-        "mappedObjects": []
+        "mappedObjects": [],
+        "bulk": bulk,
     }]
     response = self.api.send_request(
         self.api.client.post,
@@ -66,6 +67,7 @@ class TestClonable(SnapshotterBaseTestCase):
         api_link="/api/assessment_template/clone"
     )
     self.assertEqual(response.status_code, 200)
+    return response
 
   def assert_template_copy(self, source, copy, dest_audit):
     """Check if Assessment Template was cloned properly.
@@ -307,6 +309,57 @@ class TestClonable(SnapshotterBaseTestCase):
     for source, copy in zip(assessment_templates, template_copies):
       self.assert_template_copy(source, copy, audit2)
 
+  def test_bulk_templates_clone(self):
+    """Test bulk cloning of assessment templates"""
+    template_ids = []
+    assessment_templates = []
+    with factories.single_commit():
+      audit1 = factories.AuditFactory()
+      audit2 = factories.AuditFactory()
+      for i in xrange(3):
+        assessment_template = factories.AssessmentTemplateFactory(
+            template_object_type="Control",
+            procedure_description="Test procedure",
+            title="Assessment template - {}".format(i),
+            context=audit1.context,
+        )
+        assessment_templates.append(assessment_template)
+        template_ids.append(assessment_template.id)
+        factories.RelationshipFactory(
+            source=audit1,
+            destination=assessment_template)
+        for cad_type in ["Text", "Dropdown"]:
+          factories.CustomAttributeDefinitionFactory(
+              definition_type="assessment_template",
+              definition_id=assessment_template.id,
+              title="Test {}".format(cad_type),
+              attribute_type=cad_type,
+              multi_choice_options="a,b,c" if cad_type == "Dropdown" else "",
+          )
+
+    response = self.clone_asmnt_templates(template_ids, audit2, bulk=True)
+
+    template_copies = models.AssessmentTemplate.query.filter(
+        ~models.AssessmentTemplate.id.in_(template_ids)
+    ).order_by(models.AssessmentTemplate.title).all()
+    self.assertEqual(
+        sorted(item["id"] for item in response.json),
+        sorted(copy.id for copy in template_copies),
+    )
+    db.session.add_all(assessment_templates + [audit2])
+    for source, copy in zip(assessment_templates, template_copies):
+      self.assert_template_copy(source, copy, audit2)
+      self.assertEqual(copy.slug, "TEMPLATE-{}".format(copy.id))
+      self.assertEqual(len(copy.custom_attribute_definitions), 2)
+      self.assertEqual(
+          models.Revision.query.filter_by(
+              resource_type="AssessmentTemplate",
+              resource_id=copy.id,
+              action="created",
+          ).count(),
+          1,
+      )
+
   # pylint: disable=unused-argument
   @patch('ggrc.integrations.issues.Client.update_issue')
   def test_audit_clone_with_issue_tracker(self, mock_update_issue):
@@ -6,7 +6,10 @@ import ddt
 import mock
 
 import ggrc.models
+from ggrc import db
+from ggrc import views
 from ggrc.models import all_models
+from ggrc.models import revision_storage
 import integration.ggrc.generator
 from integration.ggrc import TestCase
 
@@ -337,3 +340,84 @@ class TestRevisions(TestCase):
     content = revisions[0].content
     self.assertEqual(
         content["custom_attribute_values"][0]["attribute_value"], "0")
+
+  def test_populate_contents(self):
+    """Test bulk populated content matches content of single revisions."""
+    programs = [self.gen.generate_object(all_models.Program)[1]
+                for _ in range(3)]
+    with factories.single_commit():
+      for program in programs:
+        factories.CustomAttributeDefinitionFactory(
+            definition_id=program.id,
+            definition_type="program",
+            title="CA {}".format(program.id),
+            attribute_type="Text",
+        )
+    revisions = ggrc.models.Revision.query.filter(
+        ggrc.models.Revision.resource_type == "Program",
+        ggrc.models.Revision.resource_id.in_([p.id for p in programs]),
+    ).all()
+    expected = {revision.id: revision.populate_content()
+                for revision in revisions}
+
+    ggrc.models.Revision.populate_contents(revisions)
+
+    for revision in revisions:
+      content = revision.content
+      self.assertEqual(content, expected[revision.id])
+      self.assertEqual(len(content["custom_attribute_definitions"]), 1)
+
+  @mock.patch("ggrc.settings.REVISION_DELTA_STORAGE", True, create=True)
+  @mock.patch("ggrc.models.background_task.create_lightweight_task")
+  def test_start_compaction(self, create_task):
+    """Test nightly compaction is queued as a background task."""
+    with self.app.test_request_context():
+      revision_storage.start_compaction()
+    create_task.assert_called_once_with(
+        name="nightly_compact_revisions",
+        url="/_background_tasks/nightly_compact_revisions",
+        method="POST",
+        queued_callback=views.nightly_compact_revisions,
+    )
+
+  @mock.patch("ggrc.settings.REVISION_KEYFRAME_INTERVAL", 3, create=True)
+  @mock.patch("ggrc.settings.REVISION_DELTA_STORAGE", True, create=True)
+  def test_compact_revisions(self):
+    """Test content of compacted revisions is reconstructed."""
+    cls = ggrc.models.DataAsset
+    name = cls._inflector.table_singular  # pylint: disable=protected-access
+    _, obj = self.gen.generate(cls, name, {name: {
+        "title": "compacted v0",
+        "context": None,
+    }})
+    for version in range(1, 7):
+      _, obj = self.gen.modify(obj, name, {name: {
+          "slug": obj.slug,
+          "title": "compacted v{}".format(version),
+          "context": None,
+      }})
+    # pylint: disable=protected-access
+    expected = {revision.id: revision._content
+                for revision in _get_revisions(obj)}
+
+    revision_storage.compact_revisions()
+    db.session.expunge_all()
+
+    revisions = ggrc.models.Revision.query.filter(
+        ggrc.models.Revision.id.in_(expected.keys())
+    ).order_by(ggrc.models.Revision.id).all()
+    self.assertEqual([revision._delta_base_id is None
+                      for revision in revisions],
+                     [True, False, False, True, False, False, True])
+    for revision in revisions:
+      self.assertEqual(revision._content, expected[revision.id])
+    candidates = revision_storage._get_compaction_candidates()
+    self.assertNotIn((cls.__name__, obj.id), candidates)
+
+    revisions[-2].content = dict(expected[revisions[-2].id], title="fixed")
+    db.session.commit()
+    db.session.expunge_all()
+    revision = ggrc.models.Revision.query.get(revisions[-3].id)
+    self.assertEqual(revision._content, expected[revision.id])
+    candidates = revision_storage._get_compaction_candidates()
+    self.assertIn((cls.__name__, obj.id), candidates)
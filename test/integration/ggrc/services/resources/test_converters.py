@@ -23,6 +23,8 @@ from google.appengine.ext import deferred
 
 from ggrc import db
 from ggrc.models import all_models
+from ggrc.models.import_export import ContentWriter
+from ggrc.models.import_export import iter_content
 
 from integration.ggrc import api_helper
 from integration.ggrc.models import factories
@@ -269,6 +271,26 @@ class TestImportExports(TestCase):
     self.assert200(response)
     self.assertEqual(response.data, "test content")
 
+  def test_content_chunks(self):
+    """Test export content is stored and read by chunks."""
+    user = all_models.Person.query.first()
+    ie1 = factories.ImportExportFactory(
+        job_type="Export",
+        status="In Progress",
+        created_at=datetime.now(),
+        created_by=user,
+        title="test.csv")
+    lines = [u"first,line\r\n", u"второй,ряд\r\n", u"third,line\r\n"]
+    writer = ContentWriter(ie1.id, chunk_size=5)
+    for line in lines:
+      writer.write(line.encode("utf-8"))
+    writer.flush()
+    db.session.commit()
+
+    chunks = list(iter_content(ie1.id))
+    self.assertGreater(len(chunks), 1)
+    self.assertEqual(u"".join(chunks), u"".join(lines))
+
   @ddt.data(u'漢字.csv', u'фыв.csv', u'asd.csv')
   def test_download_unicode_filename(self, filename):
     """Test import history download unicode filename"""
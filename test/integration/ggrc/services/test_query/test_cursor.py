@@ -0,0 +1,84 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for /query api keyset pagination."""
+
+import ddt
+
+from integration.ggrc import TestCase
+from integration.ggrc.api_helper import Api
+from integration.ggrc.models import factories
+
+
+@ddt.ddt
+class TestQueryCursor(TestCase):
+  """Tests for /query requests with cursor."""
+
+  def setUp(self):
+    super(TestQueryCursor, self).setUp()
+    self.api = Api()
+
+  def _send_query(self, order_by, cursor, page_size=2):
+    """Send control ids query with cursor."""
+    query_request_data = [{
+        u"filters": {
+            u"expression": {
+                u"left": u"title",
+                u"op": {u"name": u"~"},
+                u"right": u"",
+            },
+        },
+        u"order_by": order_by,
+        u"cursor": cursor,
+        u"page_size": page_size,
+        u"object_name": u"Control",
+        u"type": u"ids",
+    }]
+    return self.api.send_request(self.api.client.post,
+                                 data=query_request_data,
+                                 api_link="/query")
+
+  def _query_page(self, order_by, cursor):
+    """Get a page of control ids."""
+    resp = self._send_query(order_by, cursor)
+    self.assert200(resp)
+    return resp.json[0]["Control"]
+
+  @ddt.data(False, True)
+  def test_pages(self, desc):
+    """Test cursor pages contain all objects in the requested order."""
+    titles = ["b", "a", "c", "a", "b"]
+    with factories.single_commit():
+      controls = [(title, factories.ControlFactory(title=title).id)
+                  for title in titles]
+    # duplicated titles are ordered by id
+    expected = [id_ for _, id_ in sorted(controls)]
+    if desc:
+      expected = [id_ for _, id_ in sorted(controls,
+                                           key=lambda c: (c[0], -c[1]),
+                                           reverse=True)]
+    order_by = [{u"name": u"title", u"desc": desc}]
+
+    ids = []
+    cursor = None
+    for _ in range(len(titles)):
+      page = self._query_page(order_by, cursor)
+      self.assertEqual(page["total"], len(titles))
+      ids.extend(page["ids"])
+      cursor = page["next_cursor"]
+      if cursor is None:
+        break
+
+    self.assertIsNone(cursor)
+    self.assertEqual(ids, expected)
+
+  def test_invalid_cursor(self):
+    """Test cursor of a different ordering is rejected."""
+    with factories.single_commit():
+      for _ in range(3):
+        factories.ControlFactory()
+    page = self._query_page([{u"name": u"title"}], None)
+
+    resp = self._send_query([{u"name": u"slug"}], page["next_cursor"])
+
+    self.assert400(resp)
@@ -0,0 +1,80 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for /query api values requests with fields."""
+
+import ddt
+
+from ggrc.builder import json
+from ggrc.models import all_models
+
+from integration.ggrc import TestCase
+from integration.ggrc.api_helper import Api
+from integration.ggrc.models import factories
+
+
+@ddt.ddt
+class TestQueryFields(TestCase):
+  """Tests for /query api values with requested fields."""
+
+  def setUp(self):
+    super(TestQueryFields, self).setUp()
+    self.api = Api()
+
+  def _query_values(self, fields):
+    """Get values of all controls with requested fields."""
+    query_request_data = [{
+        u"fields": fields,
+        u"filters": {
+            u"expression": {
+                u"left": u"title",
+                u"op": {u"name": u"~"},
+                u"right": u"",
+            },
+        },
+        u"order_by": [{u"name": u"title"}],
+        u"object_name": u"Control",
+        u"type": u"values",
+    }]
+    resp = self.api.send_request(self.api.client.post,
+                                 data=query_request_data,
+                                 api_link="/query")
+    return resp.json[0]["Control"]
+
+  @ddt.data(
+      ["id", "type", "title", "status", "selfLink", "viewLink"],
+      ["id", "title", "modified_by", "context"],
+      ["id", "title", "unknown_field"],
+  )
+  def test_projected_values(self, fields):
+    """Test projected values match the full object representation."""
+    builder = json.get_json_builder(all_models.Control)
+    self.assertIsNotNone(builder.get_projection(fields))
+    with factories.single_commit():
+      controls = [factories.ControlFactory(title="control {}".format(i))
+                  for i in range(3)]
+    expected = json.publish_representation([
+        json.publish(all_models.Control.query.get(control.id))
+        for control in controls
+    ])
+    expected = [{field: obj.get(field) for field in fields}
+                for obj in expected]
+
+    result = self._query_values(fields)
+
+    self.assertEqual(result["count"], 3)
+    self.assertEqual(result["values"], expected)
+
+  def test_not_projected_fields(self):
+    """Test fields published by custom logic are not projected."""
+    builder = json.get_json_builder(all_models.Control)
+    self.assertIsNone(
+        builder.get_projection(["id", "custom_attribute_values"])
+    )
+    with factories.single_commit():
+      control_id = factories.ControlFactory().id
+
+    result = self._query_values(["id", "custom_attribute_values"])
+
+    self.assertEqual(result["values"],
+                     [{"id": control_id, "custom_attribute_values": []}])
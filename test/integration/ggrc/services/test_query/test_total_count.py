@@ -0,0 +1,112 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for exact and approximate /query total counts."""
+
+import json
+
+import mock
+
+from ggrc import views
+from ggrc.query.result_cache import CountCache
+from integration.ggrc import TestCase
+from integration.ggrc.api_helper import Api
+from integration.ggrc.models import factories
+
+
+def _init_count_cache(count_cache, *_):
+  """Init count cache with a key as if memcache was enabled."""
+  count_cache.key = "query:count:test"
+  count_cache.client = None
+
+
+class TestTotalCount(TestCase):
+  """Tests for total counts of /query requests."""
+
+  def setUp(self):
+    super(TestTotalCount, self).setUp()
+    self.client.get("/login")
+    self.api = Api()
+    with factories.single_commit():
+      for index in range(3):
+        factories.ControlFactory(title="Control {}".format(index))
+    self.object_query = {
+        u"object_name": u"Control",
+        u"filters": {
+            u"expression": {
+                u"left": u"title",
+                u"op": {u"name": u"~"},
+                u"right": u"Control",
+            },
+        },
+        u"limit": [0, 1],
+        u"type": u"ids",
+    }
+
+  def _query(self, **kwargs):
+    """Send /query request and get the Control result collection."""
+    response = self.api.send_request(
+        self.api.client.post,
+        data=[dict(self.object_query, **kwargs)],
+        api_link="/query",
+    )
+    self.assert200(response)
+    return response.json[0]["Control"]
+
+  @mock.patch("ggrc.settings.APP_ENGINE", True, create=True)
+  @mock.patch("ggrc.views.start_compute_query_count")
+  @mock.patch.object(CountCache, "__init__", _init_count_cache)
+  @mock.patch.object(CountCache, "mark_pending", return_value=True)
+  @mock.patch.object(CountCache, "get", return_value=None)
+  def test_approximate(self, _, __, start_compute_query_count):
+    """Test approximate total is flagged and counted in background."""
+    result = self._query(total_mode=u"approximate")
+    self.assertTrue(result["total_approximate"])
+    self.assertEqual(len(result["ids"]), 1)
+    start_compute_query_count.assert_called_once()
+    exact_query = start_compute_query_count.call_args[0][0]
+    self.assertEqual(exact_query["object_name"], "Control")
+    self.assertEqual(exact_query["limit"], [0, 1])
+    self.assertNotIn("total_mode", exact_query)
+
+  @mock.patch("ggrc.settings.APP_ENGINE", True, create=True)
+  @mock.patch("ggrc.views.start_compute_query_count")
+  @mock.patch.object(CountCache, "get", return_value=None)
+  def test_not_cached(self, _, start_compute_query_count):
+    """Test exact total is returned if it can not be cached."""
+    result = self._query(total_mode=u"approximate")
+    self.assertEqual(result["total"], 3)
+    self.assertNotIn("total_approximate", result)
+    start_compute_query_count.assert_not_called()
+
+  @mock.patch.object(CountCache, "get", return_value=None)
+  def test_exact(self, _):
+    """Test exact total is returned without background tasks."""
+    result = self._query(total_mode=u"approximate")
+    self.assertEqual(result["total"], 3)
+    self.assertNotIn("total_approximate", result)
+
+  @mock.patch.object(CountCache, "set")
+  @mock.patch.object(CountCache, "get", return_value=None)
+  def test_compute_query_count(self, _, count_cache_set):
+    """Test background task caches the exact total count."""
+    response = self.client.post(
+        "/_background_tasks/compute_query_count",
+        data=json.dumps({"object_query": self.object_query}),
+        content_type="application/json",
+    )
+    self.assert200(response)
+    count_cache_set.assert_called_once_with(3)
+
+  @mock.patch("ggrc.models.background_task.create_lightweight_task")
+  def test_start_compute_query_count(self, create_task):
+    """Test background task is created for the object query."""
+    with self.app.test_request_context():
+      views.start_compute_query_count(self.object_query)
+    create_task.assert_called_once_with(
+        name="compute_query_count",
+        url="/_background_tasks/compute_query_count",
+        parameters={"object_query": self.object_query},
+        method="POST",
+        queued_callback=views.compute_query_count,
+    )
@@ -0,0 +1,162 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for bulk relationship creation endpoint."""
+
+import datetime
+
+import mock
+
+from ggrc import db
+from ggrc.models import all_models
+
+from integration.ggrc import TestCase
+from integration.ggrc.api_helper import Api
+from integration.ggrc.models import factories
+
+
+class TestRelationshipsBulk(TestCase):
+  """Tests for /api/relationships/bulk endpoint."""
+
+  def setUp(self):
+    super(TestRelationshipsBulk, self).setUp()
+    self.api = Api()
+
+  def _post(self, pairs):
+    """Send source-destination pairs to the bulk endpoint."""
+    data = [{
+        "source": {"type": source.type, "id": source.id},
+        "destination": {"type": destination.type, "id": destination.id},
+    } for source, destination in pairs]
+    return self.api.send_request(self.api.client.post, data=data,
+                                 api_link="/api/relationships/bulk")
+
+  @staticmethod
+  def _count_relationships(obj):
+    rel = all_models.Relationship
+    return rel.query.filter(
+        ((rel.source_type == obj.type) & (rel.source_id == obj.id)) |
+        ((rel.destination_type == obj.type) & (rel.destination_id == obj.id))
+    ).count()
+
+  def test_create_with_dedup(self):
+    """Test existing and repeated pairs are not created twice."""
+    with factories.single_commit():
+      program = factories.ProgramFactory()
+      controls = [factories.ControlFactory() for _ in range(3)]
+      factories.RelationshipFactory(source=controls[0], destination=program)
+    program = all_models.Program.query.get(program.id)
+    controls = [all_models.Control.query.get(c.id) for c in controls]
+
+    response = self._post(
+        [(program, control) for control in controls] +
+        [(controls[1], program)]
+    )
+
+    self.assert200(response)
+    self.assertEqual(response.json, {
+        "created": 2,
+        "snapshots": 0,
+        "existing": 1,
+        "requested": 3,
+    })
+    self.assertEqual(self._count_relationships(program), 3)
+    new_ids = [rel.id for rel in all_models.Relationship.query.filter(
+        all_models.Relationship.destination_id.in_(
+            [controls[1].id, controls[2].id]),
+        all_models.Relationship.destination_type == "Control",
+    )]
+    revisions = all_models.Revision.query.filter(
+        all_models.Revision.resource_type == "Relationship",
+        all_models.Revision.resource_id.in_(new_ids),
+    ).count()
+    self.assertEqual(revisions, 2)
+
+  def test_audit_issue_mapping(self):
+    """Test Audit-Issue mapping rules are applied to new relationships."""
+    with factories.single_commit():
+      audit = factories.AuditFactory()
+      issue = factories.IssueFactory()
+    issue = all_models.Issue.query.get(issue.id)
+    audit = all_models.Audit.query.get(audit.id)
+
+    response = self._post([(issue, audit)])
+
+    self.assert200(response)
+    self.assertEqual(response.json["created"], 1)
+    issue = all_models.Issue.query.get(issue.id)
+    self.assertEqual(issue.audit_id, audit.id)
+
+  def test_snapshots(self):
+    """Test Audit-Snapshottable pairs are created as snapshots."""
+    with factories.single_commit():
+      audit = factories.AuditFactory()
+      controls = [factories.ControlFactory() for _ in range(2)]
+    audit = all_models.Audit.query.get(audit.id)
+    controls = [all_models.Control.query.get(c.id) for c in controls]
+
+    response = self._post([(audit, control) for control in controls])
+
+    self.assert200(response)
+    self.assertEqual(response.json["snapshots"], 2)
+    self.assertEqual(response.json["created"], 0)
+    snapshots = all_models.Snapshot.query.filter_by(
+        parent_type="Audit", parent_id=audit.id,
+    ).count()
+    self.assertEqual(snapshots, 2)
+
+  def test_invalid_pair(self):
+    """Test nothing is created for a request with a missing object."""
+    with factories.single_commit():
+      program = factories.ProgramFactory()
+      control = factories.ControlFactory()
+    program = all_models.Program.query.get(program.id)
+    control = all_models.Control.query.get(control.id)
+    missing = all_models.Control(id=control.id + 100)
+
+    response = self._post([(program, control), (program, missing)])
+
+    self.assert400(response)
+    self.assertEqual(self._count_relationships(program), 0)
+
+  def test_create_forbidden(self):
+    """Test relationships are not created without create permission."""
+    with factories.single_commit():
+      program = factories.ProgramFactory()
+      control = factories.ControlFactory()
+    program = all_models.Program.query.get(program.id)
+    control = all_models.Control.query.get(control.id)
+
+    with mock.patch("ggrc.rbac.permissions.is_allowed_create_for",
+                    return_value=False) as is_allowed_create_for:
+      response = self._post([(program, control)])
+
+    self.assert403(response)
+    relationship = is_allowed_create_for.call_args[0][0]
+    self.assertEqual(relationship.source, program)
+    self.assertEqual(relationship.destination, control)
+    self.assertEqual(self._count_relationships(program), 0)
+
+  def test_concurrent_insert(self):
+    """Test relationships inserted by another request are not created."""
+    with factories.single_commit():
+      program = factories.ProgramFactory()
+      controls = [factories.ControlFactory() for _ in range(2)]
+      relationship = factories.RelationshipFactory(source=program,
+                                                   destination=controls[0])
+      relationship.created_at = datetime.datetime(2018, 1, 1)
+    program = all_models.Program.query.get(program.id)
+    controls = [all_models.Control.query.get(c.id) for c in controls]
+
+    with mock.patch("ggrc.views.relationships._get_existing",
+                    return_value=set()):
+      response = self._post([(program, control) for control in controls])
+
+    self.assert200(response)
+    self.assertEqual(response.json["created"], 1)
+    self.assertEqual(response.json["existing"], 1)
+    self.assertEqual(self._count_relationships(program), 2)
+    revisions = db.session.query(all_models.Revision.resource_id).filter(
+        all_models.Revision.resource_type == "Relationship",
+    ).all()
+    self.assertNotIn((relationship.id,), revisions)
@@ -0,0 +1,48 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Integration tests for cached page bootstrap payloads."""
+
+import json
+import time
+
+from mock import patch
+
+from ggrc.views import get_attributes_json
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+@patch("ggrc.settings.BOOTSTRAP_CACHE_TIMEOUT", 3600, create=True)
+class TestBootstrapCache(TestCase):
+  """Tests for versioned cache of bootstrap payloads."""
+
+  @staticmethod
+  def _get_titles():
+    return {cad["title"] for cad in json.loads(get_attributes_json())}
+
+  def test_cad_change(self):
+    """Cached payload is rebuilt after a change of CADs."""
+    factories.CustomAttributeDefinitionFactory(title="first",
+                                               definition_type="control")
+    self.assertEqual(self._get_titles(), {"first"})
+
+    with patch("ggrc.views.publish") as publish:
+      self.assertEqual(self._get_titles(), {"first"})
+      self.assertFalse(publish.called)
+
+    factories.CustomAttributeDefinitionFactory(title="second",
+                                               definition_type="control")
+    self.assertEqual(self._get_titles(), {"first", "second"})
+
+  def test_local_expiry(self):
+    """Payload kept in process memory without memcache expires."""
+    factories.CustomAttributeDefinitionFactory(title="first",
+                                               definition_type="control")
+    self.assertEqual(self._get_titles(), {"first"})
+
+    expired = time.time() + 3601
+    with patch("ggrc.cache.bootstrap_cache.time.time", return_value=expired):
+      with patch("ggrc.views.publish", return_value={}) as publish:
+        self._get_titles()
+        self.assertTrue(publish.called)
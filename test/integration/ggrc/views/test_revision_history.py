@@ -0,0 +1,100 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Integration tests for paged revision history endpoint."""
+
+import json
+
+import sqlalchemy as sa
+
+from ggrc.models import all_models
+from integration.ggrc import TestCase
+from integration.ggrc.api_helper import Api
+from integration.ggrc.models import factories
+
+
+class TestRevisionHistory(TestCase):
+  """Tests for cursor paging of revision history."""
+
+  def setUp(self):
+    super(TestRevisionHistory, self).setUp()
+    self.client.get("/login")
+    self.api = Api()
+    control = factories.ControlFactory(title="Control")
+    self.control_id = control.id
+    for index in range(4):
+      control = all_models.Control.query.get(self.control_id)
+      self.api.put(control, {"title": "Control {}".format(index)})
+    self.revision_ids = [id_ for id_, in all_models.Revision.query.filter_by(
+        resource_type="Control",
+        resource_id=self.control_id,
+    ).order_by(all_models.Revision.id.desc()).values("id")]
+
+  def _get_page(self, **params):
+    params.update({"type": "Control", "id": self.control_id})
+    response = self.client.get("/api/revisions/history", query_string=params)
+    self.assert200(response)
+    return json.loads(response.data)
+
+  def test_paging(self):
+    """Pages follow each other by cursor, newest revisions first."""
+    ids = []
+    page = self._get_page(limit=2)
+    ids.extend(revision["id"] for revision in page["revisions"])
+    while page["next_cursor"] is not None:
+      self.assertEqual(len(page["revisions"]), 2)
+      page = self._get_page(limit=2, cursor=page["next_cursor"])
+      ids.extend(revision["id"] for revision in page["revisions"])
+    self.assertEqual(ids, self.revision_ids)
+
+  def test_mappings(self):
+    """Revisions of mappings are merged into pages by id."""
+    control = all_models.Control.query.get(self.control_id)
+    self.api.post(all_models.Relationship, {"relationship": {
+        "source": {"id": factories.ProgramFactory().id, "type": "Program"},
+        "destination": {"id": control.id, "type": "Control"},
+        "context": None,
+    }})
+    control = all_models.Control.query.get(self.control_id)
+    self.api.post(all_models.Relationship, {"relationship": {
+        "source": {"id": control.id, "type": "Control"},
+        "destination": {"id": factories.MarketFactory().id,
+                        "type": "Market"},
+        "context": None,
+    }})
+    revision = all_models.Revision
+    expected = [id_ for id_, in revision.query.filter(sa.or_(
+        sa.and_(revision.resource_type == "Control",
+                revision.resource_id == self.control_id),
+        sa.and_(revision.source_type == "Control",
+                revision.source_id == self.control_id),
+        sa.and_(revision.destination_type == "Control",
+                revision.destination_id == self.control_id),
+    )).order_by(revision.id.desc()).values("id")]
+    self.assertGreater(len(expected), len(self.revision_ids) + 1)
+
+    ids = []
+    page = {"next_cursor": None}
+    while True:
+      page = self._get_page(limit=2, mappings="true",
+                            cursor=page["next_cursor"])
+      ids.extend(revision["id"] for revision in page["revisions"])
+      if page["next_cursor"] is None:
+        break
+    self.assertEqual(ids, expected)
+
+  def test_content(self):
+    """Revisions are published with content, description and people."""
+    page = self._get_page(limit=1)
+    revision = page["revisions"][0]
+    self.assertEqual(revision["content"]["title"], "Control 3")
+    self.assertEqual(revision["description"], "Control 3 modified")
+    self.assertIn(str(revision["modified_by_id"]), page["people"])
+
+  def test_missing_object(self):
+    """Revision history of a missing object is not found."""
+    response = self.client.get("/api/revisions/history", query_string={
+        "type": "Control",
+        "id": self.control_id + 1,
+    })
+    self.assert404(response)
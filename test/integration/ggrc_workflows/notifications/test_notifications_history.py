@@ -14,6 +14,7 @@ from ggrc.app import db
 from ggrc.models import Notification
 from ggrc.models import NotificationHistory
 from ggrc.models import all_models
+from ggrc.models.notification import DigestRecipient
 from ggrc.notifications import common
 from integration.ggrc import TestCase
 from integration.ggrc.access_control import acl_helper
@@ -67,6 +68,50 @@ class TestNotificationsHistory(TestCase):
       self.assertEqual(notif_count, 0)
       self.assertEqual(notif_history_count, len(notif_to_be_sent_ids))
 
+  @patch("ggrc.notifications.common.send_email")
+  def test_skip_sent_digests(self, mocked_send_email):
+    """Tests retried daily digest job skips already notified recipients."""
+    date_time = "2018-06-10 16:55:15"
+    with freeze_time(date_time):
+      _, workflow = self.wf_generator.generate_workflow(
+          self.one_time_workflow)
+      self.wf_generator.generate_cycle(workflow)
+      self.wf_generator.activate_workflow(workflow)
+      notif_list, notif_data = common.get_daily_notifications()
+      self.assertIn(self.user.email, notif_data)
+      batch = (date.today(), max(notif.id for notif in notif_list))
+      common.add_digest_recipients(batch, [self.user.email])
+
+    # retry after midnight sends the same batch
+    with freeze_time("2018-06-11 00:05:00"):
+      common.send_daily_digest_notifications()
+
+    sent_to = {call[0][0] for call in mocked_send_email.call_args_list
+               if call[0][1].endswith("Jun 10")}
+    self.assertNotIn(self.user.email, sent_to)
+    self.assertEqual(db.session.query(DigestRecipient).count(), 0)
+
+  @patch("ggrc.notifications.common.send_email")
+  def test_new_batch_after_resumed(self, mocked_send_email):
+    """Tests new batch is sent after the resumed one in the same run."""
+    date_time = "2018-06-10 16:55:15"
+    with freeze_time(date_time):
+      _, workflow = self.wf_generator.generate_workflow(
+          self.one_time_workflow)
+      self.wf_generator.generate_cycle(workflow)
+      self.wf_generator.activate_workflow(workflow)
+      notif_list, _ = common.get_daily_notifications()
+      batch = (date.today(), min(notif.id for notif in notif_list))
+      common.add_digest_recipients(batch, [self.user.email])
+
+      common.send_daily_digest_notifications()
+
+      notif_list, _ = common.get_daily_notifications()
+    self.assertFalse([notif for notif in notif_list if not notif.repeating])
+    sent_to = {call[0][0] for call in mocked_send_email.call_args_list}
+    self.assertIn(self.user.email, sent_to)
+    self.assertEqual(db.session.query(DigestRecipient).count(), 0)
+
   def _create_test_cases(self):
     """Create configuration to use for generating a new workflow."""
     role_id = all_models.AccessControlRole.query.filter(
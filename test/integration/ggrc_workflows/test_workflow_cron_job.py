@@ -61,3 +61,58 @@ class TestWorkflowCron(workflow_test_case.WorkflowTestCase):
     workflow_with_admin = all_models.Workflow.query.filter_by(
         slug="WORKFLOW_WITH_ADMIN").one()
     self.assertEqual(len(workflow_with_admin.cycles), 1)
+
+  def test_cycle_task_relationships(self):
+    """Cron job maps every cycle task to every task group object."""
+    with freezegun.freeze_time(datetime.date(2017, 9, 25)):
+      with factories.single_commit():
+        workflow = self.setup_helper.setup_workflow(
+            (rbac_helper.GA_RNAME, ),
+            repeat_every=1,
+            unit=all_models.Workflow.MONTH_UNIT,
+        )
+        task_group = wf_factories.TaskGroupFactory(workflow=workflow)
+        for _ in range(2):
+          wf_factories.TaskGroupTaskFactory(
+              task_group=task_group,
+              start_date=datetime.date(2017, 9, 26),
+              end_date=datetime.date(2017, 9, 30),
+          )
+        controls = [factories.ControlFactory() for _ in range(3)]
+        for control in controls:
+          wf_factories.TaskGroupObjectFactory(
+              task_group=task_group,
+              object_id=control.id,
+              object_type=control.type,
+          )
+      self.api_helper.put(workflow, {"status": "Active", "recurrences": True})
+
+    with freezegun.freeze_time(datetime.date(2017, 10, 25)):
+      start_recurring_cycles()
+
+    cycle = all_models.Cycle.query.filter_by(workflow_id=workflow.id).one()
+    task_ids = [task.id for task in cycle.cycle_task_group_object_tasks]
+    self.assertEqual(len(task_ids), 2)
+    rel = all_models.Relationship
+    relationships = rel.query.filter(
+        rel.source_type == all_models.CycleTaskGroupObjectTask.__name__,
+        rel.source_id.in_(task_ids),
+    ).all()
+    self.assertEqual(
+        {(r.source_id, r.destination_type, r.destination_id)
+         for r in relationships},
+        {(task_id, control.type, control.id)
+         for task_id in task_ids for control in controls},
+    )
+    revisions = all_models.Revision.query.filter(
+        all_models.Revision.resource_type == rel.__name__,
+        all_models.Revision.resource_id.in_([r.id for r in relationships]),
+    ).all()
+    self.assertEqual(len(revisions), 6)
+    self.assertEqual(len({revision.event_id for revision in revisions}), 1)
+    notifications = all_models.Notification.query.filter(
+        all_models.Notification.object_type ==
+        all_models.CycleTaskGroupObjectTask.__name__,
+        all_models.Notification.object_id.in_(task_ids),
+    ).count()
+    self.assertTrue(notifications)
@@ -0,0 +1,62 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for collection operations of cache backends."""
+
+import unittest
+
+import ddt
+import mock
+
+from appengine import base
+from ggrc.cache import LocalCache
+from ggrc.cache import MemCache
+
+
+@ddt.ddt
+@base.with_memcache
+class TestCollectionCache(unittest.TestCase):
+  """Tests for bulk collection operations of MemCache and LocalCache."""
+
+  def setUp(self):
+    super(TestCollectionCache, self).setUp()
+    LocalCache().clean()
+    self.resources = mock.patch.dict(LocalCache.supported_resources,
+                                     {"controls": "Control"})
+    self.resources.start()
+
+  def tearDown(self):
+    self.resources.stop()
+    super(TestCollectionCache, self).tearDown()
+
+  @ddt.data(LocalCache, MemCache)
+  def test_all_or_none_get(self, cache_class):
+    """Collection is returned only if all of its items are cached."""
+    cache = cache_class()
+    data = {1: {"title": "a", "slug": "A"}, 2: {"title": "b", "slug": "B"}}
+    self.assertEqual(cache.add("collection", "controls", data), data)
+
+    result = cache.get("collection", "controls",
+                       {"ids": [2, 1], "attrs": ["title"]})
+    self.assertEqual(result.items(), [(2, {"title": "b"}),
+                                      (1, {"title": "a"})])
+    self.assertIsNone(cache.get("collection", "controls", {"ids": [1, 3]}))
+
+  @ddt.data(LocalCache, MemCache)
+  def test_update_remove(self, cache_class):
+    """Cached items are updated and removed in bulk."""
+    cache = cache_class()
+    cache.add("collection", "controls", {1: {"title": "a"}})
+    self.assertIsNone(cache.update("collection", "controls",
+                                   {1: {"title": "c"}, 2: {"title": "d"}}))
+
+    cache.add("collection", "controls", {1: {"title": "b"}, 2: {"title": "d"}})
+    self.assertEqual(
+        cache.get("collection", "controls", {"ids": [1, 2]}),
+        {1: {"title": "b"}, 2: {"title": "d"}},
+    )
+
+    self.assertIsNotNone(cache.remove("collection", "controls", [1, 3]))
+    self.assertIsNone(cache.get("collection", "controls", {"ids": [1]}))
+    self.assertEqual(cache.get("collection", "controls", {"ids": [2]}),
+                     {2: {"title": "d"}})
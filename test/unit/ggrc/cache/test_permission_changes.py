@@ -0,0 +1,52 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for updates of cached permissions after commit."""
+
+import unittest
+
+import flask
+import mock
+
+from ggrc.cache import utils as cache_utils
+
+
+@mock.patch("ggrc.settings.MEMCACHE_MECHANISM", True, create=True)
+@mock.patch("ggrc.cache.utils.clear_permission_cache")
+@mock.patch("ggrc.cache.utils.update_users_permission_cache")
+@mock.patch("ggrc.cache.utils.get_acl_keys",
+            return_value={(1, "Control", 2), (1, "Control", 3)})
+class TestPermissionChanges(unittest.TestCase):
+  """Tests for patching and dropping of cached permissions."""
+
+  def test_patch_acl_changes(self, get_acl_keys, update_users, clear_all):
+    """Test new and deleted ACL rows are patched into cached permissions."""
+    with flask.Flask(__name__).app_context():
+      cache_utils.add_permission_changes(acl_ids={5})
+      cache_utils.add_permission_changes(acl_keys={(2, "Audit", 4)})
+      cache_utils.update_permission_cache()
+      self.assertFalse(hasattr(flask.g, "permission_acl_ids"))
+
+    get_acl_keys.assert_called_once_with({5})
+    update_users.assert_called_once_with(
+        {(1, "Control", 2), (1, "Control", 3), (2, "Audit", 4)})
+    clear_all.assert_not_called()
+
+  def test_clear_outdated(self, get_acl_keys, update_users, clear_all):
+    """Test changes that can not be patched drop all cached permissions."""
+    with flask.Flask(__name__).app_context():
+      cache_utils.add_permission_changes(acl_ids={5}, outdated=True)
+      cache_utils.update_permission_cache()
+
+    clear_all.assert_called_once_with()
+    get_acl_keys.assert_not_called()
+    update_users.assert_not_called()
+
+  def test_no_changes(self, get_acl_keys, update_users, clear_all):
+    """Test cached permissions are kept if permissions did not change."""
+    with flask.Flask(__name__).app_context():
+      cache_utils.update_permission_cache()
+
+    clear_all.assert_not_called()
+    get_acl_keys.assert_not_called()
+    update_users.assert_not_called()
@@ -0,0 +1,80 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for compact permissions storage."""
+
+import unittest
+
+from ggrc.cache import permissions_store
+
+
+class TestPermissionsStore(unittest.TestCase):
+  """Tests for permissions serialization and patching."""
+
+  PERMISSIONS = {
+      "read": {
+          "Control": {"resources": {5, 3, 9}, "contexts": [1]},
+          "Audit": {"contexts": [None]},
+      },
+      "update": {
+          "Control": {"resources": {3}},
+      },
+      "__GGRC_ADMIN__": {
+          "__GGRC_ALL__": {"contexts": [7]},
+      },
+  }
+
+  def test_round_trip(self):
+    """Test permissions are the same after serialization."""
+    permissions = permissions_store.loads(
+        permissions_store.dumps(self.PERMISSIONS)
+    )
+    self.assertEqual(permissions["read"]["Audit"], {"contexts": [None]})
+    self.assertEqual(permissions["read"]["Control"]["contexts"], [1])
+    self.assertEqual(set(permissions["read"]["Control"]["resources"]),
+                     {3, 5, 9})
+    self.assertEqual(set(permissions["update"]["Control"]["resources"]), {3})
+    self.assertEqual(permissions["__GGRC_ADMIN__"],
+                     self.PERMISSIONS["__GGRC_ADMIN__"])
+
+  def test_resource_ids(self):
+    """Test membership checks on lazily decoded resource ids."""
+    resources = permissions_store.loads(
+        permissions_store.dumps(self.PERMISSIONS)
+    )["read"]["Control"]["resources"]
+    self.assertEqual(len(resources), 3)
+    self.assertIn(5, resources)
+    self.assertNotIn(4, resources)
+    self.assertNotIn(None, resources)
+    self.assertEqual(list(resources), [3, 5, 9])
+
+  def test_invalid_data(self):
+    """Test data in unknown format is not loaded."""
+    self.assertIsNone(permissions_store.loads("x\x9c"))
+    self.assertIsNone(permissions_store.loads("garbage data"))
+
+  def test_patch_resource(self):
+    """Test patching of permissions for a single object."""
+    permissions = permissions_store.loads(
+        permissions_store.dumps(self.PERMISSIONS)
+    )
+    permissions_store.patch_resource(permissions, "Control", 4, {"read"})
+    permissions_store.patch_resource(permissions, "Control", 3, set())
+    permissions_store.patch_resource(permissions, "Issue", 1, {"delete"})
+
+    permissions = permissions_store.loads(
+        permissions_store.dumps(permissions)
+    )
+    self.assertEqual(list(permissions["read"]["Control"]["resources"]),
+                     [4, 5, 9])
+    self.assertNotIn("resources", permissions["update"]["Control"])
+    self.assertEqual(list(permissions["delete"]["Issue"]["resources"]), [1])
+
+  def test_large_resources(self):
+    """Test many resource ids fit in a single memcache value."""
+    ids = range(1, 500000, 2) + range(1000000, 1250000)
+    data = permissions_store.dumps({"read": {"Control": {"resources": ids}}})
+    self.assertLess(len(data), permissions_store.MAX_VALUE_SIZE)
+    resources = permissions_store.loads(data)["read"]["Control"]["resources"]
+    self.assertEqual(len(resources), len(ids))
+    self.assertEqual(list(resources), ids)
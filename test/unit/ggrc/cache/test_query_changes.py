@@ -0,0 +1,53 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for expiration of query results after commit."""
+
+import unittest
+
+import flask
+import mock
+
+from ggrc.cache import utils as cache_utils
+
+
+class Relationship(object):
+  """Stub of a polymorphic object."""
+  # pylint: disable=too-few-public-methods
+  source_type = "Control"
+  destination_type = "Audit"
+
+
+@mock.patch("ggrc.settings.MEMCACHE_MECHANISM", True, create=True)
+@mock.patch("ggrc.cache.utils.get_cache_manager")
+class TestQueryChanges(unittest.TestCase):
+  """Tests for dropping query generations of changed models."""
+
+  @staticmethod
+  def _get_client(get_cache_manager):
+    return get_cache_manager.return_value.cache_object.memcache_client
+
+  def test_flushed_objects(self, get_cache_manager):
+    """Test generations of flushed objects are dropped after commit."""
+    session = mock.Mock(new=[Relationship()], dirty=[], deleted=[])
+    with flask.Flask(__name__).app_context():
+      cache_utils.collect_query_changes(session, None)
+      cache_utils.add_query_changes(["Issue"])
+      cache_utils.expire_query_results(session)
+      self.assertFalse(hasattr(flask.g, "query_changed_models"))
+
+    self._get_client(get_cache_manager).delete_multi.assert_called_once_with([
+        "query:generation:Audit",
+        "query:generation:Control",
+        "query:generation:Issue",
+        "query:generation:Relationship",
+    ])
+
+  def test_rollback(self, get_cache_manager):
+    """Test generations are kept if the transaction is rolled back."""
+    with flask.Flask(__name__).app_context():
+      cache_utils.add_query_changes(["Issue"])
+      cache_utils.drop_query_changes(None)
+      cache_utils.expire_query_results(None)
+
+    self._get_client(get_cache_manager).delete_multi.assert_not_called()
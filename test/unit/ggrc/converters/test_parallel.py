@@ -0,0 +1,56 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for grouping of import blocks for parallel analysis."""
+
+import unittest
+
+from ggrc import app  # noqa - this is neede for imports to work
+from ggrc.converters import parallel
+
+
+class TestGroupBlocks(unittest.TestCase):
+  """Tests for parallel.group_blocks function."""
+
+  def test_independent_blocks(self):
+    """Test blocks without references are analyzed separately."""
+    csv_data = [
+        [u"Object type", u"", u""],
+        [u"Market", u"Code*", u"Title*"],
+        [u"", u"MARKET-1", u"market 1"],
+        [u"", u"", u""],
+        [u"Object type", u"", u""],
+        [u"Objective", u"Code*", u"Title*"],
+        [u"", u"OBJECTIVE-1", u"objective 1"],
+    ]
+    self.assertEqual(parallel.group_blocks(csv_data), [[0], [1]])
+
+  def test_referenced_blocks(self):
+    """Test blocks referencing each other are grouped together."""
+    csv_data = [
+        [u"Object type", u"", u"", u""],
+        [u"Market", u"Code*", u"Title*", u""],
+        [u"", u"MARKET-1", u"market 1", u""],
+        [u"", u"", u"", u""],
+        [u"Object type", u"", u"", u""],
+        [u"Objective", u"Code*", u"Title*", u""],
+        [u"", u"OBJECTIVE-1", u"objective 1", u""],
+        [u"", u"", u"", u""],
+        [u"Object type", u"", u"", u""],
+        [u"Program", u"Code*", u"Title*", u"map:market"],
+        [u"", u"PROGRAM-1", u"program 1", u"market-0\nmarket-1"],
+    ]
+    self.assertEqual(parallel.group_blocks(csv_data), [[0, 2], [1]])
+
+  def test_shared_unique_rules(self):
+    """Test blocks with shared unique rules are grouped together."""
+    csv_data = [
+        [u"Object type", u"", u""],
+        [u"Policy", u"Code*", u"Title*"],
+        [u"", u"POLICY-1", u"policy"],
+        [u"", u"", u""],
+        [u"Object type", u"", u""],
+        [u"Regulation", u"Code*", u"Title*"],
+        [u"", u"REGULATION-1", u"regulation"],
+    ]
+    self.assertEqual(parallel.group_blocks(csv_data), [[0, 1]])
@@ -245,3 +245,21 @@ class BaseClientTest(unittest.TestCase):
             'priority': 'P2',
             'severity': 'S2',
         })
+
+  def test_update_issues(self):
+    """Tests collecting errors of multiple issue updates."""
+    cli_mock = mock.MagicMock()
+    error = integrations_errors.BadResponseError('Test')
+
+    def update_issue(_, issue_id, __):
+      if issue_id == '2':
+        raise error
+
+    with mock.patch.object(sync_utils, 'update_issue',
+                           side_effect=update_issue) as update_mock:
+      errors = sync_utils.update_issues(cli_mock, {'1': 'p1', '2': 'p2'})
+      self.assertEqual(errors, {'2': error})
+      self.assertItemsEqual(update_mock.call_args_list, [
+          mock.call(cli_mock, '1', 'p1'),
+          mock.call(cli_mock, '2', 'p2'),
+      ])
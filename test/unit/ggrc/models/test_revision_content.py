@@ -0,0 +1,60 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for materialized populated content of revisions."""
+
+import cPickle
+import unittest
+
+import flask
+import mock
+
+from ggrc.models import revision_content
+
+
+@mock.patch("ggrc.settings.REVISION_CONTENT_CACHE_TIMEOUT", 60, create=True)
+@mock.patch("ggrc.models.revision_content._get_key",
+            side_effect=lambda revision: "key:{}".format(revision.id))
+@mock.patch("ggrc.models.revision_content._get_client")
+class TestRevisionContent(unittest.TestCase):
+  """Tests for request and memcache storage of populated content."""
+
+  @staticmethod
+  def _get_revision(id_, content):
+    return mock.Mock(**{"id": id_, "populate_content.return_value": content})
+
+  def test_cached_content(self, get_client, _):
+    """Test populated content is pickled in memcache."""
+    client = get_client.return_value
+    client.get.return_value = None
+    content = {"title": "Control", "access_control_list": [{"id": 1}]}
+    with flask.Flask(__name__).app_context():
+      self.assertEqual(
+          revision_content.get_content(self._get_revision(1, content)),
+          content)
+    values = client.set_multi.call_args[0][0]
+    self.assertEqual(cPickle.loads(values["key:1"]), content)
+
+  def test_large_content(self, get_client, _):
+    """Test content too large for memcache is not stored in it."""
+    client = get_client.return_value
+    client.get_multi.return_value = {}
+    large = {"description": "x" * revision_content.MAX_VALUE_SIZE}
+    revisions = [self._get_revision(1, {"title": "Control"}),
+                 self._get_revision(2, large)]
+    with flask.Flask(__name__).app_context():
+      with mock.patch("ggrc.models.revision_content._load_cads"):
+        revision_content.populate(revisions)
+    values = client.set_multi.call_args[0][0]
+    self.assertEqual(values.keys(), ["key:1"])
+
+  def test_content_copy(self, get_client, _):
+    """Test changes of returned content do not change the stored one."""
+    get_client.return_value = None
+    revision = self._get_revision(1, {"access_control_list": [{"id": 1}]})
+    with flask.Flask(__name__).app_context():
+      content = revision_content.get_content(revision)
+      content["access_control_list"].append({"id": 2})
+      self.assertEqual(revision_content.get_content(revision),
+                       {"access_control_list": [{"id": 1}]})
+    revision.populate_content.assert_called_once_with()
@@ -0,0 +1,54 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unit tests for revision content deltas."""
+
+import json
+import unittest
+
+import ddt
+
+from ggrc.models import revision_storage
+
+
+@ddt.ddt
+class TestRevisionDeltas(unittest.TestCase):
+  """Tests for making and applying revision content deltas."""
+
+  @ddt.data(
+      ({}, {}),
+      ({"a": 1, "b": 2}, {"a": 1, "b": 3, "c": None}),
+      ({"a": 1, "b": 2}, {"a": 1}),
+      ({"a": {"b": [1, 2, {"c": 3}]}}, {"a": {"b": [1, 5, {"c": 4}]}}),
+      ({"a": [1, 2]}, {"a": [1, 2, 3]}),
+      ({"a": [1, 2]}, {"a": {"b": 1}}),
+      ({"a": {"b": 1}}, {"a": "b"}),
+  )
+  @ddt.unpack
+  def test_apply_delta(self, base, target):
+    """Test applying delta to base content gives target content."""
+    delta = revision_storage.make_delta(base, target)
+    # deltas are stored as JSON
+    delta = json.loads(json.dumps(delta))
+    self.assertEqual(revision_storage.apply_delta(base, delta), target)
+
+  def test_delta_size(self):
+    """Test delta contains only changed values."""
+    base = {"title": "a", "description": "b" * 1000,
+            "custom_attribute_values": [{"attribute_value": "c" * 1000},
+                                        {"attribute_value": "d"}]}
+    target = {"title": "a", "description": "b" * 1000,
+              "custom_attribute_values": [{"attribute_value": "c" * 1000},
+                                          {"attribute_value": "e"}]}
+    delta = revision_storage.make_delta(base, target)
+    self.assertEqual(delta, {
+        "diff": {"custom_attribute_values": {
+            "diff": {"1": {"set": {"attribute_value": "e"}}},
+        }},
+    })
+
+  def test_apply_delta_copies(self):
+    """Test applying delta does not change the base content."""
+    base = {"a": {"b": 1}}
+    revision_storage.apply_delta(base, {"diff": {"a": {"set": {"b": 2}}}})
+    self.assertEqual(base, {"a": {"b": 1}})
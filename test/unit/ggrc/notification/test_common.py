@@ -8,6 +8,10 @@
 import unittest
 from datetime import datetime
 
+import ddt
+import mock
+
+from ggrc.notifications import common
 from ggrc.notifications.common import sort_comments
 
 
@@ -52,3 +56,23 @@ class TestSortComments(unittest.TestCase):
         "All tasks can be closed", "I am confused", "ABCD...", "Comment One"
     ]
     self.assertEqual(descriptions, expected_descriptions)
+
+
+@ddt.ddt
+@mock.patch("ggrc.notifications.common.send_email")
+class TestSendEmails(unittest.TestCase):
+  """Tests for sending batches of emails."""
+
+  @ddt.data(0, 2)
+  def test_sent_before_error(self, workers, send_email):
+    """Test sent emails are reported before the sending error is raised."""
+    def send(email, *_):
+      if email == "b":
+        raise ValueError(email)
+    send_email.side_effect = send
+    messages = [(email, "Subject", "Body") for email in "abc"]
+    on_sent = mock.Mock()
+    with self.assertRaises(ValueError):
+      common.send_emails(messages, workers, on_sent)
+    self.assertEqual(sorted(call[0][0] for call in on_sent.call_args_list),
+                     ["a", "c"])
@@ -14,11 +14,14 @@ class TestNotificationsInit(unittest.TestCase):
 
   @patch("ggrc.notifications.common.deleted_task_rels_cache")
   @patch("ggrc.notifications.common.cycle_tasks_cache")
+  @patch("ggrc.notifications.common.Services.call_service")
   @patch("ggrc.notifications.common.get_filter_data")
-  def test_get_notification_data(self, get_filter_data, *cache_mocks):
+  def test_get_notification_data(self, get_filter_data, call_service,
+                                 *cache_mocks):
     """ Test that data does not contain empty emails """
     for cache_func in cache_mocks:
       cache_func.return_value = {}
+    call_service.return_value = {}
 
     get_filter_data.return_value = {
         "email@example.com": {},
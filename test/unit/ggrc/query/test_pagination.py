@@ -0,0 +1,95 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for query pagination cursors."""
+
+import datetime
+import unittest
+
+import mock
+
+from ggrc.query import pagination
+from ggrc.query.exceptions import BadQueryException
+
+
+class TestCursor(unittest.TestCase):
+  """Tests for keyset pagination cursor tokens."""
+
+  def test_roundtrip(self):
+    """Test order_by key values survive cursor encoding."""
+    values = [
+        u"title",
+        None,
+        datetime.datetime(2018, 3, 4, 5, 6, 7),
+        datetime.date(2018, 3, 4),
+        42,
+    ]
+    token = pagination.encode_cursor("abc", values)
+    self.assertEqual(pagination.decode_cursor(token, "abc", 5), values)
+
+  def test_invalid_token(self):
+    """Test malformed cursor is rejected."""
+    with self.assertRaises(BadQueryException):
+      pagination.decode_cursor(u"not a cursor", "abc", 1)
+
+  def test_other_order(self):
+    """Test cursor of a query with different ordering is rejected."""
+    token = pagination.encode_cursor("abc", [1])
+    with self.assertRaises(BadQueryException):
+      pagination.decode_cursor(token, "def", 1)
+    with self.assertRaises(BadQueryException):
+      pagination.decode_cursor(token, "abc", 2)
+
+
+@mock.patch("ggrc.query.pagination.db")
+class TestEstimatedCount(unittest.TestCase):
+  """Tests for total count estimates from the query plan."""
+
+  @staticmethod
+  def _set_plan(db, rows):
+    """Set rows returned by EXPLAIN of the query."""
+    connection = db.session.connection.return_value
+    connection.execute.return_value.fetchall.return_value = rows
+
+  @staticmethod
+  def _get_query():
+    """Get query mock with a compiled statement."""
+    query = mock.MagicMock()
+    compiled = query.statement.compile.return_value
+    compiled.string = "SELECT controls.id FROM controls WHERE id > %s"
+    compiled.params = {"id_1": 5}
+    compiled.positiontup = ["id_1"]
+    return query
+
+  def test_explain(self, db):
+    """Test estimate is taken from EXPLAIN of the compiled query."""
+    self._set_plan(db, [{"table": "controls", "rows": 40, "filtered": 50.0}])
+    self.assertEqual(
+        pagination.get_estimated_count(self._get_query(), "controls"), 20)
+    db.session.connection.return_value.execute.assert_called_once_with(
+        "EXPLAIN SELECT controls.id FROM controls WHERE id > %s", (5,))
+
+  def test_table_row(self, db):
+    """Test estimate is taken from the plan row of the queried table."""
+    self._set_plan(db, [
+        {"table": "<derived2>", "rows": 1000, "filtered": 100.0},
+        {"table": "controls", "rows": 30, "filtered": 10.0},
+        {"table": "relationships", "rows": 500, "filtered": 100.0},
+    ])
+    self.assertEqual(
+        pagination.get_estimated_count(self._get_query(), "controls"), 3)
+
+  def test_other_tables(self, db):
+    """Test first plan row is used if no row is of the queried table."""
+    self._set_plan(db, [
+        {"table": "<derived2>", "rows": 70},
+        {"table": "relationships", "rows": 500},
+    ])
+    self.assertEqual(
+        pagination.get_estimated_count(self._get_query(), "controls"), 70)
+
+  def test_empty_plan(self, db):
+    """Test estimate of a query without plan rows is zero."""
+    self._set_plan(db, [])
+    self.assertEqual(
+        pagination.get_estimated_count(self._get_query(), "controls"), 0)
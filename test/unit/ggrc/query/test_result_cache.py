@@ -0,0 +1,219 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for /query result ids cache."""
+
+import datetime
+import unittest
+
+import mock
+
+from ggrc.query import builder
+from ggrc.query import result_cache
+
+
+class TestResultCache(unittest.TestCase):
+  """Tests for result_cache helper functions."""
+
+  def test_pack_ids(self):
+    """Test ordered ids survive packing."""
+    ids = [5, 3, 100000, 1]
+    value = result_cache.pack_ids(ids, 42)
+    self.assertEqual(result_cache.unpack_ids(value), (ids, 42))
+
+  def test_dependencies(self):
+    """Test models from relevant filters are query dependencies."""
+    object_query = {
+        "object_name": "Control",
+        "filters": {
+            "expression": {
+                "left": {
+                    "object_name": "Program",
+                    "op": {"name": "relevant"},
+                    "ids": [1],
+                },
+                "op": {"name": "AND"},
+                "right": {
+                    "left": "title",
+                    "op": {"name": "~"},
+                    "right": "abc",
+                },
+            },
+        },
+    }
+    dependencies = result_cache.get_dependencies(object_query, "Control")
+    self.assertIn("Program", dependencies)
+    self.assertIn("Control", dependencies)
+    self.assertIn("Relationship", dependencies)
+
+  def test_previous_not_cached(self):
+    """Test queries depending on other queries results are not cached."""
+    object_query = {
+        "object_name": "Control",
+        "filters": {
+            "expression": {
+                "object_name": "__previous__",
+                "op": {"name": "relevant"},
+                "ids": [0],
+            },
+        },
+    }
+    self.assertIsNone(result_cache.get_dependencies(object_query, "Control"))
+
+  def test_key_canonical(self):
+    """Test cache key does not depend on the order of dict items."""
+    first = {
+        "object_name": "Control",
+        "filters": {"expression": {"left": "a", "op": {"name": "="},
+                                   "right": "b"}},
+        "limit": [0, 10],
+    }
+    second = {
+        "limit": [0, 10],
+        "filters": {"expression": {"right": "b", "op": {"name": "="},
+                                   "left": "a"}},
+        "object_name": "Control",
+    }
+    self.assertEqual(
+        result_cache.get_key(first, "all", ["1"]),
+        result_cache.get_key(second, "all", ["1"]),
+    )
+    self.assertNotEqual(
+        result_cache.get_key(first, "all", ["1"]),
+        result_cache.get_key(first, "all", ["2"]),
+    )
+
+  def test_count_key(self):
+    """Test count key does not depend on ordering and page."""
+    first = {
+        "object_name": "Control",
+        "filters": {"expression": {"left": "a", "op": {"name": "="},
+                                   "right": "b"}},
+        "order_by": [{"name": "title"}],
+        "limit": [0, 10],
+    }
+    second = dict(first, order_by=[{"name": "slug"}], limit=[10, 20])
+    self.assertEqual(
+        result_cache.get_count_key(first, "all", ["1"]),
+        result_cache.get_count_key(second, "all", ["1"]),
+    )
+    self.assertNotEqual(
+        result_cache.get_key(first, "all", ["1"]),
+        result_cache.get_key(second, "all", ["1"]),
+    )
+
+
+class TestTotalCount(unittest.TestCase):
+  """Tests for cached and approximate total counts of object queries."""
+
+  # pylint: disable=protected-access
+
+  def setUp(self):
+    self.object_query = {
+        "object_name": "Control",
+        "order_by": [{"name": "title"}],
+        "limit": [20, 30],
+        "total_mode": "approximate",
+    }
+    self.object_class = mock.Mock()
+    self.object_class.__tablename__ = "controls"
+
+  @mock.patch("ggrc.settings.APP_ENGINE", True, create=True)
+  @mock.patch("ggrc.views", create=True)
+  def test_start_exact_count(self, views):
+    """Test background task counts the query without limit and total_mode."""
+    count_cache = mock.Mock(**{"mark_pending.return_value": True})
+    self.assertTrue(builder.QueryHelper._start_exact_count(
+        dict(self.object_query, cursor="abc"), count_cache))
+    views.start_compute_query_count.assert_called_once_with({
+        "object_name": "Control",
+        "order_by": [{"name": "title"}],
+        "limit": [0, 1],
+    })
+
+  @mock.patch("ggrc.settings.APP_ENGINE", True, create=True)
+  @mock.patch("ggrc.views", create=True)
+  def test_count_pending(self, views):
+    """Test background task is not started while another one is pending."""
+    count_cache = mock.Mock(**{"mark_pending.return_value": False})
+    self.assertTrue(builder.QueryHelper._start_exact_count(
+        self.object_query, count_cache))
+    views.start_compute_query_count.assert_not_called()
+
+  @mock.patch("ggrc.settings.APP_ENGINE", False, create=True)
+  def test_no_background_tasks(self):
+    """Test exact count is not started without background tasks."""
+    count_cache = mock.Mock()
+    self.assertFalse(builder.QueryHelper._start_exact_count(
+        self.object_query, count_cache))
+    count_cache.mark_pending.assert_not_called()
+
+  @mock.patch("ggrc.settings.APP_ENGINE", True, create=True)
+  def test_not_cacheable(self):
+    """Test exact count is not started for query without count cache."""
+    count_cache = mock.Mock(key=None)
+    self.assertFalse(builder.QueryHelper._start_exact_count(
+        self.object_query, count_cache))
+    count_cache.mark_pending.assert_not_called()
+
+  @mock.patch("ggrc.settings.APP_ENGINE", True, create=True)
+  def test_not_serializable(self):
+    """Test exact count is not started for query not fitting in a task."""
+    count_cache = mock.Mock()
+    object_query = dict(self.object_query, filters={
+        "expression": {"left": "updated_at", "op": {"name": "="},
+                       "right": datetime.date(2018, 1, 1)},
+    })
+    self.assertFalse(builder.QueryHelper._start_exact_count(
+        object_query, count_cache))
+    count_cache.mark_pending.assert_not_called()
+
+  @mock.patch("ggrc.query.builder.pagination")
+  @mock.patch("ggrc.query.builder.QueryHelper._start_exact_count",
+              return_value=True)
+  @mock.patch("ggrc.query.builder.CountCache")
+  def test_approximate(self, count_cache_cls, start_exact_count, pagination):
+    """Test approximate total is estimated and flagged on a cache miss."""
+    count_cache = count_cache_cls.return_value
+    count_cache.get.return_value = None
+    pagination.get_estimated_count.return_value = 20
+    query = mock.Mock()
+    helper = builder.QueryHelper(mock.MagicMock())
+    total = helper._get_total_count(self.object_query, query,
+                                    self.object_class, None)
+    self.assertEqual(total, 20)
+    self.assertTrue(self.object_query["total_approximate"])
+    start_exact_count.assert_called_once_with(self.object_query, count_cache)
+    pagination.get_estimated_count.assert_called_once_with(query, "controls")
+    pagination.get_total_count.assert_not_called()
+    count_cache.set.assert_not_called()
+
+  @mock.patch("ggrc.query.builder.pagination")
+  @mock.patch("ggrc.query.builder.QueryHelper._start_exact_count",
+              return_value=False)
+  @mock.patch("ggrc.query.builder.CountCache")
+  def test_approximate_exact(self, count_cache_cls, _, pagination):
+    """Test exact total is cached if it can not be counted in background."""
+    count_cache = count_cache_cls.return_value
+    count_cache.get.return_value = None
+    pagination.get_total_count.return_value = 25
+    helper = builder.QueryHelper(mock.MagicMock())
+    total = helper._get_total_count(self.object_query, mock.Mock(),
+                                    self.object_class, None)
+    self.assertEqual(total, 25)
+    self.assertNotIn("total_approximate", self.object_query)
+    pagination.get_estimated_count.assert_not_called()
+    count_cache.set.assert_called_once_with(25)
+
+  @mock.patch("ggrc.query.builder.pagination")
+  @mock.patch("ggrc.query.builder.CountCache")
+  def test_cached(self, count_cache_cls, pagination):
+    """Test cached exact total is used instead of the estimate."""
+    count_cache_cls.return_value.get.return_value = 27
+    helper = builder.QueryHelper(mock.MagicMock())
+    total = helper._get_total_count(self.object_query, mock.Mock(),
+                                    self.object_class, None)
+    self.assertEqual(total, 27)
+    self.assertNotIn("total_approximate", self.object_query)
+    pagination.get_estimated_count.assert_not_called()
+    pagination.get_total_count.assert_not_called()
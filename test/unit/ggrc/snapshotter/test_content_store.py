@@ -0,0 +1,65 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for in-memory snapshot content store."""
+
+import unittest
+
+from ggrc.snapshotter import content_store
+
+
+class TestContentStore(unittest.TestCase):
+  """Tests for ContentStore."""
+
+  def setUp(self):
+    self.store = content_store.ContentStore(max_rows=10)
+
+  def test_get_stored(self):
+    """Test stored attributes are returned per revision."""
+    self.store.add(1, "Control", (), {"title": "a", "status": "Draft"})
+    self.store.add(2, "Control", (), {"title": "b", "owner": [{"id": 1}]})
+
+    self.assertEqual(self.store.get([1, 2, 3], {"Control": ()}), {
+        1: ("Control", {"title": "a", "status": "Draft"}),
+        2: ("Control", {"title": "b", "owner": [{"id": 1}]}),
+    })
+
+  def test_shared_values(self):
+    """Test equal values are stored only once."""
+    for revision_id in range(5):
+      self.store.add(revision_id, "Control", (), {"status": "Draft"})
+
+    # pylint: disable=protected-access
+    type_store = self.store._types["Control"]
+    self.assertEqual(type_store.columns["status"].values, ["Draft"])
+
+  def test_value_types(self):
+    """Test equal values of different types are stored separately."""
+    self.store.add(1, "Control", (), {"flag": 1, "owner": [{"id": 1}]})
+    self.store.add(2, "Control", (), {"flag": True, "owner": [{"id": 1}]})
+
+    stored = self.store.get([1, 2], {"Control": ()})
+    self.assertIs(stored[1][1]["flag"], 1)
+    self.assertIs(stored[2][1]["flag"], True)
+    # pylint: disable=protected-access
+    type_store = self.store._types["Control"]
+    self.assertEqual(type_store.columns["owner"].values, [[{"id": 1}]])
+
+  def test_signature_change(self):
+    """Test rows are dropped when definitions signature changes."""
+    self.store.add(1, "Control", ("old",), {"title": "a"})
+
+    self.assertEqual(self.store.get([1], {"Control": ("new",)}), {})
+    self.store.add(2, "Control", ("new",), {"title": "b"})
+    self.assertEqual(self.store.get([1, 2], {"Control": ("new",)}), {
+        2: ("Control", {"title": "b"}),
+    })
+
+  def test_max_rows(self):
+    """Test store is cleared when it is full."""
+    for revision_id in range(11):
+      self.store.add(revision_id, "Control", (), {"title": revision_id})
+
+    self.assertEqual(self.store.get(range(11), {"Control": ()}), {
+        10: ("Control", {"title": 10}),
+    })
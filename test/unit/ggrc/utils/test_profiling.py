@@ -0,0 +1,52 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for request profiling."""
+
+import unittest
+
+import flask
+import mock
+
+from ggrc.utils import profiling
+
+
+class TestProfiling(unittest.TestCase):
+  """Tests for request profiling stats."""
+
+  def test_histogram(self):
+    """Test histogram values are counted in the right buckets."""
+    histogram = profiling.Histogram((1, 10))
+    for value in (0, 1, 5, 100):
+      histogram.add(value)
+
+    result = histogram.to_dict()
+    self.assertEqual([bucket["count"] for bucket in result["buckets"]],
+                     [2, 1, 1])
+    self.assertEqual(result["max"], 100)
+    self.assertEqual(result["count"], 4)
+
+  def test_benchmark_tree(self):
+    """Test nested benchmarks are stored by their path."""
+    with flask.Flask(__name__).app_context():
+      profile = profiling.RequestProfile()
+      flask.g.request_profile = profile
+      profiling.start_benchmark("outer")
+      profiling.start_benchmark("inner")
+      profiling.end_benchmark(1)
+      profiling.end_benchmark(3)
+
+    self.assertEqual(profile.benchmarks, {"outer > inner": 1, "outer": 3})
+
+  @mock.patch("ggrc.utils.profiling.get_query_budget", return_value=5)
+  def test_over_budget(self, _):
+    """Test requests over the query budget are counted."""
+    profiler = profiling.Profiler()
+    for queries in (3, 6, 10):
+      profile = profiling.RequestProfile()
+      profile.queries = queries
+      profiler.add("GET /api/controls/<id>", profile, 0.1)
+
+    stats = profiler.report()["GET /api/controls/<id>"]
+    self.assertEqual(stats["over_budget"], 2)
+    self.assertEqual(stats["histograms"]["queries"]["count"], 3)